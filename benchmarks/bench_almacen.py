@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark de memoria por archivo de los resultados de escaneo
+=============================================================
+
+Compara una lista de ArchivoInfo con el almacén columnar AlmacenArchivos
+usando registros sintéticos (no se toca el disco).
+
+USO:
+    python benchmarks/bench_almacen.py            # 100.000 archivos
+    python benchmarks/bench_almacen.py 1000000    # 1 millón de archivos
+"""
+
+import sys
+import random
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core import ArchivoInfo, AlmacenArchivos, EstadoArchivo
+
+EXTENSIONES = ['.pdf', '.jpg', '.png', '.mp3', '.mp4', '.zip', '.exe', '.docx', '.txt', '.xyz']
+CATEGORIAS = ['Documentos', 'Imágenes', 'Audio', 'Videos', 'Comprimidos', 'Programas', 'Otros']
+
+def generar_archivos(cantidad: int, semilla: int = 42):
+    """Genera ArchivoInfo sintéticos con rutas y destinos realistas"""
+    aleatorio = random.Random(semilla)
+    origen = Path('/home/usuario/Downloads')
+    for i in range(cantidad):
+        extension = aleatorio.choice(EXTENSIONES)
+        categoria = aleatorio.choice(CATEGORIAS)
+        nombre = f"archivo_{i:07d}{extension}"
+        yield ArchivoInfo(
+            ruta_origen=origen / nombre,
+            nombre=nombre,
+            extension=extension,
+            tamaño=aleatorio.randint(1, 1 << 30),
+            categoria_sugerida=categoria,
+            ruta_destino=origen / categoria / nombre,
+            estado=EstadoArchivo.PENDIENTE,
+            fecha_modificacion=1_700_000_000 + i
+        )
+
+def medir(constructor, cantidad: int) -> int:
+    """Devuelve los bytes retenidos por la estructura construida"""
+    tracemalloc.start()
+    estructura = constructor(generar_archivos(cantidad))
+    actual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del estructura
+    return actual
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    
+    print(f"📊 Memoria por archivo ({cantidad:,} archivos)")
+    print("=" * 45)
+    
+    resultados = {
+        'list[ArchivoInfo]': medir(list, cantidad),
+        'AlmacenArchivos': medir(AlmacenArchivos, cantidad),
+    }
+    
+    for nombre, total in resultados.items():
+        print(f"  {nombre:<20} {total / cantidad:8.1f} B/archivo  ({total / 2**20:.1f} MiB)")
+    
+    ahorro = 1 - resultados['AlmacenArchivos'] / resultados['list[ArchivoInfo]']
+    print(f"\n  Reducción: {ahorro:.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark de memoria de escaneos grandes
+========================================
+
+Mide con tracemalloc la memoria de escanear_carpeta,
+generar_plan_organizacion y las instantáneas de MonitorArchivos sobre
+carpetas sintéticas en disco (ver cargas.py). Para cada fase informa el
+pico de memoria, la memoria que queda retenida, bytes y bloques por
+archivo, y los puntos del código que más memoria reservan.
+
+Cada fase se mide por separado: lo que ya existía antes de empezar (por
+ejemplo, el almacén del escaneo al medir el plan) no cuenta.
+
+USO:
+    python benchmarks/bench_memoria.py                          # 10.000 archivos
+    python benchmarks/bench_memoria.py --tamaños 10000,100000,1000000 --salida memoria.json
+"""
+
+import argparse
+import atexit
+import json
+import shutil
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cargas import aislar_configuracion, generar_descargas
+
+DIRECTORIO_TRABAJO = aislar_configuracion()
+# Se registra antes que los atexit del organizador, así se ejecuta el último
+atexit.register(shutil.rmtree, DIRECTORIO_TRABAJO, True)
+
+from config import config
+from core import OrganizadorCore, MonitorArchivos
+from utils import logger
+
+def medir(fase: str, archivos: int, funcion, sitios: int) -> Dict:
+    """Ejecuta una fase bajo tracemalloc y devuelve sus métricas"""
+    # Cada fase arranca y para tracemalloc: solo se trazan (y cuentan para
+    # el pico) las reservas hechas durante la fase
+    tracemalloc.start(1)
+    resultado = funcion()
+    
+    retenido, pico = tracemalloc.get_traced_memory()
+    despues = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    
+    filtros = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    estadisticas = despues.filter_traces(filtros).statistics('lineno')
+    bloques = sum(e.count for e in estadisticas)
+    
+    del resultado
+    return {
+        'fase': fase,
+        'archivos': archivos,
+        'pico_bytes': pico,
+        'retenido_bytes': retenido,
+        'pico_por_archivo': pico / archivos if archivos else None,
+        'retenido_por_archivo': retenido / archivos if archivos else None,
+        'bloques_por_archivo': bloques / archivos if archivos else None,
+        'sitios': [
+            {
+                'sitio': f"{Path(e.traceback[0].filename).name}:{e.traceback[0].lineno}",
+                'bytes': e.size,
+                'bloques': e.count
+            }
+            for e in estadisticas[:sitios]
+        ]
+    }
+
+def medir_tamaño(cantidad: int, semilla: int, sitios: int) -> List[Dict]:
+    origen = Path(tempfile.mkdtemp(prefix=f"descargas_{cantidad}_", dir=DIRECTORIO_TRABAJO))
+    try:
+        generar_descargas(origen, cantidad, semilla)
+        config.config['carpeta_origen'] = str(origen)
+        config.config['accion_desconocidos'] = 'otros'
+        
+        organizador = OrganizadorCore()
+        monitor = MonitorArchivos(organizador)
+        escaneado = {}
+        
+        def escanear():
+            escaneado['almacen'] = organizador.escanear_carpeta(origen)
+            return escaneado['almacen']
+        
+        resultados = [
+            medir('escaneo', cantidad, escanear, sitios),
+            medir('plan', cantidad, lambda: organizador.generar_plan_organizacion(escaneado['almacen']), sitios),
+            medir('monitor_instantanea', cantidad, lambda: monitor._instantanea(origen), sitios),
+        ]
+    finally:
+        shutil.rmtree(origen, ignore_errors=True)
+    
+    return resultados
+
+def imprimir_resumen(resultados: List[Dict]):
+    """Tabla legible en stderr (el JSON va a stdout o al archivo de salida)"""
+    for r in resultados:
+        print(f"\n{r['fase']} ({r['archivos']:,} archivos): pico {r['pico_bytes'] / 2**20:.1f} MiB "
+              f"({r['pico_por_archivo']:.0f} B/archivo), retenido {r['retenido_bytes'] / 2**20:.1f} MiB "
+              f"({r['retenido_por_archivo']:.0f} B/archivo, {r['bloques_por_archivo']:.1f} bloques/archivo)",
+              file=sys.stderr)
+        for sitio in r['sitios']:
+            print(f"    {sitio['bytes'] / 1024:>10.1f} KiB {sitio['bloques']:>9} bloques  {sitio['sitio']}",
+                  file=sys.stderr)
+
+def argumentos(args: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark de memoria con tracemalloc")
+    parser.add_argument('--tamaños', default='10000',
+                        help="Número de archivos por carpeta, separados por comas (p. ej. 10000,100000,1000000)")
+    parser.add_argument('--sitios', type=int, default=5, help="Puntos de reserva a mostrar por fase")
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--salida', type=Path, help="Guardar el JSON en este archivo")
+    return parser.parse_args(args)
+
+def main():
+    opciones = argumentos()
+    logger.nivel_consola = logger.NIVELES['ERROR']
+    
+    resultados = []
+    for cantidad in (int(t) for t in opciones.tamaños.split(',') if t):
+        resultados.extend(medir_tamaño(cantidad, opciones.semilla, opciones.sitios))
+    
+    imprimir_resumen(resultados)
+    texto = json.dumps({'version': 1, 'resultados': resultados}, indent=2, ensure_ascii=False)
+    if opciones.salida:
+        opciones.salida.write_text(texto, encoding='utf-8')
+    else:
+        print(texto)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Benchmark de rendimiento de escaneo, plan y organización
+========================================================
+
+Genera carpetas de descargas sintéticas y reproducibles (ver cargas.py) en
+un directorio temporal y mide escanear_carpeta, generar_plan_organizacion y
+ejecutar_organizacion, moviendo tanto dentro de la misma carpeta como a
+otro directorio. Informa archivos/s, bytes/s y memoria residente máxima
+de cada fase en JSON.
+
+La configuración, el log y las estadísticas van a un HOME temporal, así
+que no se toca nada del usuario.
+
+USO:
+    python benchmarks/bench_rendimiento.py                          # 1.000 y 10.000 archivos
+    python benchmarks/bench_rendimiento.py --tamaños 100000,1000000 --fases escaneo,plan
+    python benchmarks/bench_rendimiento.py --destino /mnt/otro_disco --salida resultado.json
+"""
+
+import argparse
+import atexit
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cargas import aislar_configuracion, crear_conflictos, generar_descargas
+
+DIRECTORIO_TRABAJO = aislar_configuracion()
+# Se registra antes que los atexit del organizador, así se ejecuta el último
+atexit.register(shutil.rmtree, DIRECTORIO_TRABAJO, True)
+
+from config import config
+from core import OrganizadorCore
+from utils import logger
+
+FASES = ['escaneo', 'plan', 'organizar', 'organizar_otro_directorio']
+
+def reiniciar_pico_memoria():
+    """Reinicia el máximo de memoria residente del proceso (solo Linux)"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+def pico_memoria_kb() -> Optional[int]:
+    """Memoria residente máxima en KiB desde el último reinicio (o desde el arranque)"""
+    try:
+        with open('/proc/self/status') as f:
+            for linea in f:
+                if linea.startswith('VmHWM:'):
+                    return int(linea.split()[1])
+    except OSError:
+        pass
+    
+    try:
+        import resource
+        maximo = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maximo // 1024 if sys.platform == 'darwin' else maximo
+    except ImportError:
+        return None  # Windows
+
+def configurar(origen: Path, destino_base: Optional[Path]):
+    """Apunta la configuración a la carpeta sintética"""
+    config.config['carpeta_origen'] = str(origen)
+    config.config['accion_desconocidos'] = 'otros'
+    config.config['eliminar_carpetas_vacias'] = False
+    base = destino_base or origen
+    config.config['carpetas_destino'] = {categoria: str(base / categoria) for categoria in config.categorias}
+
+def medir(fase: str, cantidad: int, funcion) -> Dict:
+    """Ejecuta una fase y devuelve sus métricas"""
+    reiniciar_pico_memoria()
+    inicio = time.perf_counter()
+    archivos, bytes_fase = funcion()
+    segundos = time.perf_counter() - inicio
+    return {
+        'fase': fase,
+        'tamaño': cantidad,
+        'archivos': archivos,
+        'bytes': bytes_fase,
+        'segundos': segundos,
+        'archivos_por_segundo': archivos / segundos if segundos else None,
+        'bytes_por_segundo': bytes_fase / segundos if segundos else None,
+        'rss_pico_kb': pico_memoria_kb()
+    }
+
+def ejecutar_tamaño(cantidad: int, fases: List[str], destino: Optional[Path], semilla: int) -> List[Dict]:
+    """Mide las fases pedidas para un tamaño de carpeta"""
+    resultados = []
+    organizador = OrganizadorCore()
+    raiz = Path(tempfile.mkdtemp(prefix=f"descargas_{cantidad}_", dir=DIRECTORIO_TRABAJO))
+    
+    try:
+        if 'escaneo' in fases or 'plan' in fases:
+            origen = raiz / "escaneo"
+            generar_descargas(origen, cantidad, semilla)
+            configurar(origen, None)
+            
+            escaneado = {}
+            
+            def escanear():
+                almacen = escaneado['almacen'] = organizador.escanear_carpeta(origen)
+                return len(almacen), almacen.tamaño_total(solo_validos=False)
+            
+            def planificar():
+                almacen = escaneado['almacen']
+                organizador.generar_plan_organizacion(almacen)
+                return len(almacen), almacen.tamaño_total()
+            
+            medicion = medir('escaneo', cantidad, escanear)
+            if 'escaneo' in fases:
+                resultados.append(medicion)
+            if 'plan' in fases:
+                resultados.append(medir('plan', cantidad, planificar))
+        
+        for fase in ('organizar', 'organizar_otro_directorio'):
+            if fase not in fases:
+                continue
+            
+            origen = raiz / fase
+            if fase == 'organizar':
+                destino_fase = None
+            else:
+                destino_fase = Path(tempfile.mkdtemp(prefix="destino_", dir=destino or raiz))
+            generar_descargas(origen, cantidad, semilla)
+            configurar(origen, destino_fase)
+            
+            almacen = organizador.escanear_carpeta(origen)
+            crear_conflictos(almacen, semilla=semilla)
+            
+            def organizar():
+                resultado = organizador.ejecutar_organizacion(almacen)
+                return resultado['total_procesados'], resultado['tamaño_total_movido']
+            
+            resultados.append(medir(fase, cantidad, organizar))
+            
+            if destino_fase is not None and destino is not None:
+                shutil.rmtree(destino_fase, ignore_errors=True)
+    finally:
+        shutil.rmtree(raiz, ignore_errors=True)
+    
+    return resultados
+
+def ejecutar_suite(tamaños: List[int], fases: List[str], destino: Optional[Path] = None,
+                   semilla: int = 42) -> Dict:
+    """Ejecuta todas las combinaciones y devuelve el informe completo"""
+    resultados = []
+    for cantidad in tamaños:
+        resultados.extend(ejecutar_tamaño(cantidad, fases, destino, semilla))
+    
+    return {
+        'version': 1,
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'semilla': semilla,
+        'resultados': resultados
+    }
+
+def imprimir_resumen(informe: Dict):
+    """Tabla legible en stderr (el JSON va a stdout o al archivo de salida)"""
+    print(f"{'Fase':<28}{'Archivos':>10}{'s':>9}{'archivos/s':>12}{'MiB/s':>10}{'RSS MiB':>9}", file=sys.stderr)
+    for r in informe['resultados']:
+        mib_s = (r['bytes_por_segundo'] or 0) / 2**20
+        rss = (r['rss_pico_kb'] or 0) / 1024
+        print(f"{r['fase']:<28}{r['archivos']:>10}{r['segundos']:>9.2f}"
+              f"{r['archivos_por_segundo'] or 0:>12.0f}{mib_s:>10.0f}{rss:>9.1f}", file=sys.stderr)
+
+def argumentos(args: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark de escaneo, plan y organización")
+    parser.add_argument('--tamaños', default='1000,10000',
+                        help="Número de archivos por carpeta, separados por comas (p. ej. 1000,10000,100000,1000000)")
+    parser.add_argument('--fases', default=','.join(FASES), help=f"Fases a medir: {', '.join(FASES)}")
+    parser.add_argument('--destino', type=Path, help="Directorio base para organizar_otro_directorio (p. ej. otro disco)")
+    parser.add_argument('--semilla', type=int, default=42)
+    parser.add_argument('--salida', type=Path, help="Guardar el JSON en este archivo")
+    return parser.parse_args(args)
+
+def main():
+    opciones = argumentos()
+    tamaños = [int(t) for t in opciones.tamaños.split(',') if t]
+    fases = [f for f in opciones.fases.split(',') if f]
+    
+    # El log por archivo en consola falsearía las medidas
+    logger.nivel_consola = logger.NIVELES['ERROR']
+    
+    informe = ejecutar_suite(tamaños, fases, opciones.destino, opciones.semilla)
+    imprimir_resumen(informe)
+    texto = json.dumps(informe, indent=2, ensure_ascii=False)
+    if opciones.salida:
+        opciones.salida.write_text(texto, encoding='utf-8')
+    else:
+        print(texto)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
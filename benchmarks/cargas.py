@@ -0,0 +1,107 @@
+"""
+Cargas sintéticas para los benchmarks
+=====================================
+
+Genera carpetas de descargas reproducibles en disco: mezcla realista de
+extensiones, nombres que chocan entre sí y con archivos ya organizados,
+archivos sin extensión (algunos con magic number) y tamaños mezclados. Los
+archivos grandes se crean dispersos (truncate), así que no ocupan disco.
+
+Las funciones de este módulo no importan el código del organizador: los
+benchmarks deben llamar a aislar_configuracion() antes de importarlo para
+no tocar la configuración ni las estadísticas del usuario.
+"""
+
+import os
+import random
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+# (extensión, peso) aproximando una carpeta de descargas real
+MEZCLA_EXTENSIONES = [
+    ('.pdf', 18), ('.jpg', 14), ('.png', 10), ('.zip', 8), ('.docx', 6),
+    ('.mp4', 5), ('.exe', 5), ('.txt', 4), ('.mp3', 4), ('.xlsx', 3),
+    ('.jpeg', 3), ('.rar', 2), ('.msi', 2), ('.gif', 2), ('.mkv', 2),
+    ('.7z', 1), ('.wav', 1), ('.csv', 1), ('.deb', 1), ('.torrent', 2),
+    ('.xyz', 1), ('', 4)
+]
+
+# Nombres típicos que se repiten (descargas repetidas del mismo archivo)
+NOMBRES_FRECUENTES = ['factura', 'document', 'image', 'setup', 'informe', 'download', 'IMG_0001', 'scan']
+
+# Cabeceras para que la detección por contenido tenga trabajo
+CABECERAS = {
+    '.pdf': b'%PDF-1.7\n', '.png': b'\x89PNG\r\n\x1a\n', '.jpg': b'\xff\xd8\xff\xe0',
+    '.jpeg': b'\xff\xd8\xff\xe0', '.zip': b'PK\x03\x04', '.docx': b'PK\x03\x04',
+    '.xlsx': b'PK\x03\x04', '.exe': b'MZ', '.msi': b'MZ', '.rar': b'Rar!\x1a\x07\x00',
+    '.gif': b'GIF89a'
+}
+
+def aislar_configuracion(directorio: Optional[Path] = None) -> Path:
+    """Redirige el HOME a un directorio temporal antes de importar el organizador"""
+    directorio = Path(directorio or tempfile.mkdtemp(prefix="organizador_bench_"))
+    directorio.mkdir(parents=True, exist_ok=True)
+    os.environ['HOME'] = str(directorio)
+    os.environ['USERPROFILE'] = str(directorio)
+    return directorio
+
+def _tamaño_aleatorio(aleatorio: random.Random) -> int:
+    """Mayoría de archivos pequeños, algunos medianos y pocos muy grandes"""
+    tirada = aleatorio.random()
+    if tirada < 0.70:
+        return aleatorio.randint(1 << 10, 64 << 10)
+    if tirada < 0.95:
+        return aleatorio.randint(64 << 10, 8 << 20)
+    return aleatorio.randint(100 << 20, 2 << 30)
+
+def generar_descargas(carpeta: Path, cantidad: int, semilla: int = 42,
+                      fraccion_colisiones: float = 0.2) -> Dict[str, int]:
+    """Crea `cantidad` archivos en `carpeta` y devuelve {'archivos', 'bytes'}
+    
+    Una fracción de los nombres se toma de NOMBRES_FRECUENTES con sufijos
+    " (n)" como los que deja el navegador; con crear_conflictos() esos
+    nombres ya existen en destino y obligan a buscar un nombre libre.
+    """
+    aleatorio = random.Random(semilla)
+    extensiones = [ext for ext, _ in MEZCLA_EXTENSIONES]
+    pesos = [peso for _, peso in MEZCLA_EXTENSIONES]
+    carpeta.mkdir(parents=True, exist_ok=True)
+    
+    total_bytes = 0
+    for i in range(cantidad):
+        extension = aleatorio.choices(extensiones, pesos)[0]
+        
+        if aleatorio.random() < fraccion_colisiones:
+            nombre = f"{aleatorio.choice(NOMBRES_FRECUENTES)} ({i % 50}){extension}"
+            if (carpeta / nombre).exists():
+                nombre = f"{aleatorio.choice(NOMBRES_FRECUENTES)}_{i}{extension}"
+        else:
+            nombre = f"archivo_{i:07d}{extension}"
+        
+        tamaño = _tamaño_aleatorio(aleatorio)
+        ruta = carpeta / nombre
+        with open(ruta, 'wb') as f:
+            # Los archivos sin extensión llevan a veces una cabecera reconocible
+            cabecera = CABECERAS.get(extension or aleatorio.choice(['.pdf', '.png', '.zip', '.bin']), b'')
+            f.write(cabecera)
+            f.truncate(tamaño)
+        total_bytes += tamaño
+    
+    return {'archivos': cantidad, 'bytes': total_bytes}
+
+def crear_conflictos(archivos, fraccion: float = 0.2, semilla: int = 42) -> int:
+    """Crea archivos vacíos en el destino planificado de una fracción de archivos
+    
+    Recibe el resultado de escanear_carpeta (cualquier iterable con
+    ruta_destino) y devuelve cuántos conflictos se han creado.
+    """
+    aleatorio = random.Random(semilla)
+    creados = 0
+    for archivo in archivos:
+        if archivo.ruta_destino is None or aleatorio.random() >= fraccion:
+            continue
+        archivo.ruta_destino.parent.mkdir(parents=True, exist_ok=True)
+        archivo.ruta_destino.touch()
+        creados += 1
+    return creados
\ No newline at end of file
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Detección de regresiones de rendimiento
+=======================================
+
+Repite la suite de bench_rendimiento.py varias veces, calcula la mediana y
+la dispersión de cada métrica y la compara con la línea base guardada en
+linea_base.json. Cada métrica tiene su tolerancia y su sentido (más es
+mejor para archivos/s, menos es mejor para la memoria). Sale con código 1
+si alguna métrica empeora más de lo tolerado y con código 2 si no hay
+línea base.
+
+USO:
+    python benchmarks/regresion.py --guardar        # Medir y guardar la línea base
+    python benchmarks/regresion.py                  # Comparar con la línea base
+    python benchmarks/regresion.py --repeticiones 9
+
+La línea base está en el repositorio, así que no guarda tiempos absolutos:
+antes de cada repetición se cronometra un bucle de calibración fijo en
+Python puro y los archivos/s se guardan como archivos por vuelta de ese
+bucle. Así la misma línea base sirve en máquinas más rápidas o más
+lentas. La memoria se guarda tal cual. Si un cambio mejora el rendimiento
+a propósito, se actualiza con --guardar y se sube junto con el cambio.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from bench_rendimiento import FASES, ejecutar_suite, logger
+
+LINEA_BASE = Path(__file__).resolve().parent / "linea_base.json"
+
+# Métrica -> (tolerancia relativa, True si más alto es mejor)
+TOLERANCIAS = {
+    'archivos_por_segundo': (0.30, True),
+    'rss_pico_kb': (0.25, False),
+}
+
+# Métricas que dependen de la velocidad de la máquina y se dividen por la calibración
+NORMALIZADAS = {'archivos_por_segundo'}
+
+def calibrar(vueltas: int = 7) -> float:
+    """Vueltas por segundo de un bucle fijo parecido al trabajo por archivo (la mejor)"""
+    nombres = [f"Documento_{i:05d}.Final.PDF" for i in range(20000)]
+    categorias = {'.pdf': 'Documentos', '.jpg': 'Imágenes', '.zip': 'Comprimidos'}
+    tiempos = []
+    for _ in range(vueltas):
+        inicio = time.perf_counter()
+        contador: Dict[str, int] = {}
+        for nombre in nombres:
+            extension = nombre[nombre.rfind('.'):].lower()
+            categoria = categorias.get(extension, 'Otros')
+            contador[categoria] = contador.get(categoria, 0) + len(nombre.split('_'))
+        tiempos.append(time.perf_counter() - inicio)
+    # El mínimo es la medida menos afectada por otros procesos
+    return 1 / min(tiempos)
+
+def medir_repetido(tamaños: List[int], fases: List[str], repeticiones: int) -> Dict[str, Dict]:
+    """Ejecuta la suite varias veces y devuelve {fase@tamaño: {métrica: estadísticos}}"""
+    muestras: Dict[str, Dict[str, List[float]]] = {}
+    for repeticion in range(repeticiones):
+        print(f"  Repetición {repeticion + 1}/{repeticiones}...", file=sys.stderr)
+        # Se calibra antes y después de cada repetición para seguir los cambios de
+        # carga de la máquina
+        antes = calibrar()
+        informe = ejecutar_suite(tamaños, fases)
+        calibracion = (antes + calibrar()) / 2
+        for r in informe['resultados']:
+            clave = f"{r['fase']}@{r['tamaño']}"
+            for metrica in TOLERANCIAS:
+                if r.get(metrica) is not None:
+                    valor = r[metrica] / calibracion if metrica in NORMALIZADAS else r[metrica]
+                    muestras.setdefault(clave, {}).setdefault(metrica, []).append(valor)
+    
+    resultado = {}
+    for clave, metricas in muestras.items():
+        resultado[clave] = {}
+        for metrica, valores in metricas.items():
+            mediana = statistics.median(valores)
+            resultado[clave][metrica] = {
+                'mediana': mediana,
+                'minimo': min(valores),
+                'maximo': max(valores),
+                'dispersion': (max(valores) - min(valores)) / mediana if mediana else 0.0
+            }
+    return resultado
+
+def comparar(actual: Dict[str, Dict], base: Dict) -> List[str]:
+    """Devuelve la lista de regresiones (vacía si todo está dentro de tolerancia)"""
+    tolerancias = {**{m: t for m, (t, _) in TOLERANCIAS.items()}, **base.get('tolerancias', {})}
+    regresiones = []
+    
+    print(f"\n{'Prueba':<34}{'Métrica':<22}{'Base':>12}{'Actual':>12}{'Cambio':>9}{'Disp.':>8}")
+    for clave, metricas_base in base['resultados'].items():
+        for metrica, valor_base in metricas_base.items():
+            medida = actual.get(clave, {}).get(metrica)
+            if medida is None:
+                continue
+            
+            mas_es_mejor = TOLERANCIAS.get(metrica, (0, True))[1]
+            cambio = (medida['mediana'] - valor_base) / valor_base if valor_base else 0.0
+            empeora = -cambio if mas_es_mejor else cambio
+            marca = ""
+            if empeora > tolerancias.get(metrica, 0.25):
+                marca = " ❌"
+                regresiones.append(f"{clave} {metrica}: {valor_base:.5g} → {medida['mediana']:.5g} ({cambio:+.0%})")
+            
+            print(f"{clave:<34}{metrica:<22}{valor_base:>12.5g}{medida['mediana']:>12.5g}"
+                  f"{cambio:>+9.0%}{medida['dispersion']:>8.0%}{marca}")
+    
+    return regresiones
+
+def argumentos(args: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compara el rendimiento actual con la línea base")
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--tamaños', help="Por defecto, los de la línea base (o 1000)")
+    parser.add_argument('--fases', default=','.join(FASES))
+    parser.add_argument('--linea-base', type=Path, default=LINEA_BASE)
+    parser.add_argument('--guardar', '--actualizar', dest='guardar', action='store_true',
+                        help="Guardar las medianas como nueva línea base")
+    return parser.parse_args(args)
+
+def main() -> int:
+    opciones = argumentos()
+    logger.nivel_consola = logger.NIVELES['ERROR']
+    
+    base = None
+    if opciones.linea_base.exists():
+        base = json.loads(opciones.linea_base.read_text(encoding='utf-8'))
+    elif not opciones.guardar:
+        print(f"No hay línea base en {opciones.linea_base}; genérala con --guardar", file=sys.stderr)
+        return 2
+    
+    if opciones.tamaños:
+        tamaños = [int(t) for t in opciones.tamaños.split(',') if t]
+    elif base:
+        tamaños = base['tamaños']
+    else:
+        tamaños = [1000]
+    fases = [f for f in opciones.fases.split(',') if f]
+    
+    actual = medir_repetido(tamaños, fases, opciones.repeticiones)
+    
+    if opciones.guardar:
+        nueva_base = {
+            'tamaños': tamaños,
+            'repeticiones': opciones.repeticiones,
+            'normalizadas': sorted(NORMALIZADAS),
+            'tolerancias': {metrica: tolerancia for metrica, (tolerancia, _) in TOLERANCIAS.items()},
+            'resultados': {
+                clave: {metrica: float(f"{m['mediana']:.5g}") for metrica, m in metricas.items()}
+                for clave, metricas in actual.items()
+            }
+        }
+        opciones.linea_base.write_text(json.dumps(nueva_base, indent=2, ensure_ascii=False), encoding='utf-8')
+        print(f"Línea base guardada en {opciones.linea_base}")
+        return 0
+    
+    regresiones = comparar(actual, base)
+    if regresiones:
+        print("\n❌ Regresiones de rendimiento:")
+        for regresion in regresiones:
+            print(f"  - {regresion}")
+        return 1
+    
+    print("\n✅ Sin regresiones respecto a la línea base")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
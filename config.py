@@ -1,7 +1,7 @@
 import os
 import json
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 
 class Config:
     """Maneja toda la configuración de la aplicación"""
@@ -34,6 +34,24 @@ class Config:
             "hacer_backup": False,
             "modo_principiante": True,
             "accion_desconocidos": "preguntar",  # preguntar, otros, ignorar
+            "umbral_aprendizaje": 3,  # Detecciones coincidentes para aprender una regla
+            "retencion_sesiones_dias": 90,  # Días que se guardan las sesiones individuales
+            "retencion_diaria_dias": 730,  # Después, el historial diario se reduce a meses
+            "nivel_log_archivo": "INFO",  # DEBUG, INFO, SUCCESS, WARNING, ERROR
+            "nivel_log_consola": "INFO",
+            "log_tamaño_maximo_mb": 5,  # Tamaño a partir del cual rota el log
+            "log_archivos_conservados": 5,  # Copias rotadas (comprimidas) que se guardan
+            "perfilado": False,  # Desglose de tiempos por etapa (también ORGANIZADOR_PERFIL=1)
+            "traza_archivo": "",  # Ruta de la traza Chrome/Perfetto (también ORGANIZADOR_TRAZA)
+            "vigilar_latencia": False,  # Registrar bloqueos de la interfaz (también ORGANIZADOR_LATENCIA=1)
+            "umbral_bloqueo_ms": 250,  # Retraso del bucle de Tk que cuenta como bloqueo
+            "eventos_estructurados": True,  # Eventos por archivo en logs/eventos.jsonl
+            "muestreo_eventos": {  # Fracción de eventos que se guardan por tipo
+                "escaneo": 0.01,
+                "clasificacion": 0.01,
+                "movimiento": 1.0,
+                "error": 1.0
+            },
             "categorias_activas": {  # Nueva opción: qué categorías organizar
                 "Documentos": True,
                 "Imágenes": True,
@@ -83,6 +101,8 @@ class Config:
         self.config = self.cargar_configuracion()
         self.categorias = self.cargar_categorias()
         self.reglas_personalizadas = self.cargar_reglas_personalizadas()
+        self.reglas_aprendidas = self.cargar_reglas_aprendidas()
+        self._aprendizaje_modificado = False
     
     def cargar_configuracion(self) -> Dict[str, Any]:
         """Carga la configuración desde archivo o crea una nueva"""
@@ -168,6 +188,73 @@ class Config:
                 self.categorias[categoria].append(extension)
                 self.guardar_categorias()
     
+    def cargar_reglas_aprendidas(self) -> Dict[str, Any]:
+        """Carga las reglas aprendidas a partir de la detección por contenido"""
+        aprendidas_file = self.config_dir / "reglas_aprendidas.json"
+        datos = {"reglas": {}, "observaciones": {}, "revocadas": []}
+        try:
+            if aprendidas_file.exists():
+                with open(aprendidas_file, 'r', encoding='utf-8') as f:
+                    datos.update(json.load(f))
+        except Exception:
+            pass
+        return datos
+    
+    def guardar_reglas_aprendidas(self, solo_si_modificado: bool = False):
+        """Guarda las reglas aprendidas y las observaciones pendientes"""
+        if solo_si_modificado and not self._aprendizaje_modificado:
+            return
+        try:
+            self.config_dir.mkdir(exist_ok=True)
+            aprendidas_file = self.config_dir / "reglas_aprendidas.json"
+            with open(aprendidas_file, 'w', encoding='utf-8') as f:
+                json.dump(self.reglas_aprendidas, f, indent=2, ensure_ascii=False)
+            self._aprendizaje_modificado = False
+        except Exception as e:
+            print(f"Error guardando reglas aprendidas: {e}")
+    
+    def registrar_deteccion(self, extension: str, categoria: Optional[str]) -> bool:
+        """Registra el resultado de una detección por contenido para una extensión.
+        
+        Cuando se acumulan suficientes detecciones coincidentes la extensión se
+        promueve a regla aprendida. Devuelve True si se acaba de aprender una regla.
+        """
+        extension = extension.lower()
+        if extension in self.reglas_aprendidas["revocadas"]:
+            return False
+        
+        observaciones = self.reglas_aprendidas["observaciones"]
+        observacion = observaciones.get(extension)
+        
+        # Una detección que no coincide reinicia la confianza
+        if observacion is None or observacion["categoria"] != categoria:
+            observacion = {"categoria": categoria, "confianza": 0}
+            observaciones[extension] = observacion
+        observacion["confianza"] += 1
+        self._aprendizaje_modificado = True
+        
+        umbral = self.config.get("umbral_aprendizaje", 3)
+        if categoria and categoria != "Otros" and observacion["confianza"] >= umbral:
+            self.reglas_aprendidas["reglas"][extension] = categoria
+            del observaciones[extension]
+            self.guardar_reglas_aprendidas()
+            return True
+        return False
+    
+    def obtener_reglas_aprendidas(self) -> Dict[str, str]:
+        """Obtiene las reglas aprendidas (extensión → categoría)"""
+        return dict(self.reglas_aprendidas["reglas"])
+    
+    def revocar_regla_aprendida(self, extension: str) -> bool:
+        """Elimina una regla aprendida y evita que se vuelva a aprender"""
+        extension = extension.lower()
+        existia = self.reglas_aprendidas["reglas"].pop(extension, None) is not None
+        self.reglas_aprendidas["observaciones"].pop(extension, None)
+        if extension not in self.reglas_aprendidas["revocadas"]:
+            self.reglas_aprendidas["revocadas"].append(extension)
+        self.guardar_reglas_aprendidas()
+        return existia
+    
     def obtener_categoria_por_extension(self, extension: str) -> str:
         """Obtiene la categoría de una extensión"""
         extension = extension.lower()
@@ -186,6 +273,12 @@ class Config:
                 if self.config.get("categorias_activas", {}).get(categoria, True):
                     return categoria
         
+        # Después las reglas aprendidas por detección de contenido
+        if extension in self.reglas_aprendidas["reglas"]:
+            categoria = self.reglas_aprendidas["reglas"][extension]
+            if self.config.get("categorias_activas", {}).get(categoria, True):
+                return categoria
+        
         # Si no está activa o no se encontró, verificar si "Otros" está activo
         if self.config.get("categorias_activas", {}).get("Otros", True):
             return "Otros"
@@ -1,13 +1,22 @@
+import itertools
 import os
 import time
+from array import array
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional, Callable
-from dataclasses import dataclass
+from typing import List, Dict, Tuple, Optional, Callable, Iterable, Iterator, Sequence, Union
 from enum import Enum
 
+try:
+    import numpy as np  # Opcional: acelera los agregados sobre el almacén
+except ImportError:
+    np = None
+
 # Importar configuración de forma segura
 from config import config
-from utils import FileUtils, logger, stats
+from utils import FileUtils, DetectorArchivosEnUso, logger, eventos, stats
+from historial import historial
+from estimacion import EstimadorRestante, modelo_rendimiento
+from perfil import perfil, trazador
 
 class EstadoArchivo(Enum):
     """Estados posibles de un archivo durante el procesamiento"""
@@ -18,147 +27,1230 @@ class EstadoArchivo(Enum):
     EN_USO = "en_uso"
     DESCONOCIDO = "desconocido"
 
-@dataclass
 class ArchivoInfo:
-    """Información completa de un archivo a procesar"""
-    ruta_origen: Path
-    nombre: str
-    extension: str
-    tamaño: int
-    categoria_sugerida: str
-    ruta_destino: Optional[Path] = None
-    estado: EstadoArchivo = EstadoArchivo.PENDIENTE
-    razon_estado: str = ""
-    es_duplicado: bool = False
-    hash_archivo: str = ""
-    fecha_modificacion: float = 0
-    
-    def __post_init__(self):
-        if self.fecha_modificacion == 0:
-            try:
-                self.fecha_modificacion = self.ruta_origen.stat().st_mtime
-            except:
-                self.fecha_modificacion = time.time()
+    """Información completa de un archivo a procesar
+    
+    El tamaño y la fecha de modificación salen de un único stat que se hace la
+    primera vez que se consultan, así los archivos descartados durante el
+    análisis (por ejemplo, de categorías desactivadas) no cuestan ninguna
+    llamada al sistema.
+    """
+    
+    __slots__ = ('ruta_origen', 'nombre', 'extension', 'categoria_sugerida', 'ruta_destino',
+                 'estado', 'razon_estado', 'es_duplicado', 'hash_archivo',
+                 '_tamaño', '_fecha_modificacion')
+    
+    def __init__(self, ruta_origen: Path, nombre: str, extension: str,
+                 tamaño: Optional[int] = None, categoria_sugerida: str = "",
+                 ruta_destino: Optional[Path] = None,
+                 estado: EstadoArchivo = EstadoArchivo.PENDIENTE,
+                 razon_estado: str = "", es_duplicado: bool = False,
+                 hash_archivo: str = "", fecha_modificacion: float = 0,
+                 stat_archivo: Optional[os.stat_result] = None):
+        self.ruta_origen = ruta_origen
+        self.nombre = nombre
+        self.extension = extension
+        self.categoria_sugerida = categoria_sugerida
+        self.ruta_destino = ruta_destino
+        self.estado = estado
+        self.razon_estado = razon_estado
+        self.es_duplicado = es_duplicado
+        self.hash_archivo = hash_archivo
+        self._tamaño = tamaño
+        self._fecha_modificacion = fecha_modificacion or None
+        
+        if stat_archivo is not None:
+            self._aplicar_stat(stat_archivo)
+    
+    def _aplicar_stat(self, stat_archivo: os.stat_result):
+        if self._tamaño is None:
+            self._tamaño = stat_archivo.st_size
+        if self._fecha_modificacion is None:
+            self._fecha_modificacion = stat_archivo.st_mtime
+    
+    @perfil.medir('stat')
+    def _cargar_stat(self):
+        """Obtiene los atributos diferidos con un solo stat"""
+        try:
+            self._aplicar_stat(self.ruta_origen.stat())
+        except OSError:
+            if self._tamaño is None:
+                self._tamaño = 0
+            if self._fecha_modificacion is None:
+                self._fecha_modificacion = time.time()
+    
+    @property
+    def tamaño(self) -> int:
+        if self._tamaño is None:
+            self._cargar_stat()
+        return self._tamaño
+    
+    @tamaño.setter
+    def tamaño(self, valor: int):
+        self._tamaño = valor
+    
+    @property
+    def fecha_modificacion(self) -> float:
+        if self._fecha_modificacion is None:
+            self._cargar_stat()
+        return self._fecha_modificacion
+    
+    @fecha_modificacion.setter
+    def fecha_modificacion(self, valor: float):
+        self._fecha_modificacion = valor
+    
+    def __repr__(self) -> str:
+        return (f"ArchivoInfo(nombre={self.nombre!r}, categoria_sugerida={self.categoria_sugerida!r}, "
+                f"estado={self.estado})")
+
+# Orden fijo de estados para guardarlos como un byte por archivo
+_ESTADOS = list(EstadoArchivo)
+_CODIGO_ESTADO = {estado: codigo for codigo, estado in enumerate(_ESTADOS)}
+
+# Marca de tamaño/fecha todavía no leídos del disco
+_SIN_CARGAR = -(1 << 63)
+
+class TablaInternada:
+    """Tabla de cadenas internadas: cada valor distinto se guarda una sola vez"""
+    
+    __slots__ = ('valores', '_indices')
+    
+    def __init__(self):
+        self.valores: List[str] = []
+        self._indices: Dict[str, int] = {}
+    
+    def indice(self, valor: str) -> int:
+        indice = self._indices.get(valor)
+        if indice is None:
+            indice = len(self.valores)
+            self._indices[valor] = indice
+            self.valores.append(valor)
+        return indice
+    
+    def buscar(self, valor: str) -> Optional[int]:
+        return self._indices.get(valor)
+    
+    def __len__(self) -> int:
+        return len(self.valores)
+
+class AlmacenArchivos:
+    """Almacén columnar compacto para los resultados de un escaneo
+    
+    En lugar de un objeto por archivo guarda columnas: carpetas, extensiones
+    y categorías internadas, estados en un bytearray y tamaños y fechas en
+    array('q'). Los valores poco frecuentes (razones, nombres sanitizados
+    distintos del original, destinos renombrados) van en diccionarios
+    dispersos. Se comporta como una secuencia de RegistroArchivo, vistas
+    ligeras con la misma interfaz que ArchivoInfo.
+    """
+    
+    def __init__(self, archivos: Iterable[ArchivoInfo] = ()):
+        self.carpetas = TablaInternada()
+        self._carpetas_path: List[Path] = []
+        self.extensiones = TablaInternada()
+        self.categorias = TablaInternada()
+        
+        self.nombres_originales: List[str] = []
+        self.carpeta_origen = array('I')
+        self.extension = array('I')
+        self.categoria = array('I')
+        self.estados = bytearray()
+        self.tamaños = array('q')
+        self.fechas_us = array('q')  # Fecha de modificación en microsegundos
+        self.carpeta_destino = array('l')  # -1 si no hay destino
+        
+        self._nombres: Dict[int, str] = {}
+        self._nombres_destino: Dict[int, str] = {}
+        self._razones: Dict[int, str] = {}
+        self._hashes: Dict[int, str] = {}
+        self._duplicados = set()
+        
+        for archivo in archivos:
+            self.agregar(archivo)
+    
+    def _indice_carpeta(self, carpeta: Path) -> int:
+        indice = self.carpetas.indice(str(carpeta))
+        if indice == len(self._carpetas_path):
+            self._carpetas_path.append(carpeta)
+        return indice
+    
+    def agregar(self, archivo: ArchivoInfo) -> int:
+        """Agrega un archivo al almacén y devuelve su índice"""
+        i = len(self.nombres_originales)
+        ruta = archivo.ruta_origen
+        nombre_original = ruta.name
+        
+        self.nombres_originales.append(nombre_original)
+        self.carpeta_origen.append(self._indice_carpeta(ruta.parent))
+        self.extension.append(self.extensiones.indice(archivo.extension))
+        self.categoria.append(self.categorias.indice(archivo.categoria_sugerida))
+        self.estados.append(_CODIGO_ESTADO[archivo.estado])
+        
+        # No forzar el stat de los atributos diferidos de ArchivoInfo
+        if isinstance(archivo, ArchivoInfo):
+            tamaño, fecha = archivo._tamaño, archivo._fecha_modificacion
+        else:
+            tamaño, fecha = archivo.tamaño, archivo.fecha_modificacion
+        self.tamaños.append(_SIN_CARGAR if tamaño is None else tamaño)
+        self.fechas_us.append(_SIN_CARGAR if fecha is None else int(fecha * 1_000_000))
+        self.carpeta_destino.append(-1)
+        
+        if archivo.nombre != nombre_original:
+            self._nombres[i] = archivo.nombre
+        if archivo.ruta_destino is not None:
+            self._asignar_destino(i, archivo.ruta_destino)
+        if archivo.razon_estado:
+            self._razones[i] = archivo.razon_estado
+        if archivo.hash_archivo:
+            self._hashes[i] = archivo.hash_archivo
+        if archivo.es_duplicado:
+            self._duplicados.add(i)
+        return i
+    
+    def extend(self, archivos: Iterable[ArchivoInfo]):
+        for archivo in archivos:
+            self.agregar(archivo)
+    
+    append = agregar
+    
+    def _asignar_destino(self, i: int, ruta_destino: Optional[Path]):
+        if ruta_destino is None:
+            self.carpeta_destino[i] = -1
+            self._nombres_destino.pop(i, None)
+            return
+        
+        self.carpeta_destino[i] = self._indice_carpeta(ruta_destino.parent)
+        if ruta_destino.name != self._nombres.get(i, self.nombres_originales[i]):
+            self._nombres_destino[i] = ruta_destino.name
+        else:
+            self._nombres_destino.pop(i, None)
+    
+    @perfil.medir('stat')
+    def _cargar_stat(self, i: int):
+        """Lee del disco el tamaño y la fecha de un archivo diferido"""
+        ruta = self._carpetas_path[self.carpeta_origen[i]] / self.nombres_originales[i]
+        try:
+            stat_archivo = ruta.stat()
+            tamaño, fecha = stat_archivo.st_size, stat_archivo.st_mtime
+        except OSError:
+            tamaño, fecha = 0, time.time()
+        if self.tamaños[i] == _SIN_CARGAR:
+            self.tamaños[i] = tamaño
+        if self.fechas_us[i] == _SIN_CARGAR:
+            self.fechas_us[i] = int(fecha * 1_000_000)
+    
+    @property
+    def almacen(self) -> 'AlmacenArchivos':
+        return self
+    
+    def seleccion(self, indices: Iterable[int] = ()) -> 'SeleccionArchivos':
+        """Crea una selección (lista de índices) sobre este almacén"""
+        return SeleccionArchivos(self, indices)
+    
+    # ------------------------------------------------------------------
+    # Agregados vectorizados (NumPy si está instalado, Python puro si no)
+    # ------------------------------------------------------------------
+    
+    def _np(self, columna) -> 'np.ndarray':
+        """Vista NumPy sin copia de una columna (no debe sobrevivir a la llamada)"""
+        if isinstance(columna, bytearray):
+            return np.frombuffer(columna, dtype=np.uint8)
+        return np.frombuffer(columna, dtype=np.dtype(columna.typecode))
+    
+    def _seleccion_np(self, indices: 'np.ndarray') -> 'SeleccionArchivos':
+        seleccion = SeleccionArchivos(self)
+        seleccion.indices.frombytes(indices.astype(np.int64).tobytes())
+        return seleccion
+    
+    def contar_estados(self) -> Dict[EstadoArchivo, int]:
+        """Cuenta los archivos de cada estado"""
+        return {estado: self.estados.count(codigo) for codigo, estado in enumerate(_ESTADOS)}
+    
+    def tamaño_total(self, solo_validos: bool = True) -> int:
+        """Suma los tamaños (por defecto sin contar los archivos ignorados)"""
+        ignorado = _CODIGO_ESTADO[EstadoArchivo.IGNORADO]
+        if np is not None:
+            tamaños = self._np(self.tamaños)
+            mascara = tamaños != _SIN_CARGAR
+            if solo_validos:
+                mascara &= self._np(self.estados) != ignorado
+            return int(tamaños[mascara].sum())
+        
+        return sum(
+            tamaño for tamaño, estado in zip(self.tamaños, self.estados)
+            if tamaño != _SIN_CARGAR and not (solo_validos and estado == ignorado)
+        )
+    
+    def totales_por_categoria(self, solo_validos: bool = True) -> Dict[str, Tuple[int, int]]:
+        """Devuelve {categoría: (archivos, bytes)}"""
+        ignorado = _CODIGO_ESTADO[EstadoArchivo.IGNORADO]
+        n_categorias = len(self.categorias)
+        
+        if np is not None:
+            categorias = self._np(self.categoria)
+            tamaños = self._np(self.tamaños)
+            estados = self._np(self.estados)
+            mascara = estados != ignorado if solo_validos else np.ones(len(self), dtype=bool)
+            pesos = np.where(tamaños == _SIN_CARGAR, 0, tamaños)[mascara]
+            archivos = np.bincount(categorias[mascara], minlength=n_categorias)
+            bytes_categoria = np.bincount(categorias[mascara], weights=pesos, minlength=n_categorias)
+            conteos = archivos.tolist()
+            sumas = [int(b) for b in bytes_categoria.tolist()]
+        else:
+            conteos = [0] * n_categorias
+            sumas = [0] * n_categorias
+            for categoria, tamaño, estado in zip(self.categoria, self.tamaños, self.estados):
+                if solo_validos and estado == ignorado:
+                    continue
+                conteos[categoria] += 1
+                if tamaño != _SIN_CARGAR:
+                    sumas[categoria] += tamaño
+        
+        return {
+            self.categorias.valores[c]: (conteos[c], sumas[c])
+            for c in range(n_categorias) if conteos[c]
+        }
+    
+    def totales_por_ruta(self, indices: Optional[Iterable[int]] = None) -> List[Tuple[Path, Path, int, int]]:
+        """Devuelve [(carpeta origen, carpeta destino, archivos, bytes)] de los archivos con destino
+        
+        No cuenta los ignorados. Es la entrada del modelo de duración: lo
+        que cuesta mover depende de entre qué carpetas (y dispositivos) se mueve.
+        """
+        ignorado = _CODIGO_ESTADO[EstadoArchivo.IGNORADO]
+        
+        if np is not None and indices is None:
+            destinos = self._np(self.carpeta_destino)
+            tamaños = self._np(self.tamaños)
+            mascara = (destinos >= 0) & (self._np(self.estados) != ignorado)
+            claves = self._np(self.carpeta_origen)[mascara].astype(np.int64) * len(self.carpetas) + destinos[mascara]
+            unicas, inversa = np.unique(claves, return_inverse=True)
+            archivos = np.bincount(inversa, minlength=len(unicas)).tolist()
+            pesos = np.where(tamaños == _SIN_CARGAR, 0, tamaños)[mascara]
+            bytes_ruta = np.bincount(inversa, weights=pesos, minlength=len(unicas)).tolist()
+            totales = {int(clave): [n, int(b)] for clave, n, b in zip(unicas.tolist(), archivos, bytes_ruta)}
+        else:
+            totales: Dict[int, List[int]] = {}
+            for i in (range(len(self)) if indices is None else indices):
+                destino = self.carpeta_destino[i]
+                if destino < 0 or self.estados[i] == ignorado:
+                    continue
+                total = totales.setdefault(self.carpeta_origen[i] * len(self.carpetas) + destino, [0, 0])
+                total[0] += 1
+                if self.tamaños[i] != _SIN_CARGAR:
+                    total[1] += self.tamaños[i]
+        
+        carpetas = self._carpetas_path
+        return [(carpetas[clave // len(self.carpetas)], carpetas[clave % len(self.carpetas)], n, b)
+                for clave, (n, b) in totales.items()]
+    
+    def histograma_antiguedad(self, limites_dias: Tuple[float, ...] = (1, 7, 30, 90, 365),
+                              ahora: Optional[float] = None,
+                              solo_validos: bool = True) -> List[Tuple[float, float, int, int]]:
+        """Agrupa los archivos por antigüedad en días
+        
+        Devuelve una lista de (desde_días, hasta_días, archivos, bytes) con un
+        tramo por cada límite más uno final hasta infinito.
+        """
+        from bisect import bisect_right
+        
+        ahora_us = int((ahora if ahora is not None else time.time()) * 1_000_000)
+        limites_us = [int(d * 86_400_000_000) for d in limites_dias]
+        tramos = len(limites_us) + 1
+        ignorado = _CODIGO_ESTADO[EstadoArchivo.IGNORADO]
+        
+        if np is not None:
+            fechas = self._np(self.fechas_us)
+            tamaños = self._np(self.tamaños)
+            mascara = fechas != _SIN_CARGAR
+            if solo_validos:
+                mascara &= self._np(self.estados) != ignorado
+            edades = ahora_us - fechas[mascara]
+            tramo = np.searchsorted(np.asarray(limites_us, dtype=np.int64), edades, side='right')
+            pesos = np.where(tamaños == _SIN_CARGAR, 0, tamaños)[mascara]
+            archivos = np.bincount(tramo, minlength=tramos).tolist()
+            bytes_tramo = [int(b) for b in np.bincount(tramo, weights=pesos, minlength=tramos).tolist()]
+        else:
+            archivos = [0] * tramos
+            bytes_tramo = [0] * tramos
+            for fecha, tamaño, estado in zip(self.fechas_us, self.tamaños, self.estados):
+                if fecha == _SIN_CARGAR or (solo_validos and estado == ignorado):
+                    continue
+                tramo = bisect_right(limites_us, ahora_us - fecha)
+                archivos[tramo] += 1
+                if tamaño != _SIN_CARGAR:
+                    bytes_tramo[tramo] += tamaño
+        
+        bordes = [0.0] + [float(d) for d in limites_dias] + [float('inf')]
+        return [(bordes[t], bordes[t + 1], archivos[t], bytes_tramo[t]) for t in range(tramos)]
+    
+    def filtrar(self, tamaño_min: Optional[int] = None, tamaño_max: Optional[int] = None,
+                antiguedad_min_dias: Optional[float] = None, antiguedad_max_dias: Optional[float] = None,
+                estados: Optional[Iterable[EstadoArchivo]] = None,
+                categorias: Optional[Iterable[str]] = None,
+                ahora: Optional[float] = None) -> 'SeleccionArchivos':
+        """Selecciona los archivos que cumplen reglas de tamaño, antigüedad, estado y categoría
+        
+        Los criterios de tamaño y antigüedad solo se aplican a archivos cuyo
+        stat ya se hizo; los diferidos no los cumplen.
+        """
+        ahora_us = int((ahora if ahora is not None else time.time()) * 1_000_000)
+        codigos_estado = None if estados is None else {_CODIGO_ESTADO[e] for e in estados}
+        codigos_categoria = None
+        if categorias is not None:
+            codigos_categoria = {c for c in map(self.categorias.buscar, categorias) if c is not None}
+        
+        fecha_max = None if antiguedad_min_dias is None else ahora_us - int(antiguedad_min_dias * 86_400_000_000)
+        fecha_min = None if antiguedad_max_dias is None else ahora_us - int(antiguedad_max_dias * 86_400_000_000)
+        usa_tamaño = tamaño_min is not None or tamaño_max is not None
+        usa_fecha = fecha_min is not None or fecha_max is not None
+        
+        if np is not None:
+            mascara = np.ones(len(self), dtype=bool)
+            if codigos_estado is not None:
+                mascara &= np.isin(self._np(self.estados), list(codigos_estado))
+            if codigos_categoria is not None:
+                mascara &= np.isin(self._np(self.categoria), list(codigos_categoria))
+            if usa_tamaño:
+                tamaños = self._np(self.tamaños)
+                mascara &= tamaños != _SIN_CARGAR
+                if tamaño_min is not None:
+                    mascara &= tamaños >= tamaño_min
+                if tamaño_max is not None:
+                    mascara &= tamaños <= tamaño_max
+            if usa_fecha:
+                fechas = self._np(self.fechas_us)
+                mascara &= fechas != _SIN_CARGAR
+                if fecha_max is not None:
+                    mascara &= fechas <= fecha_max
+                if fecha_min is not None:
+                    mascara &= fechas >= fecha_min
+            return self._seleccion_np(np.flatnonzero(mascara))
+        
+        def cumple(i: int) -> bool:
+            if codigos_estado is not None and self.estados[i] not in codigos_estado:
+                return False
+            if codigos_categoria is not None and self.categoria[i] not in codigos_categoria:
+                return False
+            if usa_tamaño:
+                tamaño = self.tamaños[i]
+                if tamaño == _SIN_CARGAR:
+                    return False
+                if (tamaño_min is not None and tamaño < tamaño_min) or (tamaño_max is not None and tamaño > tamaño_max):
+                    return False
+            if usa_fecha:
+                fecha = self.fechas_us[i]
+                if fecha == _SIN_CARGAR:
+                    return False
+                if (fecha_max is not None and fecha > fecha_max) or (fecha_min is not None and fecha < fecha_min):
+                    return False
+            return True
+        
+        return SeleccionArchivos(self, filter(cumple, range(len(self))))
+    
+    def agrupar_por_categoria(self, excluir_estados: Iterable[EstadoArchivo] = ()) -> Dict[str, 'SeleccionArchivos']:
+        """Agrupa los índices por categoría (en orden de aparición de cada categoría)"""
+        excluidos = {_CODIGO_ESTADO[e] for e in excluir_estados}
+        
+        if np is not None:
+            categorias = self._np(self.categoria)
+            mascara = ~np.isin(self._np(self.estados), list(excluidos)) if excluidos else np.ones(len(self), dtype=bool)
+            indices = np.flatnonzero(mascara)
+            codigos = categorias[indices]
+            orden = np.argsort(codigos, kind='stable')
+            codigos_ordenados = codigos[orden]
+            presentes, inicios = np.unique(codigos_ordenados, return_index=True)
+            grupos = {}
+            for codigo, trozo in zip(presentes.tolist(), np.split(indices[orden], inicios[1:])):
+                grupos[codigo] = self._seleccion_np(trozo)
+            primera_aparicion = {codigo: int(grupos[codigo].indices[0]) for codigo in grupos}
+            return {
+                self.categorias.valores[codigo]: grupos[codigo]
+                for codigo in sorted(grupos, key=primera_aparicion.get)
+            }
+        
+        grupos: Dict[int, SeleccionArchivos] = {}
+        for i, (codigo, estado) in enumerate(zip(self.categoria, self.estados)):
+            if estado in excluidos:
+                continue
+            grupo = grupos.get(codigo)
+            if grupo is None:
+                grupo = grupos[codigo] = SeleccionArchivos(self)
+            grupo.indices.append(i)
+        return {self.categorias.valores[codigo]: grupo for codigo, grupo in grupos.items()}
+    
+    # ------------------------------------------------------------------
+    # Comparación entre escaneos
+    # ------------------------------------------------------------------
+    
+    def claves(self) -> Dict[Tuple[str, str], int]:
+        """Devuelve {(carpeta, nombre original): índice}, la identidad de cada archivo"""
+        carpetas = self.carpetas.valores
+        return {(carpetas[c], nombre): i
+                for i, (c, nombre) in enumerate(zip(self.carpeta_origen, self.nombres_originales))}
+    
+    def _firma(self, i: int) -> tuple:
+        """Lo que se muestra de un archivo, salvo tamaño y fecha (pueden estar sin cargar)"""
+        return (self.extensiones.valores[self.extension[i]], self.categorias.valores[self.categoria[i]],
+                self.estados[i], self._nombres.get(i))
+    
+    def comparar_con(self, anterior: 'AlmacenArchivos') -> 'DiferenciasAlmacen':
+        """Calcula qué archivos se han añadido, eliminado o cambiado desde `anterior`
+        
+        Los archivos se identifican por carpeta y nombre original. Un tamaño o
+        una fecha sin cargar en cualquiera de los dos escaneos no cuenta como
+        cambio.
+        """
+        anteriores = anterior.claves()
+        diferencias = DiferenciasAlmacen()
+        
+        for clave, i in self.claves().items():
+            j = anteriores.pop(clave, None)
+            if j is None:
+                diferencias.insertados.append(i)
+                continue
+            
+            diferencias.correspondencia[j] = i
+            if (self._firma(i) != anterior._firma(j)
+                    or not _iguales_o_sin_cargar(self.tamaños[i], anterior.tamaños[j])
+                    or not _iguales_o_sin_cargar(self.fechas_us[i], anterior.fechas_us[j])):
+                diferencias.actualizados.append(i)
+        
+        diferencias.eliminados.extend(sorted(anteriores.values()))
+        return diferencias
+    
+    def __len__(self) -> int:
+        return len(self.nombres_originales)
+    
+    def __getitem__(self, indice: Union[int, slice]):
+        if isinstance(indice, slice):
+            return [RegistroArchivo(self, i) for i in range(len(self))[indice]]
+        if indice < 0:
+            indice += len(self)
+        if not 0 <= indice < len(self):
+            raise IndexError(indice)
+        return RegistroArchivo(self, indice)
+    
+    def __iter__(self) -> Iterator['RegistroArchivo']:
+        for i in range(len(self)):
+            yield RegistroArchivo(self, i)
+
+def _iguales_o_sin_cargar(a: int, b: int) -> bool:
+    return a == b or a == _SIN_CARGAR or b == _SIN_CARGAR
+
+class DiferenciasAlmacen:
+    """Cambios entre dos escaneos: índices del anterior y del nuevo almacén"""
+    
+    __slots__ = ('correspondencia', 'insertados', 'eliminados', 'actualizados')
+    
+    def __init__(self):
+        self.correspondencia: Dict[int, int] = {}  # índice anterior -> índice nuevo
+        self.insertados: List[int] = []  # Índices del nuevo almacén
+        self.eliminados: List[int] = []  # Índices del almacén anterior
+        self.actualizados: List[int] = []  # Índices del nuevo almacén
+    
+    @property
+    def vacia(self) -> bool:
+        """True si no hay cambios y cada archivo conserva su índice"""
+        return (not self.insertados and not self.eliminados and not self.actualizados
+                and all(j == i for j, i in self.correspondencia.items()))
+    
+    def __repr__(self) -> str:
+        return (f"DiferenciasAlmacen(insertados={len(self.insertados)}, eliminados={len(self.eliminados)}, "
+                f"actualizados={len(self.actualizados)})")
+
+class SeleccionArchivos:
+    """Subconjunto de un AlmacenArchivos guardado como array de índices"""
+    
+    __slots__ = ('almacen', 'indices')
+    
+    def __init__(self, almacen: AlmacenArchivos, indices: Iterable[int] = ()):
+        self.almacen = almacen
+        self.indices = array('q', indices)
+    
+    def append(self, registro: 'RegistroArchivo'):
+        if registro._almacen is not self.almacen:
+            raise ValueError("El registro pertenece a otro almacén")
+        self.indices.append(registro._i)
+    
+    def __len__(self) -> int:
+        return len(self.indices)
+    
+    def __getitem__(self, indice: Union[int, slice]):
+        if isinstance(indice, slice):
+            return [RegistroArchivo(self.almacen, i) for i in self.indices[indice]]
+        return RegistroArchivo(self.almacen, self.indices[indice])
+    
+    def __iter__(self) -> Iterator['RegistroArchivo']:
+        almacen = self.almacen
+        for i in self.indices:
+            yield RegistroArchivo(almacen, i)
+    
+    def totales_por(self, columna: str = 'categoria') -> Dict[str, Tuple[int, int]]:
+        """Devuelve {valor: (archivos, bytes)} agrupando por 'categoria' o 'extension'"""
+        almacen = self.almacen
+        codigos = getattr(almacen, columna)
+        valores = (almacen.categorias if columna == 'categoria' else almacen.extensiones).valores
+        tamaños = almacen.tamaños
+        
+        totales: Dict[int, List[int]] = {}
+        for i in self.indices:
+            total = totales.setdefault(codigos[i], [0, 0])
+            total[0] += 1
+            if tamaños[i] != _SIN_CARGAR:
+                total[1] += tamaños[i]
+        return {valores[c]: (n, b) for c, (n, b) in totales.items()}
+    
+    def agrupar_por(self, columna: str = 'extension') -> Dict[str, 'SeleccionArchivos']:
+        """Divide la selección en {valor: selección} por 'categoria' o 'extension' (grupos más grandes primero)"""
+        almacen = self.almacen
+        codigos = getattr(almacen, columna)
+        valores = (almacen.categorias if columna == 'categoria' else almacen.extensiones).valores
+        
+        grupos: Dict[int, SeleccionArchivos] = {}
+        for i in self.indices:
+            grupo = grupos.get(codigos[i])
+            if grupo is None:
+                grupo = grupos[codigos[i]] = SeleccionArchivos(almacen)
+            grupo.indices.append(i)
+        return {valores[c]: grupo for c, grupo in sorted(grupos.items(), key=lambda x: -len(x[1]))}
+
+class BuscadorNombres:
+    """Filtro incremental por subcadena del nombre sobre un AlmacenArchivos
+    
+    Los nombres en minúsculas se calculan una vez, la primera vez que se
+    busca. Con NumPy se unen además en un solo búfer UTF-8 separado por
+    ceros y la subcadena se busca de una vez en todo el búfer; cada
+    coincidencia se lleva a su fila con searchsorted sobre los inicios.
+    Cada búsqueda se recuerda por clave: si el texto nuevo amplía el
+    anterior (el usuario sigue escribiendo) solo se busca entre los
+    resultados anteriores.
+    """
+    
+    def __init__(self, almacen: AlmacenArchivos):
+        self.almacen = almacen
+        self._minusculas: Optional[List[str]] = None
+        self._bufer: Optional[Tuple['np.ndarray', 'np.ndarray']] = None
+        self._ultimas: Dict[object, Tuple[Sequence[int], str, Sequence[int]]] = {}
+    
+    def nombres(self) -> List[str]:
+        """Nombres mostrados (sanitizados) en minúsculas, por índice del almacén"""
+        if self._minusculas is None or len(self._minusculas) != len(self.almacen):
+            almacen = self.almacen
+            minusculas = [nombre.lower() for nombre in almacen.nombres_originales]
+            for i, nombre in almacen._nombres.items():
+                minusculas[i] = nombre.lower()
+            self._minusculas = minusculas
+            self._bufer = None
+            self._ultimas.clear()
+        return self._minusculas
+    
+    def preparar(self):
+        """Calcula de antemano lo que usa la búsqueda (desde un hilo de trabajo)"""
+        self.nombres()
+        if np is not None:
+            self._bufer_nombres()
+    
+    def _bufer_nombres(self) -> Tuple['np.ndarray', 'np.ndarray']:
+        """Nombres en minúsculas unidos por ceros como uint8 y el inicio de cada uno"""
+        nombres = self.nombres()
+        if self._bufer is None:
+            # Un nombre de archivo no puede contener el carácter nulo
+            bufer = np.frombuffer(('\0'.join(nombres) + '\0').encode('utf-8', 'surrogateescape'), dtype=np.uint8)
+            inicios = np.empty(len(nombres), dtype=np.int64)
+            if len(nombres):
+                inicios[0] = 0
+                inicios[1:] = np.flatnonzero(bufer == 0)[:-1] + 1
+            self._bufer = (bufer, inicios)
+        return self._bufer
+    
+    def _filas_con(self, texto: str) -> 'np.ndarray':
+        """Máscara por fila de los nombres que contienen `texto` (ya en minúsculas)"""
+        bufer, inicios = self._bufer_nombres()
+        patron = np.frombuffer(texto.encode('utf-8', 'surrogateescape'), dtype=np.uint8)
+        # Posiciones donde encaja el primer byte, y de ahí se descartan byte a byte
+        posiciones = np.flatnonzero(bufer[:max(len(bufer) - len(patron) + 1, 0)] == patron[0])
+        for desplazamiento in range(1, len(patron)):
+            posiciones = posiciones[bufer[posiciones + desplazamiento] == patron[desplazamiento]]
+        
+        # Se busca el lado con menos elementos: las coincidencias entre los
+        # inicios o, si hay más coincidencias que nombres, los inicios entre ellas
+        if len(posiciones) <= len(inicios):
+            mascara = np.zeros(len(inicios), dtype=bool)
+            mascara[np.searchsorted(inicios, posiciones, side='right') - 1] = True
+            return mascara
+        limites = np.searchsorted(posiciones, np.append(inicios, len(bufer)))
+        return limites[1:] > limites[:-1]
+    
+    def filtrar(self, indices: Sequence[int], texto: str, clave: object = None) -> Sequence[int]:
+        """Índices de `indices` cuyo nombre contiene `texto` (sin distinguir mayúsculas)"""
+        texto = texto.strip().lower()
+        if not texto:
+            return indices
+        
+        nombres = self.nombres()
+        base = indices
+        ultima = self._ultimas.get(clave)
+        if ultima is not None and ultima[0] is indices and texto.startswith(ultima[1]):
+            if texto == ultima[1]:
+                return ultima[2]
+            base = ultima[2]
+        
+        if np is not None:
+            if isinstance(base, range):
+                base_np = np.arange(base.start, base.stop, base.step, dtype=np.int64)
+            elif isinstance(base, array):
+                base_np = self.almacen._np(base) if len(base) else np.empty(0, dtype=np.int64)
+            else:
+                base_np = np.asarray(base, dtype=np.int64)
+            resultado = array('q')
+            resultado.frombytes(base_np[self._filas_con(texto)[base_np]].tobytes())
+        else:
+            resultado = [i for i in base if texto in nombres[i]]
+        self._ultimas[clave] = (indices, texto, resultado)
+        return resultado
+    
+    def invalidar(self):
+        """Olvida los nombres calculados (el almacén ha cambiado)"""
+        self._minusculas = None
+        self._bufer = None
+        self._ultimas.clear()
+
+class IndiceAlmacen:
+    """Órdenes y filtros precalculados sobre un AlmacenArchivos para la lista de archivos
+    
+    El orden de cada columna se calcula una vez con una clave numérica (o
+    los nombres en minúsculas) y se guarda; el descendente es el mismo
+    recorrido al revés. Los índices de cada estado y de cada categoría se
+    agrupan en una sola pasada. Filtrar es recorrer el orden guardado
+    quedándose con los que están en la máscara, y la búsqueda por nombre
+    es incremental (BuscadorNombres). Si el almacén crece, todo se
+    recalcula en la siguiente consulta.
+    """
+    
+    COLUMNAS = ('nombre', 'extension', 'tamaño', 'categoria', 'estado')
+    
+    def __init__(self, almacen: AlmacenArchivos):
+        self.almacen = almacen
+        self.buscador = BuscadorNombres(almacen)
+        self._reiniciar()
+    
+    def _reiniciar(self):
+        self._n = len(self.almacen)
+        self._ordenes: Dict[Tuple[str, bool], array] = {}
+        self._por_estado: Optional[Dict[EstadoArchivo, array]] = None
+        self._por_categoria: Optional[Dict[str, array]] = None
+        self._ultimo_filtro: Optional[Tuple[tuple, Sequence[int]]] = None
+    
+    def _comprobar(self):
+        if len(self.almacen) != self._n:
+            self.buscador.invalidar()
+            self._reiniciar()
+    
+    def preparar(self, columna: Optional[str] = None):
+        """Calcula de antemano nombres, grupos y el orden de `columna` (desde un hilo de trabajo)"""
+        self._comprobar()
+        self.buscador.preparar()
+        self.indices_estado(EstadoArchivo.PENDIENTE)
+        self.indices_categoria(None)
+        if columna is not None:
+            self.orden(columna)
+    
+    def _claves(self, columna: str) -> Sequence[int]:
+        """Clave entera por archivo que ordena igual que la columna"""
+        almacen = self.almacen
+        if columna == 'tamaño':
+            return almacen._np(almacen.tamaños) if np is not None else almacen.tamaños
+        if columna == 'estado':
+            valores, codigos = [estado.value for estado in _ESTADOS], almacen.estados
+        elif columna == 'extension':
+            valores, codigos = almacen.extensiones.valores, almacen.extension
+        else:
+            valores, codigos = almacen.categorias.valores, almacen.categoria
+        
+        # Posición de cada valor internado en orden alfabético
+        posicion = [0] * len(valores)
+        for rango, codigo in enumerate(sorted(range(len(valores)), key=valores.__getitem__)):
+            posicion[codigo] = rango
+        if np is not None:
+            return np.asarray(posicion, dtype=np.int64)[almacen._np(codigos)]
+        return [posicion[c] for c in codigos]
+    
+    def orden(self, columna: Optional[str] = None, descendente: bool = False) -> Sequence[int]:
+        """Índices del almacén ordenados por `columna` (en orden de escaneo si es None)"""
+        self._comprobar()
+        if columna is None:
+            return range(self._n)
+        
+        guardado = self._ordenes.get((columna, descendente))
+        if guardado is not None:
+            return guardado
+        
+        ascendente = self._ordenes.get((columna, False))
+        if ascendente is None:
+            if columna not in self.COLUMNAS:
+                raise ValueError(f"Columna de orden desconocida: {columna}")
+            if columna == 'nombre':
+                nombres = self.buscador.nombres()
+                ascendente = array('q', sorted(range(self._n), key=nombres.__getitem__))
+            elif np is not None:
+                ascendente = array('q')
+                ascendente.frombytes(np.argsort(self._claves(columna), kind='stable').astype(np.int64).tobytes())
+            else:
+                claves = self._claves(columna)
+                ascendente = array('q', sorted(range(self._n), key=claves.__getitem__))
+            self._ordenes[(columna, False)] = ascendente
+        
+        if descendente:
+            self._ordenes[(columna, True)] = ascendente[::-1]
+        return self._ordenes[(columna, descendente)]
+    
+    def indices_estado(self, estado: EstadoArchivo) -> array:
+        """Índices (en orden de escaneo) de los archivos con ese estado"""
+        self._comprobar()
+        if self._por_estado is None:
+            grupos = self._agrupar(self.almacen.estados, len(_ESTADOS))
+            self._por_estado = {_ESTADOS[c]: indices for c, indices in grupos.items()}
+        return self._por_estado.get(estado, array('q'))
+    
+    def indices_categoria(self, categoria: str) -> array:
+        """Índices (en orden de escaneo) de los archivos de esa categoría"""
+        self._comprobar()
+        if self._por_categoria is None:
+            grupos = self._agrupar(self.almacen.categoria, len(self.almacen.categorias))
+            self._por_categoria = {self.almacen.categorias.valores[c]: indices for c, indices in grupos.items()}
+        return self._por_categoria.get(categoria, array('q'))
+    
+    def _agrupar(self, codigos: Sequence[int], n_codigos: int) -> Dict[int, array]:
+        grupos: Dict[int, array] = {}
+        if np is not None:
+            columna = self.almacen._np(codigos)
+            orden = np.argsort(columna, kind='stable')
+            limites = np.searchsorted(columna[orden], np.arange(n_codigos + 1))
+            for codigo in range(n_codigos):
+                if limites[codigo] < limites[codigo + 1]:
+                    indices = grupos[codigo] = array('q')
+                    indices.frombytes(orden[limites[codigo]:limites[codigo + 1]].astype(np.int64).tobytes())
+            return grupos
+        
+        for i, codigo in enumerate(codigos):
+            indices = grupos.get(codigo)
+            if indices is None:
+                indices = grupos[codigo] = array('q')
+            indices.append(i)
+        return grupos
+    
+    def filtrar(self, columna: Optional[str] = None, descendente: bool = False,
+                estados: Optional[Iterable[EstadoArchivo]] = None,
+                categorias: Optional[Iterable[str]] = None, texto: str = "") -> Sequence[int]:
+        """Índices ordenados por `columna` que cumplen estado, categoría y texto en el nombre"""
+        self._comprobar()
+        estados = tuple(estados) if estados else ()
+        categorias = tuple(categorias) if categorias else ()
+        clave = (columna, descendente, estados, categorias)
+        
+        if self._ultimo_filtro is not None and self._ultimo_filtro[0] == clave:
+            indices = self._ultimo_filtro[1]
+        else:
+            indices = self._filtrar_grupos(columna, descendente, estados, categorias)
+            self._ultimo_filtro = (clave, indices)
+        return self.buscador.filtrar(indices, texto, clave='filtro')
+    
+    def _filtrar_grupos(self, columna: Optional[str], descendente: bool,
+                        estados: Tuple[EstadoArchivo, ...], categorias: Tuple[str, ...]) -> Sequence[int]:
+        orden = self.orden(columna, descendente)
+        grupos = [[self.indices_estado(e) for e in estados], [self.indices_categoria(c) for c in categorias]]
+        grupos = [g for g in grupos if g]
+        if not grupos:
+            return orden
+        
+        # Un solo criterio sin orden: la lista del grupo ya es el resultado
+        if columna is None and len(grupos) == 1 and len(grupos[0]) == 1:
+            return grupos[0][0]
+        
+        if np is not None:
+            mascara = np.ones(self._n, dtype=bool)
+            for grupo in grupos:
+                dentro = np.zeros(self._n, dtype=bool)
+                for indices in grupo:
+                    dentro[self.almacen._np(indices)] = True
+                mascara &= dentro
+            orden_np = np.arange(self._n) if columna is None else self.almacen._np(orden)
+            resultado = array('q')
+            resultado.frombytes(orden_np[mascara[orden_np]].astype(np.int64).tobytes())
+            return resultado
+        
+        mascara = bytearray(self._n)
+        for grupo in grupos:
+            for indices in grupo:
+                for i in indices:
+                    mascara[i] += 1
+        return array('q', (i for i in orden if mascara[i] == len(grupos)))
+
+class RegistroArchivo:
+    """Vista ligera de una fila de AlmacenArchivos con la interfaz de ArchivoInfo"""
+    
+    __slots__ = ('_almacen', '_i')
+    
+    def __init__(self, almacen: AlmacenArchivos, indice: int):
+        self._almacen = almacen
+        self._i = indice
+    
+    @property
+    def indice(self) -> int:
+        return self._i
+    
+    @property
+    def ruta_origen(self) -> Path:
+        a = self._almacen
+        return a._carpetas_path[a.carpeta_origen[self._i]] / a.nombres_originales[self._i]
+    
+    @property
+    def nombre(self) -> str:
+        a = self._almacen
+        return a._nombres.get(self._i, a.nombres_originales[self._i])
+    
+    @nombre.setter
+    def nombre(self, valor: str):
+        a = self._almacen
+        if valor != a.nombres_originales[self._i]:
+            a._nombres[self._i] = valor
+        else:
+            a._nombres.pop(self._i, None)
+    
+    @property
+    def extension(self) -> str:
+        a = self._almacen
+        return a.extensiones.valores[a.extension[self._i]]
+    
+    @extension.setter
+    def extension(self, valor: str):
+        self._almacen.extension[self._i] = self._almacen.extensiones.indice(valor)
+    
+    @property
+    def categoria_sugerida(self) -> str:
+        a = self._almacen
+        return a.categorias.valores[a.categoria[self._i]]
+    
+    @categoria_sugerida.setter
+    def categoria_sugerida(self, valor: str):
+        self._almacen.categoria[self._i] = self._almacen.categorias.indice(valor)
+    
+    @property
+    def estado(self) -> EstadoArchivo:
+        return _ESTADOS[self._almacen.estados[self._i]]
+    
+    @estado.setter
+    def estado(self, valor: EstadoArchivo):
+        self._almacen.estados[self._i] = _CODIGO_ESTADO[valor]
+    
+    @property
+    def tamaño(self) -> int:
+        a = self._almacen
+        if a.tamaños[self._i] == _SIN_CARGAR:
+            a._cargar_stat(self._i)
+        return a.tamaños[self._i]
+    
+    @tamaño.setter
+    def tamaño(self, valor: int):
+        self._almacen.tamaños[self._i] = valor
+    
+    @property
+    def fecha_modificacion(self) -> float:
+        a = self._almacen
+        if a.fechas_us[self._i] == _SIN_CARGAR:
+            a._cargar_stat(self._i)
+        return a.fechas_us[self._i] / 1_000_000
+    
+    @fecha_modificacion.setter
+    def fecha_modificacion(self, valor: float):
+        self._almacen.fechas_us[self._i] = int(valor * 1_000_000)
+    
+    @property
+    def ruta_destino(self) -> Optional[Path]:
+        a = self._almacen
+        carpeta = a.carpeta_destino[self._i]
+        if carpeta < 0:
+            return None
+        nombre = a._nombres_destino.get(self._i) or self.nombre
+        return a._carpetas_path[carpeta] / nombre
+    
+    @ruta_destino.setter
+    def ruta_destino(self, valor: Optional[Path]):
+        self._almacen._asignar_destino(self._i, valor)
+    
+    @property
+    def razon_estado(self) -> str:
+        return self._almacen._razones.get(self._i, "")
+    
+    @razon_estado.setter
+    def razon_estado(self, valor: str):
+        if valor:
+            self._almacen._razones[self._i] = valor
+        else:
+            self._almacen._razones.pop(self._i, None)
+    
+    @property
+    def hash_archivo(self) -> str:
+        return self._almacen._hashes.get(self._i, "")
+    
+    @hash_archivo.setter
+    def hash_archivo(self, valor: str):
+        if valor:
+            self._almacen._hashes[self._i] = valor
+        else:
+            self._almacen._hashes.pop(self._i, None)
+    
+    @property
+    def es_duplicado(self) -> bool:
+        return self._i in self._almacen._duplicados
+    
+    @es_duplicado.setter
+    def es_duplicado(self, valor: bool):
+        if valor:
+            self._almacen._duplicados.add(self._i)
+        else:
+            self._almacen._duplicados.discard(self._i)
+    
+    def __eq__(self, otro) -> bool:
+        return (isinstance(otro, RegistroArchivo) and otro._almacen is self._almacen
+                and otro._i == self._i)
+    
+    def __hash__(self) -> int:
+        return hash((id(self._almacen), self._i))
+    
+    def __repr__(self) -> str:
+        return (f"RegistroArchivo(nombre={self.nombre!r}, categoria_sugerida={self.categoria_sugerida!r}, "
+                f"estado={self.estado})")
+
+class CanalProgreso:
+    """Último progreso publicado por un hilo de trabajo
+    
+    publicar() solo sustituye una tupla, que es una asignación atómica, así
+    que quien trabaja nunca espera a quien pinta. La interfaz consulta
+    leer() a su propio ritmo y se salta los valores intermedios; la versión
+    cambia con cada publicación para saber si hay algo nuevo.
+    """
+    
+    __slots__ = ('_versiones', '_ultimo')
+    
+    def __init__(self):
+        self._versiones = itertools.count(1)
+        # (versión, actual, total, mensaje, segundos restantes o None)
+        self._ultimo: Tuple[int, int, int, str, Optional[float]] = (0, 0, 0, "", None)
+    
+    def publicar(self, actual: int, total: int, mensaje: str, restante: Optional[float] = None):
+        self._ultimo = (next(self._versiones), actual, total, mensaje, restante)
+    
+    def leer(self) -> Tuple[int, int, int, str, Optional[float]]:
+        return self._ultimo
 
 class OrganizadorCore:
     """Clase principal que maneja toda la lógica de organización"""
     
     def __init__(self):
         self.archivos_procesados: List[ArchivoInfo] = []
+        self.progreso = CanalProgreso()
         self.callback_progreso: Optional[Callable[[int, int, str], None]] = None
         self.callback_decision_usuario: Optional[Callable[[ArchivoInfo], Tuple[str, bool]]] = None
+        self.decisiones_desconocidos: Dict[str, Optional[str]] = {}  # Extensión -> categoría (None = omitir)
         self.detener_procesamiento = False
+        self.detector_uso = DetectorArchivosEnUso()
         
     def set_callback_progreso(self, callback: Callable[[int, int, str], None]):
         """Establece callback para reportar progreso"""
         self.callback_progreso = callback
+    
+    def _informar_progreso(self, actual: int, total: int, mensaje: str, restante: Optional[float] = None):
+        """Publica el progreso en el canal y, si hay, llama al callback"""
+        self.progreso.publicar(actual, total, mensaje, restante)
+        if self.callback_progreso:
+            self.callback_progreso(actual, total, mensaje)
         
     def set_callback_decision_usuario(self, callback: Callable[[ArchivoInfo], Tuple[str, bool]]):
         """Establece callback para decisiones del usuario sobre archivos desconocidos"""
         self.callback_decision_usuario = callback
     
-    def escanear_carpeta(self, carpeta_origen: Path = None) -> List[ArchivoInfo]:
+    def desconocidos_por_extension(self, archivos: Union[AlmacenArchivos, List[ArchivoInfo]],
+                                   solo_pendientes: bool = True) -> Dict[str, SeleccionArchivos]:
+        """Agrupa por extensión los archivos desconocidos (de más a menos archivos)
+        
+        Con solo_pendientes se quitan las extensiones que ya tienen decisión
+        en esta sesión. Sirve para preguntar una vez por extensión antes de
+        organizar, en lugar de una vez por archivo durante el movimiento.
+        """
+        if not isinstance(archivos, AlmacenArchivos):
+            archivos = AlmacenArchivos(archivos)
+        
+        grupos = archivos.filtrar(estados=[EstadoArchivo.DESCONOCIDO]).agrupar_por('extension')
+        if solo_pendientes:
+            grupos = {ext: grupo for ext, grupo in grupos.items() if ext not in self.decisiones_desconocidos}
+        return grupos
+    
+    def registrar_decisiones(self, decisiones: Dict[str, Optional[Tuple[str, bool]]]):
+        """Guarda para la sesión la categoría elegida para cada extensión desconocida
+        
+        `decisiones` es {extensión: (categoría, recordar) o None para omitir}.
+        Las que piden recordarse se guardan como regla una sola vez aquí.
+        """
+        for extension, decision in decisiones.items():
+            if decision is None:
+                self.decisiones_desconocidos[extension] = None
+                continue
+            
+            categoria, recordar = decision
+            if recordar and extension:
+                config.agregar_regla_personalizada(extension, categoria)
+                logger.info(f"Nueva regla guardada: {extension} → {categoria}")
+            self.decisiones_desconocidos[extension] = categoria
+    
+    @perfil.medir('escaneo')
+    def escanear_carpeta(self, carpeta_origen: Path = None) -> AlmacenArchivos:
         """Escanea una carpeta y analiza todos los archivos"""
+        archivos_encontrados = AlmacenArchivos()
+        for lote in self.escanear_por_lotes(carpeta_origen):
+            archivos_encontrados.extend(lote)
+        return archivos_encontrados
+    
+    def escanear_por_lotes(self, carpeta_origen: Path = None, tamaño_lote: int = 2000,
+                           intervalo: float = 0.05) -> Iterator[List[ArchivoInfo]]:
+        """Escanea una carpeta entregando los archivos por lotes según se analizan
+        
+        Un lote se entrega al llenarse o cuando han pasado `intervalo`
+        segundos desde el anterior, así que el primero llega enseguida
+        aunque la carpeta sea enorme.
+        """
+        # Cada escaneo empieza un perfil nuevo que sigue en la organización
+        perfil.reiniciar()
+        
         if carpeta_origen is None:
             carpeta_origen = Path(config.config["carpeta_origen"])
         
         if not carpeta_origen.exists():
             logger.error(f"La carpeta origen no existe: {carpeta_origen}")
-            return []
+            return
         
         logger.info(f"Escaneando carpeta: {carpeta_origen}")
-        archivos_encontrados = []
+        lote: List[ArchivoInfo] = []
+        encontrados = 0
+        intervalo_ns = int(intervalo * 1e9)
+        fin_lote = time.perf_counter_ns() + intervalo_ns
         
         try:
-            # Obtener todos los archivos de la carpeta
-            for item in carpeta_origen.iterdir():
-                if self.detener_procesamiento:
-                    break
+            # Obtener todos los archivos de la carpeta (scandir evita un stat por entrada)
+            with os.scandir(carpeta_origen) as entradas:
+                for entrada in entradas:
+                    if self.detener_procesamiento:
+                        break
+                    
+                    if not entrada.is_file():
+                        continue
+                    
+                    inicio_entrada = time.perf_counter_ns()
+                    item = Path(entrada.path)
                     
-                if item.is_file():
-                    # Filtrar archivos temporales
-                    if FileUtils.es_archivo_temporal(item):
+                    # Entregar el lote si está lleno o si lleva demasiado esperando
+                    if lote and (len(lote) >= tamaño_lote or inicio_entrada >= fin_lote):
+                        yield lote
+                        lote = []
+                        fin_lote = time.perf_counter_ns() + intervalo_ns
+                    
+                    # Filtrar archivos temporales por nombre antes de tocar el disco
+                    if FileUtils.es_nombre_temporal(item):
                         logger.info(f"Ignorando archivo temporal: {item.name}")
                         continue
                     
                     # Crear información del archivo
-                    archivo_info = self._analizar_archivo(item)
+                    inicio_analisis = time.perf_counter_ns()
+                    archivo_info = self._analizar_archivo(item, entrada)
+                    eventos.registrar('clasificacion', item, (time.perf_counter_ns() - inicio_analisis) // 1000,
+                                      categoria=archivo_info.categoria_sugerida)
+                    
+                    # Los archivos vacíos también se consideran temporales
+                    if archivo_info.estado != EstadoArchivo.IGNORADO and archivo_info.tamaño == 0:
+                        logger.info(f"Ignorando archivo temporal: {item.name}")
+                        continue
                     
                     # Solo agregar si la categoría está activa o es para mostrar como ignorado
                     if archivo_info.categoria_sugerida == "No organizar":
                         # Agregar para mostrar en la lista pero marcado como ignorado
-                        archivos_encontrados.append(archivo_info)
+                        lote.append(archivo_info)
                         logger.info(f"Archivo ignorado (categoría desactivada): {item.name}")
                     elif archivo_info.categoria_sugerida and config.categoria_esta_activa(archivo_info.categoria_sugerida):
                         # Solo agregar si la categoría está activa
-                        archivos_encontrados.append(archivo_info)
+                        lote.append(archivo_info)
                     else:
                         # Archivo de categoría desactivada - crear entrada "ignorado"
                         archivo_info.estado = EstadoArchivo.IGNORADO
                         archivo_info.categoria_sugerida = "No organizar"
                         archivo_info.razon_estado = f"Categoría '{archivo_info.categoria_sugerida}' desactivada"
-                        archivos_encontrados.append(archivo_info)
+                        lote.append(archivo_info)
                         logger.info(f"Archivo ignorado (categoría desactivada): {item.name}")
+                    encontrados += 1
                     
-                    if self.callback_progreso:
-                        self.callback_progreso(
-                            len(archivos_encontrados), 
-                            -1,  # -1 indica que aún estamos contando
-                            f"Analizando: {item.name}"
-                        )
+                    eventos.registrar('escaneo', item, (time.perf_counter_ns() - inicio_entrada) // 1000,
+                                      estado=archivo_info.estado.value)
+                    
+                    self._informar_progreso(
+                        encontrados, 
+                        -1,  # -1 indica que aún estamos contando
+                        f"Analizando: {item.name}"
+                    )
         
         except Exception as e:
             logger.error(f"Error escaneando carpeta: {e}")
+            eventos.registrar('error', carpeta_origen, etapa='escaneo', error=str(e))
         
-        logger.info(f"Encontrados {len(archivos_encontrados)} archivos para procesar")
-        return archivos_encontrados
+        if lote:
+            yield lote
+        
+        # Persistir las observaciones de aprendizaje acumuladas en el escaneo
+        config.guardar_reglas_aprendidas(solo_si_modificado=True)
+        
+        logger.info(f"Encontrados {encontrados} archivos para procesar")
     
-    def _analizar_archivo(self, ruta_archivo: Path) -> ArchivoInfo:
-        """Analiza un archivo individual y determina su categoría"""
-        info_archivo = FileUtils.obtener_info_archivo(ruta_archivo)
-        extension = info_archivo['extension']
+    @perfil.medir('analisis')
+    def _analizar_archivo(self, ruta_archivo: Path, entrada: Optional[os.DirEntry] = None) -> ArchivoInfo:
+        """Analiza un archivo individual y determina su categoría
         
-        # Sanitizar el nombre del archivo
-        nombre_sanitizado = FileUtils.sanitizar_nombre_archivo(info_archivo['nombre'])
+        Solo se accede al disco cuando hace falta: los archivos de categorías
+        desactivadas se descartan sin stat, y la comprobación de archivo en
+        uso se hace al moverlo.
+        """
+        extension = ruta_archivo.suffix.lower()
         
-        # Verificar si el archivo está en uso
-        if info_archivo.get('en_uso', False):
-            archivo_info = ArchivoInfo(
-                ruta_origen=ruta_archivo,
-                nombre=nombre_sanitizado,
-                extension=extension,
-                tamaño=info_archivo['tamaño'],
-                categoria_sugerida="",
-                estado=EstadoArchivo.EN_USO,
-                razon_estado="Archivo en uso por otro proceso"
-            )
-            return archivo_info
+        # Sanitizar el nombre del archivo
+        nombre_sanitizado = FileUtils.sanitizar_nombre_archivo(ruta_archivo.name)
         
         # Determinar categoría (sin filtrar por activa aún)
         categoria_original = self._determinar_categoria_sin_filtro(ruta_archivo, extension)
         
         # Verificar si la categoría está activa
         if categoria_original and not config.categoria_esta_activa(categoria_original):
-            # Categoría desactivada - marcar como ignorado
+            # Categoría desactivada - marcar como ignorado (tamaño diferido)
             archivo_info = ArchivoInfo(
                 ruta_origen=ruta_archivo,
                 nombre=nombre_sanitizado,
                 extension=extension,
-                tamaño=info_archivo['tamaño'],
                 categoria_sugerida="No organizar",
                 estado=EstadoArchivo.IGNORADO,
                 razon_estado=f"Categoría '{categoria_original}' desactivada"
             )
             return archivo_info
         
+        try:
+            with perfil.etapa('stat'):
+                stat_archivo = entrada.stat() if entrada is not None else ruta_archivo.stat()
+        except OSError:
+            stat_archivo = None
+        
         # Crear información del archivo con categoría activa
         archivo_info = ArchivoInfo(
             ruta_origen=ruta_archivo,
             nombre=nombre_sanitizado,
             extension=extension,
-            tamaño=info_archivo['tamaño'],
             categoria_sugerida=categoria_original or "Otros",
-            fecha_modificacion=info_archivo['fecha_modificacion'].timestamp()
+            stat_archivo=stat_archivo
         )
         
         # Determinar ruta destino solo si la categoría está activa
@@ -181,10 +1273,19 @@ class OrganizadorCore:
         
         return archivo_info
     
-    def _determinar_categoria_sin_filtro(self, ruta_archivo: Path, extension: str) -> str:
-        """Determina la categoría de un archivo sin filtrar por categorías activas"""
-        extension = extension.lower()
-        
+    # Categoría asignada a cada tipo detectado por contenido
+    MAPEO_TIPOS = {
+        'png': 'Imágenes',
+        'jpg': 'Imágenes', 
+        'gif': 'Imágenes',
+        'pdf': 'Documentos',
+        'zip': 'Comprimidos',
+        'rar': 'Comprimidos',
+        'exe': 'Programas'
+    }
+    
+    def _categoria_por_extension(self, extension: str) -> Optional[str]:
+        """Busca la categoría de una extensión sin leer el archivo"""
         # Primero verificar reglas personalizadas
         if extension in config.reglas_personalizadas:
             return config.reglas_personalizadas[extension]
@@ -194,70 +1295,100 @@ class OrganizadorCore:
             if extension in extensiones:
                 return categoria
         
-        # Si no se reconoce la extensión, intentar detección inteligente
+        # Reglas aprendidas de detecciones anteriores
+        return config.reglas_aprendidas["reglas"].get(extension)
+    
+    @perfil.medir('clasificacion')
+    def _determinar_categoria_sin_filtro(self, ruta_archivo: Path, extension: str) -> str:
+        """Determina la categoría de un archivo sin filtrar por categorías activas"""
+        extension = extension.lower()
+        
+        categoria = self._categoria_por_extension(extension)
+        if categoria:
+            return categoria
+        
+        # Si no se reconoce la extensión, intentar detección inteligente.
+        # Se lee aunque la categoría detectada esté desactivada: el archivo
+        # debe quedar ignorado (no en Otros) y la detección alimenta el
+        # aprendizaje de reglas.
         if extension != "":
+            categoria_detectada = "Otros"
             tipo_detectado = FileUtils.detectar_tipo_por_contenido(ruta_archivo)
             if tipo_detectado:
                 # Mapear tipo detectado a categoría
-                mapeo_tipos = {
-                    'png': 'Imágenes',
-                    'jpg': 'Imágenes', 
-                    'gif': 'Imágenes',
-                    'pdf': 'Documentos',
-                    'zip': 'Comprimidos',
-                    'rar': 'Comprimidos',
-                    'exe': 'Programas'
-                }
-                categoria_detectada = mapeo_tipos.get(tipo_detectado, "Otros")
+                categoria_detectada = self.MAPEO_TIPOS.get(tipo_detectado, "Otros")
                 
                 if categoria_detectada != "Otros":
                     logger.info(f"Detectado tipo '{tipo_detectado}' para {ruta_archivo.name}")
-                return categoria_detectada
+            
+            # Alimentar el aprendizaje con el resultado de la detección
+            if config.registrar_deteccion(extension, categoria_detectada):
+                logger.info(f"Regla aprendida: {extension} → {categoria_detectada}")
+            return categoria_detectada
         
         return "Otros"  # Categoría por defecto para desconocidos
     
-    def generar_plan_organizacion(self, archivos: List[ArchivoInfo]) -> Dict[str, any]:
-        """Genera un plan de organización antes de ejecutar"""
+    def generar_plan_organizacion(self, archivos: Union[AlmacenArchivos, List[ArchivoInfo]]) -> Dict[str, any]:
+        """Genera un plan de organización antes de ejecutar
+        
+        Los conteos y sumas se calculan sobre las columnas del almacén y las
+        listas del plan son selecciones de índices, no copias de objetos.
+        """
+        if not isinstance(archivos, AlmacenArchivos):
+            archivos = AlmacenArchivos(archivos)
+        
+        no_planificables = (EstadoArchivo.DESCONOCIDO, EstadoArchivo.EN_USO)
+        archivos_por_categoria = archivos.agrupar_por_categoria(excluir_estados=no_planificables)
+        
         plan = {
             'total_archivos': len(archivos),
-            'archivos_por_categoria': {},
-            'archivos_con_conflictos': [],
-            'archivos_desconocidos': [],
-            'archivos_en_uso': [],
-            'tamaño_total': 0,
+            'archivos_por_categoria': archivos_por_categoria,
+            'archivos_con_conflictos': archivos.seleccion(),
+            'archivos_desconocidos': archivos.filtrar(estados=[EstadoArchivo.DESCONOCIDO]),
+            'archivos_en_uso': archivos.filtrar(estados=[EstadoArchivo.EN_USO]),
+            # Los ignorados no se mueven: no cuentan en el tamaño (ni fuerzan su stat)
+            'tamaño_total': archivos.tamaño_total(solo_validos=True),
+            'totales_por_categoria': archivos.totales_por_categoria(solo_validos=True),
+            'histograma_antiguedad': archivos.histograma_antiguedad(),
             'carpetas_a_crear': set(),
             'resumen': {}
         }
         
-        for archivo in archivos:
-            plan['tamaño_total'] += archivo.tamaño
+        # Agrupar los destinos por carpeta para listar cada carpeta una sola vez
+        indices_por_carpeta: Dict[int, List[int]] = {}
+        for seleccion in archivos_por_categoria.values():
+            for i in seleccion.indices:
+                carpeta = archivos.carpeta_destino[i]
+                if carpeta >= 0:
+                    indices_por_carpeta.setdefault(carpeta, []).append(i)
+        
+        # En Windows los nombres no distinguen mayúsculas
+        normalizar = str.casefold if os.name == 'nt' else str
+        
+        for carpeta, indices in indices_por_carpeta.items():
+            ruta_carpeta = archivos._carpetas_path[carpeta]
+            plan['carpetas_a_crear'].add(ruta_carpeta)
             
-            # Clasificar archivos según su estado
-            if archivo.estado == EstadoArchivo.DESCONOCIDO:
-                plan['archivos_desconocidos'].append(archivo)
-            elif archivo.estado == EstadoArchivo.EN_USO:
-                plan['archivos_en_uso'].append(archivo)
-            else:
-                categoria = archivo.categoria_sugerida
-                
-                # Contar archivos por categoría
-                if categoria not in plan['archivos_por_categoria']:
-                    plan['archivos_por_categoria'][categoria] = []
-                plan['archivos_por_categoria'][categoria].append(archivo)
-                
-                # Verificar conflictos de nombres
-                if archivo.ruta_destino and archivo.ruta_destino.exists():
-                    plan['archivos_con_conflictos'].append(archivo)
-                
-                # Anotar carpetas que se necesitan crear
-                if archivo.ruta_destino:
-                    plan['carpetas_a_crear'].add(archivo.ruta_destino.parent)
+            # Verificar conflictos de nombres
+            try:
+                existentes = {normalizar(nombre) for nombre in os.listdir(ruta_carpeta)}
+            except OSError:
+                continue  # La carpeta aún no existe: no hay conflictos
+            
+            for i in indices:
+                registro = RegistroArchivo(archivos, i)
+                if normalizar(registro.ruta_destino.name) in existentes:
+                    plan['archivos_con_conflictos'].indices.append(i)
+        
+        # Una decisión por extensión, no por archivo
+        plan['desconocidos_por_extension'] = plan['archivos_desconocidos'].agrupar_por('extension')
         
         # Generar resumen
         plan['resumen'] = {
             'categorias_involucradas': len(plan['archivos_por_categoria']),
             'conflictos_nombres': len(plan['archivos_con_conflictos']),
             'archivos_desconocidos': len(plan['archivos_desconocidos']),
+            'extensiones_desconocidas': len(plan['desconocidos_por_extension']),
             'archivos_en_uso': len(plan['archivos_en_uso']),
             'carpetas_nuevas': len(plan['carpetas_a_crear']),
             'tamaño_legible': FileUtils.formatear_tamaño(plan['tamaño_total'])
@@ -265,20 +1396,43 @@ class OrganizadorCore:
         
         return plan
     
-    def ejecutar_organizacion(self, archivos: List[ArchivoInfo], 
+    def estimar_duracion(self, archivos: Union[AlmacenArchivos, SeleccionArchivos, List[ArchivoInfo]]) -> float:
+        """Segundos que se prevé que tarde organizar estos archivos (modelo aprendido)"""
+        if isinstance(archivos, SeleccionArchivos):
+            grupos = archivos.almacen.totales_por_ruta(archivos.indices)
+        else:
+            if not isinstance(archivos, AlmacenArchivos):
+                archivos = AlmacenArchivos(archivos)
+            grupos = archivos.totales_por_ruta()
+        return modelo_rendimiento.estimar(grupos)
+    
+    def ejecutar_organizacion(self, archivos: Union[AlmacenArchivos, SeleccionArchivos, List[ArchivoInfo]], 
                             solo_vista_previa: bool = False) -> Dict[str, any]:
         """Ejecuta la organización de archivos"""
         
         if solo_vista_previa:
             return self.generar_plan_organizacion(archivos)
         
+        # Las listas de resultados son selecciones de índices sobre el almacén
+        if not isinstance(archivos, (AlmacenArchivos, SeleccionArchivos)):
+            archivos = AlmacenArchivos(archivos)
+        almacen = archivos.almacen
+        
         logger.info(f"Iniciando organización de {len(archivos)} archivos")
         self.archivos_procesados = []
-        archivos_movidos = []
-        archivos_con_error = []
-        archivos_omitidos = []
+        archivos_movidos = almacen.seleccion()
+        archivos_con_error = almacen.seleccion()
+        archivos_omitidos = almacen.seleccion()
         
         total_archivos = len(archivos)
+        inicio = time.time()
+        inicio_ns = time.perf_counter_ns()
+        
+        # La comprobación de archivos en uso se hace al mover, con un solo barrido
+        self.detector_uso.barrer()
+        
+        # ETA en vivo: lo que falta según el modelo, corregido por el ritmo observado
+        estimador = EstimadorRestante(self.estimar_duracion(archivos))
         
         for i, archivo in enumerate(archivos):
             if self.detener_procesamiento:
@@ -292,19 +1446,29 @@ class OrganizadorCore:
                 continue
             
             # Reportar progreso
-            if self.callback_progreso:
-                self.callback_progreso(
-                    i + 1, 
-                    total_archivos, 
-                    f"Procesando: {archivo.nombre}"
-                )
+            self._informar_progreso(
+                i + 1, 
+                total_archivos, 
+                f"Procesando: {archivo.nombre}",
+                estimador.restante()
+            )
+            
+            # Lo que el modelo prevé para este archivo (antes de que cambie su destino)
+            if archivo.ruta_destino is not None:
+                estimador.avanzar(modelo_rendimiento.segundos(
+                    archivo.ruta_origen.parent, archivo.ruta_destino.parent, 1, archivo.tamaño))
             
             # Procesar archivo individual
-            resultado = self._procesar_archivo_individual(archivo)
+            inicio_archivo = time.perf_counter()
+            with trazador.tramo(archivo.nombre, 'archivo'):
+                resultado = self._procesar_archivo_individual(archivo)
             
             if resultado['exito']:
                 archivos_movidos.append(resultado['archivo_info'])
                 logger.success(f"Movido: {archivo.nombre} → {resultado['destino_final']}")
+                # El modelo aprende el coste completo por archivo, no solo el del movimiento
+                modelo_rendimiento.registrar(archivo.ruta_origen.parent, Path(resultado['destino_final']).parent,
+                                             archivo.tamaño, time.perf_counter() - inicio_archivo)
             elif resultado['omitido']:
                 archivos_omitidos.append(resultado['archivo_info'])
                 logger.info(f"Omitido: {archivo.nombre} - {resultado['razon']}")
@@ -329,6 +1493,21 @@ class OrganizadorCore:
                 } for a in archivos_movidos
             ])
         
+        tamaño_total_movido = sum(a.tamaño for a in archivos_movidos)
+        try:
+            with perfil.etapa('historial'):
+                historial.registrar_sesion(
+                    inicio, time.time() - inicio, len(archivos_movidos), tamaño_total_movido,
+                    errores=len(archivos_con_error), omitidos=len(archivos_omitidos),
+                    por_categoria=archivos_movidos.totales_por('categoria'),
+                    por_extension=archivos_movidos.totales_por('extension')
+                )
+        except Exception as e:
+            logger.warning(f"No se pudo guardar la sesión en el historial: {e}")
+        
+        # Aprender de lo medido para la próxima estimación
+        modelo_rendimiento.guardar()
+        
         # Generar resultado final
         resultado_final = {
             'total_procesados': len(archivos_movidos),
@@ -337,17 +1516,29 @@ class OrganizadorCore:
             'archivos_movidos': archivos_movidos,
             'archivos_error': archivos_con_error,
             'archivos_omitidos': archivos_omitidos,
-            'tamaño_total_movido': sum(a.tamaño for a in archivos_movidos),
+            'tamaño_total_movido': tamaño_total_movido,
             'tiempo_transcurrido': time.time()  # Se calculará en la GUI
         }
         
+        eventos.volcar()
+        
+        # Desglose por etapa desde el último escaneo
+        if perfil.activo:
+            perfil.registrar('organizacion', time.perf_counter_ns() - inicio_ns)
+            resultado_final['perfil'] = perfil.resumen()
+            logger.info(perfil.formatear_resumen(resultado_final['perfil']))
+        
         logger.info(f"Organización completada: {resultado_final['total_procesados']} archivos movidos")
         return resultado_final
     
     def _procesar_archivo_individual(self, archivo: ArchivoInfo) -> Dict[str, any]:
         """Procesa un archivo individual"""
         
-        # Verificar archivos en uso
+        # Verificar archivos en uso (comprobación diferida hasta el momento de mover)
+        if archivo.estado != EstadoArchivo.EN_USO and self.detector_uso.esta_en_uso(archivo.ruta_origen):
+            archivo.estado = EstadoArchivo.EN_USO
+            archivo.razon_estado = "Archivo en uso por otro proceso"
+        
         if archivo.estado == EstadoArchivo.EN_USO:
             return {
                 'exito': False,
@@ -392,12 +1583,16 @@ class OrganizadorCore:
             }
         
         # Mover el archivo
+        inicio_movimiento = time.perf_counter_ns()
         exito, destino_o_error = FileUtils.mover_archivo_seguro(
             archivo.ruta_origen, 
             archivo.ruta_destino
         )
+        duracion_us = (time.perf_counter_ns() - inicio_movimiento) // 1000
         
         if exito:
+            eventos.registrar('movimiento', archivo.ruta_origen, duracion_us,
+                              categoria=archivo.categoria_sugerida, bytes=archivo.tamaño)
             archivo.estado = EstadoArchivo.PROCESADO
             archivo.ruta_destino = Path(destino_o_error)  # Ruta final real
             return {
@@ -408,6 +1603,7 @@ class OrganizadorCore:
                 'destino_final': destino_o_error
             }
         else:
+            eventos.registrar('error', archivo.ruta_origen, duracion_us, etapa='movimiento', error=destino_o_error)
             archivo.estado = EstadoArchivo.ERROR
             archivo.razon_estado = destino_o_error
             return {
@@ -429,9 +1625,17 @@ class OrganizadorCore:
         elif accion_default == 'ignorar':
             return None
         
+        # Decisión ya tomada en esta sesión (resolución por lotes o una pregunta anterior)
+        if archivo.extension in self.decisiones_desconocidos:
+            categoria = self.decisiones_desconocidos[archivo.extension]
+            return None if categoria is None else (categoria, False)
+        
         # Si está configurado para preguntar o no hay callback, usar callback
         if self.callback_decision_usuario:
-            return self.callback_decision_usuario(archivo)
+            decision = self.callback_decision_usuario(archivo)
+            if decision is not None:
+                self.decisiones_desconocidos[archivo.extension] = decision[0]
+            return decision
         else:
             # Fallback: mover a "Otros"
             return ('Otros', False)
@@ -484,13 +1688,14 @@ class MonitorArchivos:
         logger.info(f"Iniciando monitoreo de: {carpeta}")
         
         # Obtener estado inicial
-        archivos_iniciales = set(carpeta.glob("*"))
+        archivos_iniciales = self._instantanea(carpeta)
         
         while self.monitoreando:
             try:
                 # Verificar nuevos archivos
-                archivos_actuales = set(carpeta.glob("*"))
-                archivos_nuevos = archivos_actuales - archivos_iniciales
+                with trazador.tramo('monitor_barrido', 'monitor'):
+                    archivos_actuales = self._instantanea(carpeta)
+                    archivos_nuevos = archivos_actuales - archivos_iniciales
                 
                 for archivo_nuevo in archivos_nuevos:
                     if archivo_nuevo.is_file() and not FileUtils.es_archivo_temporal(archivo_nuevo):
@@ -501,8 +1706,9 @@ class MonitorArchivos:
                         
                         # Organizar automáticamente si está configurado
                         if config.config.get('monitoreo_automatico', False):
-                            archivos_info = [self.organizador._analizar_archivo(archivo_nuevo)]
-                            self.organizador.ejecutar_organizacion(archivos_info)
+                            with trazador.tramo(archivo_nuevo.name, 'monitor'):
+                                archivos_info = [self.organizador._analizar_archivo(archivo_nuevo)]
+                                self.organizador.ejecutar_organizacion(archivos_info)
                 
                 archivos_iniciales = archivos_actuales
                 time.sleep(2)  # Verificar cada 2 segundos
@@ -514,6 +1720,10 @@ class MonitorArchivos:
         logger.info("Monitoreo detenido")
         return True
     
+    def _instantanea(self, carpeta: Path) -> set:
+        """Conjunto de rutas presentes en la carpeta"""
+        return set(carpeta.glob("*"))
+    
     def detener_monitoreo(self):
         """Detiene el monitoreo"""
         self.monitoreando = False
\ No newline at end of file
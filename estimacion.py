@@ -0,0 +1,174 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config import config
+
+class ModeloRendimiento:
+    """Modelo de la duración de una organización aprendido de ejecuciones pasadas
+    
+    Se guarda por dispositivo de destino. Si origen y destino están en el
+    mismo dispositivo, mover es un rename y cuesta lo mismo sea cual sea el
+    tamaño (segundos por archivo). Si no, es una copia y se modela como un
+    coste fijo por archivo más bytes / ancho de banda, ajustado por mínimos
+    cuadrados sobre los archivos de la ejecución. Al terminar cada ejecución
+    lo medido se mezcla con lo aprendido (media exponencial) y se guarda en
+    rendimiento.json.
+    """
+    
+    PESO_NUEVO = 0.3
+    MUESTRAS_MINIMAS = 20
+    POR_DEFECTO = {
+        'renombrado_s': 0.002,  # Segundos por archivo en el mismo dispositivo
+        'copia_fijo_s': 0.005,  # Segundos fijos por archivo copiado
+        'copia_bytes_s': 50 * 2**20  # Ancho de banda de copia
+    }
+    
+    def __init__(self, archivo: Optional[Path] = None):
+        self.archivo = Path(archivo) if archivo else config.config_dir / "rendimiento.json"
+        self._lock = threading.Lock()
+        self.dispositivos: Dict[str, Dict[str, float]] = self._cargar()
+        self._dispositivo_carpeta: Dict[Path, Optional[int]] = {}
+        # Sumas de la ejecución en curso: dispositivo -> [n, Σt] (renombrados)
+        # o [n, Σx, Σt, Σx², Σxt] (copias, x en bytes)
+        self._renombrados: Dict[str, List[float]] = {}
+        self._copias: Dict[str, List[float]] = {}
+    
+    def _cargar(self) -> Dict[str, Dict[str, float]]:
+        try:
+            with open(self.archivo, 'r', encoding='utf-8') as f:
+                datos = json.load(f)
+            return datos.get('dispositivos', {})
+        except (OSError, ValueError):
+            return {}
+    
+    def dispositivo(self, carpeta: Path) -> Optional[int]:
+        """st_dev de la carpeta o del antecesor existente más cercano (con caché)"""
+        if carpeta in self._dispositivo_carpeta:
+            return self._dispositivo_carpeta[carpeta]
+        
+        dispositivo = None
+        for candidata in (carpeta, *carpeta.parents):
+            try:
+                dispositivo = os.stat(candidata).st_dev
+                break
+            except OSError:
+                continue
+        self._dispositivo_carpeta[carpeta] = dispositivo
+        return dispositivo
+    
+    def parametros(self, dispositivo: Optional[int]) -> Dict[str, float]:
+        aprendidos = self.dispositivos.get(str(dispositivo), {})
+        return {clave: aprendidos.get(clave, valor) for clave, valor in self.POR_DEFECTO.items()}
+    
+    def segundos(self, carpeta_origen: Path, carpeta_destino: Path, archivos: int, bytes_total: int) -> float:
+        """Duración prevista de mover `archivos` (que suman `bytes_total`) entre dos carpetas"""
+        destino = self.dispositivo(carpeta_destino)
+        parametros = self.parametros(destino)
+        if destino is not None and destino == self.dispositivo(carpeta_origen):
+            return archivos * parametros['renombrado_s']
+        return archivos * parametros['copia_fijo_s'] + bytes_total / parametros['copia_bytes_s']
+    
+    def estimar(self, grupos: Iterable[Tuple[Path, Path, int, int]]) -> float:
+        """Suma la duración prevista de (carpeta origen, carpeta destino, archivos, bytes)"""
+        return sum(self.segundos(origen, destino, archivos, bytes_total)
+                   for origen, destino, archivos, bytes_total in grupos)
+    
+    def registrar(self, carpeta_origen: Path, carpeta_destino: Path, bytes_archivo: int, segundos: float):
+        """Anota un movimiento real de la ejecución en curso"""
+        destino = self.dispositivo(carpeta_destino)
+        if destino is None:
+            return
+        
+        clave = str(destino)
+        with self._lock:
+            if destino == self.dispositivo(carpeta_origen):
+                sumas = self._renombrados.setdefault(clave, [0, 0.0])
+                sumas[0] += 1
+                sumas[1] += segundos
+            else:
+                sumas = self._copias.setdefault(clave, [0, 0.0, 0.0, 0.0, 0.0])
+                sumas[0] += 1
+                sumas[1] += bytes_archivo
+                sumas[2] += segundos
+                sumas[3] += bytes_archivo * bytes_archivo
+                sumas[4] += bytes_archivo * segundos
+    
+    def _mezclar(self, dispositivo: str, clave: str, valor: float):
+        aprendidos = self.dispositivos.setdefault(dispositivo, {})
+        anterior = aprendidos.get(clave)
+        aprendidos[clave] = valor if anterior is None else anterior + self.PESO_NUEVO * (valor - anterior)
+    
+    def guardar(self):
+        """Incorpora lo medido en la ejecución al modelo y lo persiste"""
+        with self._lock:
+            renombrados, self._renombrados = self._renombrados, {}
+            copias, self._copias = self._copias, {}
+            # Las carpetas de destino cambian (se crean) entre ejecuciones
+            self._dispositivo_carpeta = {}
+            
+            cambios = False
+            for dispositivo, (n, total) in renombrados.items():
+                if n >= self.MUESTRAS_MINIMAS and total > 0:
+                    self._mezclar(dispositivo, 'renombrado_s', total / n)
+                    cambios = True
+            
+            for dispositivo, (n, sx, st, sxx, sxt) in copias.items():
+                if n < self.MUESTRAS_MINIMAS or st <= 0:
+                    continue
+                # Recta t = fijo + x / ancho_banda por mínimos cuadrados
+                varianza = n * sxx - sx * sx
+                pendiente = (n * sxt - sx * st) / varianza if varianza > 0 else 0.0
+                if pendiente > 0:
+                    fijo = max(0.0, (st - pendiente * sx) / n)
+                    self._mezclar(dispositivo, 'copia_bytes_s', 1 / pendiente)
+                else:
+                    # Todos del mismo tamaño o ruido: atribuir todo al ancho de banda
+                    fijo = 0.0
+                    if sx > 0:
+                        self._mezclar(dispositivo, 'copia_bytes_s', sx / st)
+                self._mezclar(dispositivo, 'copia_fijo_s', fijo)
+                cambios = True
+            
+            if not cambios:
+                return
+            
+            archivo_temporal = self.archivo.with_suffix('.json.tmp')
+            try:
+                self.archivo.parent.mkdir(parents=True, exist_ok=True)
+                with open(archivo_temporal, 'w', encoding='utf-8') as f:
+                    json.dump({'version': 1, 'actualizado': time.time(), 'dispositivos': self.dispositivos},
+                              f, ensure_ascii=False, indent=2)
+                os.replace(archivo_temporal, self.archivo)
+            except OSError:
+                pass
+
+class EstimadorRestante:
+    """ETA en vivo de una ejecución: lo que falta según el modelo, corregido por lo observado
+    
+    Si lo ya hecho ha tardado el doble de lo que preveía el modelo, lo que
+    queda también tardará el doble.
+    """
+    
+    __slots__ = ('previsto_total', 'previsto_hecho', '_inicio')
+    
+    def __init__(self, previsto_total: float):
+        self.previsto_total = previsto_total
+        self.previsto_hecho = 0.0
+        self._inicio = time.perf_counter()
+    
+    def avanzar(self, previsto: float):
+        self.previsto_hecho += previsto
+    
+    def restante(self) -> float:
+        pendiente = max(0.0, self.previsto_total - self.previsto_hecho)
+        if self.previsto_hecho <= 0:
+            return pendiente
+        factor = (time.perf_counter() - self._inicio) / self.previsto_hecho
+        return pendiente * min(max(factor, 0.05), 20.0)
+
+# Instancia global
+modelo_rendimiento = ModeloRendimiento()
\ No newline at end of file
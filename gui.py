@@ -1,17 +1,271 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, simpledialog
+import queue
 import threading
 import time
+from collections import deque
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Set, Tuple
 
 from config import config
-from core import OrganizadorCore, MonitorArchivos, ArchivoInfo, EstadoArchivo
+from core import OrganizadorCore, MonitorArchivos, ArchivoInfo, AlmacenArchivos, DiferenciasAlmacen, EstadoArchivo, SeleccionArchivos, BuscadorNombres, IndiceAlmacen
 from utils import FileUtils, logger, stats
+from historial import historial
+from perfil import perfil, trazador
+from latencia import VigilanteBucle
+
+# Texto de la columna Estado (el resto usa el valor del enum)
+TEXTO_ESTADO = {
+    EstadoArchivo.DESCONOCIDO: "❓ Desconocido",
+    EstadoArchivo.EN_USO: "🔒 En uso",
+    EstadoArchivo.IGNORADO: "⏭️ Ignorado"
+}
+
+class ListaVirtual:
+    """Lista virtualizada sobre un ttk.Treeview
+    
+    El Treeview solo contiene las filas que caben en pantalla (más una de
+    margen); al desplazarse se reescriben sus valores con los datos de la
+    nueva posición, así que mostrar un millón de entradas cuesta lo mismo
+    que mostrar cien. Los datos se piden bajo demanda a una función
+    fila(indice) -> (valores, tags), el orden es una secuencia de índices
+    y la selección se guarda por índice de dato, no por fila visible.
+    """
+    
+    ALTO_FILA = 20
+    ALTO_ENCABEZADO = 25
+    
+    def __init__(self, parent, columnas: List[Tuple[str, str, int]],
+                 callback_orden: Optional[Callable[[str], None]] = None, height: int = 15):
+        self.frame = ttk.Frame(parent)
+        self.tree = ttk.Treeview(self.frame, columns=[c[0] for c in columnas], show='headings',
+                                 height=height, selectmode='extended')
+        self.titulos = {}
+        for columna, titulo, ancho in columnas:
+            self.titulos[columna] = titulo
+            self.tree.heading(columna, text=titulo,
+                              command=(lambda c=columna: callback_orden(c)) if callback_orden else '')
+            self.tree.column(columna, width=ancho)
+        
+        # La barra vertical recorre los datos, no las filas del Treeview
+        self.scrollbar_v = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self._desplazar_barra)
+        self.scrollbar_h = ttk.Scrollbar(self.frame, orient=tk.HORIZONTAL, command=self.tree.xview)
+        self.tree.configure(xscrollcommand=self.scrollbar_h.set)
+        
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.scrollbar_v.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        self.scrollbar_h.grid(row=1, column=0, sticky=(tk.W, tk.E))
+        self.frame.columnconfigure(0, weight=1)
+        self.frame.rowconfigure(0, weight=1)
+        
+        self.orden: Sequence[int] = range(0)
+        self.fila: Callable[[int], Tuple[tuple, tuple]] = lambda indice: ((), ())
+        self.seleccion: Set[int] = set()
+        self.desplazamiento = 0
+        self.cursor = 0
+        self.filas_visibles = height
+        self._items: List[str] = []
+        self._pendiente = False
+        self._anadir_seleccion = False
+        
+        self.tree.bind('<Configure>', self._al_redimensionar)
+        self.tree.bind('<MouseWheel>', self._rueda)
+        self.tree.bind('<Button-4>', self._rueda)
+        self.tree.bind('<Button-5>', self._rueda)
+        self.tree.bind('<Button-1>', self._al_pulsar, add='+')
+        self.tree.bind('<<TreeviewSelect>>', self._al_seleccionar)
+        for tecla in ('<Up>', '<Down>', '<Prior>', '<Next>', '<Home>', '<End>'):
+            self.tree.bind(tecla, self._tecla)
+    
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+    
+    # ------------------------------------------------------------------
+    # Datos
+    # ------------------------------------------------------------------
+    
+    def establecer_datos(self, orden: Sequence[int], fila: Callable[[int], Tuple[tuple, tuple]]):
+        """Muestra los índices de `orden` pidiendo cada fila visible a `fila`"""
+        self.orden = orden
+        self.fila = fila
+        self.seleccion.clear()
+        self.desplazamiento = 0
+        self.cursor = 0
+        self.refrescar()
+    
+    def establecer_orden(self, orden: Sequence[int]):
+        """Cambia el orden conservando la selección"""
+        self.orden = orden
+        self.desplazamiento = 0
+        self.cursor = 0
+        self.refrescar()
+    
+    def actualizar_datos(self, orden: Sequence[int], seleccion: Set[int], repintar: bool = True):
+        """Cambia orden y selección conservando el desplazamiento (para escaneos sucesivos)"""
+        self.orden = orden
+        self.seleccion = seleccion
+        self.cursor = max(0, min(self.cursor, len(orden) - 1))
+        if repintar:
+            self.refrescar()
+    
+    def marcar_orden(self, columna: Optional[str], descendente: bool = False):
+        """Muestra la flecha de orden en el encabezado de la columna"""
+        for id_columna, titulo in self.titulos.items():
+            if id_columna == columna:
+                titulo = f"{titulo} {'▼' if descendente else '▲'}"
+            self.tree.heading(id_columna, text=titulo)
+    
+    def limpiar(self):
+        self.establecer_datos(range(0), self.fila)
+    
+    def indices_seleccionados(self) -> List[int]:
+        return sorted(self.seleccion)
+    
+    def __len__(self) -> int:
+        return len(self.orden)
+    
+    # ------------------------------------------------------------------
+    # Pintado
+    # ------------------------------------------------------------------
+    
+    def refrescar(self):
+        """Repinta las filas visibles en el próximo ciclo ocioso (una vez por ciclo)"""
+        if not self._pendiente:
+            self._pendiente = True
+            self.tree.after_idle(self._pintar)
+    
+    def _pintar(self):
+        self._pendiente = False
+        total = len(self.orden)
+        self.desplazamiento = max(0, min(self.desplazamiento, total - self.filas_visibles))
+        necesarias = max(0, min(self.filas_visibles + 1, total - self.desplazamiento))
+        
+        while len(self._items) < necesarias:
+            self._items.append(self.tree.insert('', 'end'))
+        if len(self._items) > necesarias:
+            self.tree.delete(*self._items[necesarias:])
+            del self._items[necesarias:]
+        
+        seleccionados = []
+        for fila, item in enumerate(self._items):
+            indice = self.orden[self.desplazamiento + fila]
+            valores, tags = self.fila(indice)
+            self.tree.item(item, values=valores, tags=tags)
+            if indice in self.seleccion:
+                seleccionados.append(item)
+        
+        self._anadir_seleccion = True  # El <<TreeviewSelect>> que provoca esto no debe borrar nada
+        self.tree.selection_set(seleccionados)
+        if self._items and 0 <= self.cursor - self.desplazamiento < len(self._items):
+            self.tree.focus(self._items[self.cursor - self.desplazamiento])
+        self.tree.yview_moveto(0)
+        
+        if total:
+            self.scrollbar_v.set(self.desplazamiento / total,
+                                 min(1.0, (self.desplazamiento + self.filas_visibles) / total))
+        else:
+            self.scrollbar_v.set(0.0, 1.0)
+    
+    def _al_redimensionar(self, event):
+        if self._items:
+            caja = self.tree.bbox(self._items[0])
+            if caja:
+                self.ALTO_ENCABEZADO, self.ALTO_FILA = caja[1], caja[3]
+        filas = max(1, (event.height - self.ALTO_ENCABEZADO) // self.ALTO_FILA)
+        if filas != self.filas_visibles:
+            self.filas_visibles = filas
+            self.refrescar()
+    
+    # ------------------------------------------------------------------
+    # Desplazamiento
+    # ------------------------------------------------------------------
+    
+    def desplazar_a(self, posicion: int):
+        posicion = max(0, min(posicion, len(self.orden) - self.filas_visibles))
+        if posicion != self.desplazamiento:
+            self.desplazamiento = posicion
+            self.refrescar()
+    
+    def _desplazar_barra(self, accion, cantidad, unidad=None):
+        if accion == 'moveto':
+            self.desplazar_a(int(float(cantidad) * len(self.orden)))
+        elif accion == 'scroll':
+            paso = self.filas_visibles if unidad == 'pages' else 1
+            self.desplazar_a(self.desplazamiento + int(cantidad) * paso)
+    
+    def _rueda(self, event):
+        if event.num == 4:
+            pasos = -3
+        elif event.num == 5:
+            pasos = 3
+        else:
+            pasos = -3 if event.delta > 0 else 3
+        self.desplazar_a(self.desplazamiento + pasos)
+        return "break"
+    
+    def _tecla(self, event):
+        total = len(self.orden)
+        if not total:
+            return "break"
+        saltos = {'Up': -1, 'Down': 1, 'Prior': -self.filas_visibles, 'Next': self.filas_visibles,
+                  'Home': -total, 'End': total}
+        self.cursor = max(0, min(total - 1, self.cursor + saltos[event.keysym]))
+        if self.cursor < self.desplazamiento:
+            self.desplazamiento = self.cursor
+        elif self.cursor >= self.desplazamiento + self.filas_visibles:
+            self.desplazamiento = self.cursor - self.filas_visibles + 1
+        
+        indice = self.orden[self.cursor]
+        if event.state & 0x0001:  # Shift: ampliar la selección
+            self.seleccion.add(indice)
+        else:
+            self.seleccion = {indice}
+        self.refrescar()
+        self.tree.event_generate('<<SeleccionVirtual>>')
+        return "break"
+    
+    # ------------------------------------------------------------------
+    # Selección
+    # ------------------------------------------------------------------
+    
+    def _al_pulsar(self, event):
+        # Con Ctrl o Shift la selección se amplía; un clic simple la sustituye
+        self._anadir_seleccion = bool(event.state & 0x0005)
+        item = self.tree.identify_row(event.y)
+        if item in self._items:
+            self.cursor = self.desplazamiento + self._items.index(item)
+    
+    def _al_seleccionar(self, event=None):
+        elegidos = set(self.tree.selection())
+        visibles = {item: self.orden[self.desplazamiento + fila] for fila, item in enumerate(self._items)}
+        if not self._anadir_seleccion:
+            self.seleccion = set()
+        self._anadir_seleccion = True
+        
+        cambio = False
+        for item, indice in visibles.items():
+            if item in elegidos and indice not in self.seleccion:
+                self.seleccion.add(indice)
+                cambio = True
+            elif item not in elegidos and indice in self.seleccion:
+                self.seleccion.discard(indice)
+                cambio = True
+        if cambio:
+            self.tree.event_generate('<<SeleccionVirtual>>')
 
 class VentanaPrincipal:
     """Ventana principal de la aplicación"""
     
+    INTERVALO_REFRESCO_MS = 50  # 20 Hz para lo que llega desde hilos de trabajo
+    LINEAS_LOG = 5000
+    
+    # Filtro del log de actividad -> nivel mínimo
+    FILTROS_LOG = {"Todo": 'DEBUG', "Información": 'INFO', "Avisos": 'WARNING', "Errores": 'ERROR'}
+    # Columna de la lista -> columna de IndiceAlmacen
+    COLUMNAS_ORDEN = {'Nombre': 'nombre', 'Extensión': 'extension', 'Tamaño': 'tamaño',
+                      'Categoría': 'categoria', 'Estado': 'estado'}
+    FILTROS_ESTADO = {"Todos": None, **{texto: estado for estado, texto in TEXTO_ESTADO.items()}}
+    
     def __init__(self):
         self.root = tk.Tk()
         self.root.title(f"Organizador de Descargas v{config.version}")
@@ -23,12 +277,22 @@ class VentanaPrincipal:
         self.monitor = MonitorArchivos(self.organizador)
         
         # Variables de control
-        self.archivos_escaneados: List[ArchivoInfo] = []
+        self.archivos_escaneados: AlmacenArchivos = AlmacenArchivos()
+        self.indice_archivos = IndiceAlmacen(self.archivos_escaneados)
+        # Almacén que el hilo de escaneo sigue ampliando (no se indexa hasta que acabe)
+        self.almacen_creciendo: Optional[AlmacenArchivos] = None
         self.procesando = False
+        self.cerrando = False
         self.monitoreando = False
+        self.columna_orden: Optional[str] = None
+        self.orden_descendente = False
+        self._filtro_pendiente = None
+        
+        # Log de actividad: últimas LINEAS_LOG líneas y las pendientes de pintar
+        self.lineas_log: Deque[Tuple[str, str]] = deque(maxlen=self.LINEAS_LOG)
+        self._log_pendiente: Deque[Tuple[str, str]] = deque()
         
-        # Configurar callbacks
-        self.organizador.set_callback_progreso(self.actualizar_progreso)
+        # Configurar callbacks (el progreso no es un callback: se consulta en refrescar_progreso)
         self.organizador.set_callback_decision_usuario(self.mostrar_dialogo_archivo_desconocido)
         self.monitor.set_callback_archivo_detectado(self.on_archivo_detectado)
         
@@ -37,6 +301,15 @@ class VentanaPrincipal:
         self.crear_widgets()
         self.cargar_configuracion_inicial()
         
+        # El progreso y el log de los hilos de trabajo se pintan a ritmo fijo
+        self._version_progreso = 0
+        self.refrescar_progreso()
+        self.volcar_log()
+        
+        # Diagnóstico opcional de bloqueos de la interfaz
+        self.vigilante = VigilanteBucle(self.root)
+        self.vigilante.iniciar()
+        
         # Verificar si es primera vez
         if config.es_primera_vez():
             self.mostrar_setup_inicial()
@@ -254,36 +527,44 @@ class VentanaPrincipal:
         archivos_frame = ttk.Frame(self.notebook)
         self.notebook.add(archivos_frame, text="📁 Archivos")
         
+        # Filtros de la lista
+        filtro_archivos_frame = ttk.Frame(archivos_frame)
+        filtro_archivos_frame.grid(row=0, column=0, sticky=(tk.W, tk.E), pady=(0, 5))
+        
+        ttk.Label(filtro_archivos_frame, text="Buscar:").grid(row=0, column=0, padx=(0, 5))
+        self.buscar_var = tk.StringVar()
+        self.buscar_var.trace_add('write', lambda *_: self._programar_filtro())
+        ttk.Entry(filtro_archivos_frame, textvariable=self.buscar_var, width=20).grid(row=0, column=1, padx=(0, 10))
+        
+        ttk.Label(filtro_archivos_frame, text="Estado:").grid(row=0, column=2, padx=(0, 5))
+        self.filtro_estado_var = tk.StringVar(value="Todos")
+        filtro_estado = ttk.Combobox(filtro_archivos_frame, textvariable=self.filtro_estado_var, state='readonly',
+                                     values=list(self.FILTROS_ESTADO), width=14)
+        filtro_estado.grid(row=0, column=3, padx=(0, 10))
+        filtro_estado.bind('<<ComboboxSelected>>', lambda e: self.aplicar_filtros_lista())
+        
+        ttk.Label(filtro_archivos_frame, text="Categoría:").grid(row=0, column=4, padx=(0, 5))
+        self.filtro_categoria_var = tk.StringVar(value="Todas")
+        filtro_categoria = ttk.Combobox(filtro_archivos_frame, textvariable=self.filtro_categoria_var, state='readonly',
+                                        values=["Todas"], width=14)
+        filtro_categoria.configure(postcommand=lambda: filtro_categoria.configure(values=self._categorias_filtro()))
+        filtro_categoria.grid(row=0, column=5, padx=(0, 10))
+        filtro_categoria.bind('<<ComboboxSelected>>', lambda e: self.aplicar_filtros_lista())
+        
+        self.filtrados_label = ttk.Label(filtro_archivos_frame, text="")
+        self.filtrados_label.grid(row=0, column=6, sticky=tk.W)
+        
         # Lista de archivos con scrollbar
         list_frame = ttk.Frame(archivos_frame)
-        list_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
-        
-        # Treeview para archivos
-        columns = ('Nombre', 'Extensión', 'Tamaño', 'Categoría', 'Estado')
-        self.tree_archivos = ttk.Treeview(list_frame, columns=columns, show='headings', height=15)
-        
-        # Configurar columnas
-        self.tree_archivos.heading('Nombre', text='Nombre del Archivo')
-        self.tree_archivos.heading('Extensión', text='Ext.')
-        self.tree_archivos.heading('Tamaño', text='Tamaño')
-        self.tree_archivos.heading('Categoría', text='Categoría')
-        self.tree_archivos.heading('Estado', text='Estado')
-        
-        self.tree_archivos.column('Nombre', width=200)
-        self.tree_archivos.column('Extensión', width=50)
-        self.tree_archivos.column('Tamaño', width=80)
-        self.tree_archivos.column('Categoría', width=100)
-        self.tree_archivos.column('Estado', width=100)
-        
-        # Scrollbars
-        scrollbar_v = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.tree_archivos.yview)
-        scrollbar_h = ttk.Scrollbar(list_frame, orient=tk.HORIZONTAL, command=self.tree_archivos.xview)
-        self.tree_archivos.configure(yscrollcommand=scrollbar_v.set, xscrollcommand=scrollbar_h.set)
-        
-        # Grid layout
-        self.tree_archivos.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        scrollbar_v.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        scrollbar_h.grid(row=1, column=0, sticky=(tk.W, tk.E))
+        list_frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
+        
+        # Lista virtualizada: solo existen en Tk las filas visibles
+        columnas = [('Nombre', 'Nombre del Archivo', 200), ('Extensión', 'Ext.', 50),
+                    ('Tamaño', 'Tamaño', 80), ('Categoría', 'Categoría', 100), ('Estado', 'Estado', 100)]
+        self.lista_archivos = ListaVirtual(list_frame, columnas, callback_orden=self.ordenar_lista)
+        self.lista_archivos.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.tree_archivos = self.lista_archivos.tree
+        self.tree_archivos.tag_configure('ignorado', foreground='gray')
         
         list_frame.columnconfigure(0, weight=1)
         list_frame.rowconfigure(0, weight=1)
@@ -292,11 +573,24 @@ class VentanaPrincipal:
         log_frame = ttk.Frame(self.notebook)
         self.notebook.add(log_frame, text="📝 Log de Actividad")
         
+        # Filtro por nivel
+        filtro_frame = ttk.Frame(log_frame)
+        filtro_frame.grid(row=0, column=0, sticky=tk.W, pady=(0, 5))
+        ttk.Label(filtro_frame, text="Mostrar:").grid(row=0, column=0, padx=(0, 5))
+        self.filtro_log_var = tk.StringVar(value="Todo")
+        filtro_log = ttk.Combobox(filtro_frame, textvariable=self.filtro_log_var, state='readonly',
+                                  values=list(self.FILTROS_LOG), width=12)
+        filtro_log.grid(row=0, column=1)
+        filtro_log.bind('<<ComboboxSelected>>', lambda e: self.aplicar_filtro_log())
+        
         # Text widget para log
         log_text_frame = ttk.Frame(log_frame)
-        log_text_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        log_text_frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
-        self.log_text = tk.Text(log_text_frame, wrap=tk.WORD, height=20)
+        self.log_text = tk.Text(log_text_frame, wrap=tk.WORD, height=20, state='disabled')
+        self.log_text.tag_configure('ERROR', foreground='red')
+        self.log_text.tag_configure('WARNING', foreground='orange')
+        self.log_text.tag_configure('SUCCESS', foreground='green')
         log_scrollbar = ttk.Scrollbar(log_text_frame, orient=tk.VERTICAL, command=self.log_text.yview)
         self.log_text.configure(yscrollcommand=log_scrollbar.set)
         
@@ -308,9 +602,9 @@ class VentanaPrincipal:
         
         # Configurar weights
         archivos_frame.columnconfigure(0, weight=1)
-        archivos_frame.rowconfigure(0, weight=1)
+        archivos_frame.rowconfigure(1, weight=1)
         log_frame.columnconfigure(0, weight=1)
-        log_frame.rowconfigure(0, weight=1)
+        log_frame.rowconfigure(1, weight=1)
         parent.columnconfigure(0, weight=1)
         parent.rowconfigure(0, weight=1)
     
@@ -422,9 +716,23 @@ class VentanaPrincipal:
         if self.procesando:
             return
         
+        anterior = self.archivos_escaneados
+        nuevo = AlmacenArchivos()
+        cola_escaneo: queue.Queue = queue.Queue()
+        
+        # Primer escaneo: la lista se llena según llegan los lotes. Al
+        # reescanear se sigue mostrando el anterior y al final se aplican
+        # solo las diferencias.
+        en_vivo = not len(anterior)
+        if en_vivo:
+            self.archivos_escaneados = nuevo
+            self.almacen_creciendo = nuevo
+            self.lista_archivos.establecer_datos(range(0), self._fila_archivo)
+        self._resumen_en_vivo = [0, 0]
+        
         def escanear_thread():
             self.procesando = True
-            self.actualizar_botones_estado()
+            self.root.after(0, self.actualizar_botones_estado)
             
             try:
                 carpeta_origen = Path(config.config['carpeta_origen'])
@@ -433,22 +741,91 @@ class VentanaPrincipal:
                     return
                 
                 self.agregar_log(f"Escaneando carpeta: {carpeta_origen}")
-                self.archivos_escaneados = self.organizador.escanear_carpeta(carpeta_origen)
+                with perfil.etapa('escaneo'):
+                    for lote in self.organizador.escanear_por_lotes(carpeta_origen):
+                        nuevo.extend(lote)
+                        validos = [archivo for archivo in lote if archivo.estado != EstadoArchivo.IGNORADO
+                                   and archivo.categoria_sugerida != "No organizar"]
+                        cola_escaneo.put(('lote', len(nuevo), len(validos), sum(a.tamaño for a in validos)))
                 
-                # Actualizar interfaz en hilo principal
-                self.root.after(0, self.actualizar_lista_archivos)
-                self.root.after(0, self.actualizar_estadisticas_sesion)
+                # La comparación con el escaneo anterior y los índices de orden y
+                # filtro se calculan aquí, fuera del hilo de Tk
+                diferencias = None if en_vivo else nuevo.comparar_con(anterior)
+                indice = IndiceAlmacen(nuevo)
+                indice.preparar(self.COLUMNAS_ORDEN.get(self.columna_orden))
+                cola_escaneo.put(('fin', anterior, nuevo, diferencias, indice))
                 
-                self.agregar_log(f"Escaneo completado: {len(self.archivos_escaneados)} archivos encontrados")
+                self.agregar_log(f"Escaneo completado: {len(nuevo)} archivos encontrados")
+                if diferencias is not None:
+                    self.agregar_log(f"Cambios desde el escaneo anterior: {len(diferencias.insertados)} nuevos, "
+                                     f"{len(diferencias.eliminados)} eliminados, "
+                                     f"{len(diferencias.actualizados)} modificados")
                 
             except Exception as e:
                 self.agregar_log(f"ERROR en escaneo: {e}")
             finally:
-                self.procesando = False
-                self.root.after(0, self.actualizar_botones_estado)
+                cola_escaneo.put(('terminado',))
         
+        self.root.after(self.INTERVALO_REFRESCO_MS, lambda: self._drenar_escaneo(cola_escaneo, nuevo, en_vivo))
         threading.Thread(target=escanear_thread, daemon=True).start()
     
+    @trazador.medir('drenar_escaneo')
+    def _drenar_escaneo(self, cola_escaneo: queue.Queue, nuevo: AlmacenArchivos, en_vivo: bool):
+        """Aplica en el hilo de Tk lo que ha llegado del escaneo desde el último ciclo"""
+        filas = None
+        terminado = False
+        while not terminado:
+            try:
+                mensaje = cola_escaneo.get_nowait()
+            except queue.Empty:
+                break
+            
+            if mensaje[0] == 'lote':
+                _, filas, archivos, tamaño = mensaje
+                self._resumen_en_vivo[0] += archivos
+                self._resumen_en_vivo[1] += tamaño
+            elif mensaje[0] == 'fin':
+                self.finalizar_escaneo(*mensaje[1:], en_vivo=en_vivo)
+                filas = None
+            else:
+                terminado = True
+        
+        if filas is not None:
+            # Un solo repintado por ciclo, por muchos lotes que hayan llegado. Con
+            # orden o filtros activos la lista se completa al terminar.
+            if (en_vivo and self.archivos_escaneados is nuevo
+                    and self.columna_orden is None and not self._hay_filtro()):
+                self.lista_archivos.actualizar_datos(range(filas), self.lista_archivos.seleccion)
+            self._mostrar_resumen(*self._resumen_en_vivo)
+        
+        if terminado:
+            if self.almacen_creciendo is nuevo:
+                # El escaneo falló antes de terminar: lo leído ya no crece
+                self.almacen_creciendo = None
+                if self.archivos_escaneados is nuevo and (self.columna_orden is not None or self._hay_filtro()):
+                    self.aplicar_filtros_lista()
+            self.procesando = False
+            self.actualizar_botones_estado()
+        else:
+            self.root.after(self.INTERVALO_REFRESCO_MS, lambda: self._drenar_escaneo(cola_escaneo, nuevo, en_vivo))
+    
+    def finalizar_escaneo(self, anterior: AlmacenArchivos, nuevo: AlmacenArchivos,
+                          diferencias: Optional[DiferenciasAlmacen], indice: Optional[IndiceAlmacen] = None,
+                          en_vivo: bool = False):
+        """Deja la lista con el resultado completo del escaneo"""
+        if self.almacen_creciendo is nuevo:
+            self.almacen_creciendo = None
+        if indice is not None:
+            self.indice_archivos = indice
+        if en_vivo and self.archivos_escaneados is nuevo:
+            # Las filas ya están en pantalla; solo falta aplicar el orden y los filtros elegidos
+            orden = self._orden_archivos()
+            self.lista_archivos.actualizar_datos(orden, self.lista_archivos.seleccion)
+            self._mostrar_filtrados(orden)
+            self.actualizar_estadisticas_sesion()
+        else:
+            self.aplicar_escaneo(anterior, nuevo, diferencias)
+    
     def organizar_ahora(self):
         """Ejecuta la organización de archivos"""
         if not self.archivos_escaneados or self.procesando:
@@ -464,6 +841,10 @@ class VentanaPrincipal:
             if not respuesta:
                 return
         
+        # Resolver las extensiones desconocidas antes de empezar a mover
+        if not self.resolver_desconocidos():
+            return
+        
         def organizar_thread():
             self.procesando = True
             self.root.after(0, self.actualizar_botones_estado)
@@ -487,6 +868,28 @@ class VentanaPrincipal:
         
         threading.Thread(target=organizar_thread, daemon=True).start()
     
+    def resolver_desconocidos(self) -> bool:
+        """Pide de una vez la categoría de cada extensión desconocida pendiente
+        
+        Así el hilo de organización nunca se queda esperando a un diálogo.
+        Devuelve False si el usuario cancela.
+        """
+        if config.config.get('accion_desconocidos', 'preguntar') != 'preguntar':
+            return True
+        
+        grupos = self.organizador.desconocidos_por_extension(self.archivos_escaneados)
+        if not grupos:
+            return True
+        
+        dialogo = DialogoResolucionDesconocidos(self.root, grupos)
+        if dialogo.resultado is None:
+            self.agregar_log("Organización cancelada: hay extensiones desconocidas sin resolver")
+            return False
+        
+        self.organizador.registrar_decisiones(dialogo.resultado)
+        self.agregar_log(f"Decisiones guardadas para {len(dialogo.resultado)} extensiones desconocidas")
+        return True
+    
     def mostrar_vista_previa(self):
         """Muestra una vista previa de la organización"""
         if not self.archivos_escaneados:
@@ -557,6 +960,7 @@ class VentanaPrincipal:
         if self.archivos_escaneados:
             self.actualizar_estadisticas_sesion()
     
+    @trazador.medir('on_archivo_detectado')
     def on_archivo_detectado(self, archivo: Path):
         """Callback cuando se detecta un archivo nuevo"""
         self.agregar_log(f"Archivo nuevo detectado: {archivo.name}")
@@ -588,72 +992,189 @@ class VentanaPrincipal:
                 self.btn_organizar.config(state='disabled')
                 self.btn_vista_previa.config(state='disabled')
     
-    def actualizar_progreso(self, actual: int, total: int, mensaje: str):
-        """Callback para actualizar barra de progreso"""
+    def refrescar_progreso(self):
+        """Pinta el último progreso publicado por el organizador (a INTERVALO_REFRESCO_MS)
+        
+        Los hilos de trabajo solo publican en organizador.progreso; aquí se
+        lee el último valor, así que el coste de pintar no depende de
+        cuántos archivos se procesen.
+        """
+        version, actual, total, mensaje, restante = self.organizador.progreso.leer()
+        if version != self._version_progreso:
+            self._version_progreso = version
+            self.actualizar_progreso(actual, total, mensaje, restante)
+        self.root.after(self.INTERVALO_REFRESCO_MS, self.refrescar_progreso)
+    
+    @trazador.medir('actualizar_progreso')
+    def actualizar_progreso(self, actual: int, total: int, mensaje: str, restante: Optional[float] = None):
+        """Actualiza barra de progreso y estado (solo desde el hilo de Tk)"""
         if total > 0:
             porcentaje = (actual / total) * 100
             self.progress_var.set(porcentaje)
         
         self.status_label.config(text=mensaje)
-        self.root.update_idletasks()
+        
+        # ETA en vivo durante la organización
+        if restante is not None:
+            self.stats_labels['tiempo_estimado'].config(
+                text=f"Tiempo restante: {FileUtils.formatear_duracion(restante)}"
+            )
     
     def limpiar_lista_archivos(self):
         """Limpia la lista de archivos"""
-        for item in self.tree_archivos.get_children():
-            self.tree_archivos.delete(item)
-        self.archivos_escaneados = []
+        self.archivos_escaneados = AlmacenArchivos()
+        self.lista_archivos.limpiar()
+        self._mostrar_filtrados(range(0))
         self.actualizar_estadisticas_sesion()
     
+    def _fila_archivo(self, indice: int) -> Tuple[tuple, tuple]:
+        """Valores y tags de una fila de la lista (solo se pide para las visibles)"""
+        archivo = self.archivos_escaneados[indice]
+        estado = archivo.estado
+        estado_texto = TEXTO_ESTADO.get(estado, estado.value)
+        
+        # Cambiar color para archivos ignorados
+        tags = ('ignorado',) if estado == EstadoArchivo.IGNORADO else ()
+        
+        return (
+            archivo.nombre,
+            archivo.extension,
+            FileUtils.formatear_tamaño(archivo.tamaño),
+            archivo.categoria_sugerida,
+            estado_texto
+        ), tags
+    
+    def _indice(self) -> IndiceAlmacen:
+        """Índices de orden y filtro del almacén mostrado (se rehacen si cambia)"""
+        if self.indice_archivos.almacen is not self.archivos_escaneados:
+            self.indice_archivos = IndiceAlmacen(self.archivos_escaneados)
+        return self.indice_archivos
+    
+    def _hay_filtro(self) -> bool:
+        return (self.FILTROS_ESTADO[self.filtro_estado_var.get()] is not None
+                or self.filtro_categoria_var.get() != "Todas" or bool(self.buscar_var.get().strip()))
+    
+    def _orden_archivos(self) -> Sequence[int]:
+        """Índices del almacén que pasan los filtros, en el orden elegido en los encabezados"""
+        estado = self.FILTROS_ESTADO[self.filtro_estado_var.get()]
+        categoria = self.filtro_categoria_var.get()
+        return self._indice().filtrar(
+            self.COLUMNAS_ORDEN.get(self.columna_orden), self.orden_descendente,
+            estados=None if estado is None else [estado],
+            categorias=None if categoria == "Todas" else [categoria],
+            texto=self.buscar_var.get()
+        )
+    
+    def _categorias_filtro(self) -> List[str]:
+        """Opciones del filtro de categoría: las configuradas y las encontradas"""
+        categorias = set(config.categorias) | set(self.archivos_escaneados.categorias.valores)
+        return ["Todas", *sorted(categorias)]
+    
+    def _escaneo_en_curso(self) -> bool:
+        """True si la lista muestra un almacén que el hilo de escaneo sigue ampliando"""
+        return self.almacen_creciendo is not None and self.archivos_escaneados is self.almacen_creciendo
+    
+    def _mostrar_filtrados(self, orden: Sequence[int]):
+        total = len(self.archivos_escaneados)
+        texto = "" if len(orden) == total else f"Mostrando {len(orden)} de {total}"
+        self.filtrados_label.config(text=texto)
+    
+    def _programar_filtro(self):
+        """Espera a que se deje de escribir antes de volver a filtrar"""
+        if self._filtro_pendiente is not None:
+            self.root.after_cancel(self._filtro_pendiente)
+        self._filtro_pendiente = self.root.after(150, self.aplicar_filtros_lista)
+    
+    @trazador.medir('aplicar_filtros_lista')
+    def aplicar_filtros_lista(self):
+        """Vuelve a filtrar la lista con los índices precalculados (sin reordenar nada)"""
+        self._filtro_pendiente = None
+        if self._escaneo_en_curso():
+            # Indexar columnas que otro hilo está ampliando no es seguro; el
+            # orden y los filtros elegidos se aplican al llegar el final del
+            # escaneo, con el índice que ya prepara el hilo
+            self.filtrados_label.config(text="Se aplicará al terminar el escaneo")
+            return
+        orden = self._orden_archivos()
+        self.lista_archivos.establecer_orden(orden)
+        self._mostrar_filtrados(orden)
+    
+    def ordenar_lista(self, columna: str):
+        """Ordena por la columna pulsada (un segundo clic invierte el orden)"""
+        if self.columna_orden == columna:
+            self.orden_descendente = not self.orden_descendente
+        else:
+            self.columna_orden, self.orden_descendente = columna, False
+        
+        self.lista_archivos.marcar_orden(columna, self.orden_descendente)
+        self.aplicar_filtros_lista()
+    
+    @trazador.medir('actualizar_lista_archivos')
     def actualizar_lista_archivos(self):
         """Actualiza la lista de archivos en la interfaz"""
-        # Limpiar lista actual
-        for item in self.tree_archivos.get_children():
-            self.tree_archivos.delete(item)
-        
-        # Agregar archivos escaneados
-        for archivo in self.archivos_escaneados:
-            estado_texto = archivo.estado.value
-            if archivo.estado == EstadoArchivo.DESCONOCIDO:
-                estado_texto = "❓ Desconocido"
-            elif archivo.estado == EstadoArchivo.EN_USO:
-                estado_texto = "🔒 En uso"
-            elif archivo.estado == EstadoArchivo.IGNORADO:
-                estado_texto = "⏭️ Ignorado"
-            
-            # Cambiar color para archivos ignorados
-            tags = []
-            if archivo.estado == EstadoArchivo.IGNORADO:
-                tags = ['ignorado']
-            
-            item_id = self.tree_archivos.insert('', 'end', values=(
-                archivo.nombre,
-                archivo.extension,
-                FileUtils.formatear_tamaño(archivo.tamaño),
-                archivo.categoria_sugerida,
-                estado_texto
-            ), tags=tags)
+        # Tiempo constante: la lista solo pinta las filas visibles
+        orden = self._orden_archivos()
+        self.lista_archivos.establecer_datos(orden, self._fila_archivo)
+        self._mostrar_filtrados(orden)
+    
+    @trazador.medir('aplicar_escaneo')
+    def aplicar_escaneo(self, anterior: AlmacenArchivos, nuevo: AlmacenArchivos,
+                        diferencias: Optional[DiferenciasAlmacen]):
+        """Muestra un escaneo nuevo aplicando solo los cambios respecto al anterior"""
+        # Si la lista cambió mientras se escaneaba, la comparación ya no vale
+        if diferencias is None or anterior is not self.archivos_escaneados:
+            self.archivos_escaneados = nuevo
+            self.actualizar_lista_archivos()
+        else:
+            self.archivos_escaneados = nuevo
+            self.aplicar_cambios_lista(diferencias)
+        self.actualizar_estadisticas_sesion()
+    
+    def aplicar_cambios_lista(self, diferencias: DiferenciasAlmacen):
+        """Traslada orden y selección a los índices del nuevo escaneo
         
-        # Configurar tag para archivos ignorados
-        self.tree_archivos.tag_configure('ignorado', foreground='gray')
+        Los archivos que siguen existiendo conservan su posición y su
+        selección, los nuevos se añaden al final (o se reordena si hay una
+        columna de orden activa) y la lista se repinta una sola vez, en el
+        siguiente ciclo ocioso, y solo si algo ha cambiado.
+        """
+        lista = self.lista_archivos
+        correspondencia = diferencias.correspondencia
+        seleccion = {correspondencia[j] for j in lista.seleccion if j in correspondencia}
+        
+        if diferencias.vacia:
+            lista.actualizar_datos(lista.orden, seleccion, repintar=False)
+            return
+        
+        if ((self.columna_orden is not None or self._hay_filtro())
+                and (diferencias.insertados or diferencias.actualizados)):
+            orden = self._orden_archivos()
+        else:
+            orden = [correspondencia[j] for j in lista.orden if j in correspondencia]
+            orden.extend(diferencias.insertados)
+        lista.actualizar_datos(orden, seleccion)
+        self._mostrar_filtrados(orden)
     
     def actualizar_estadisticas_sesion(self):
         """Actualiza las estadísticas de la sesión actual"""
-        # Filtrar solo archivos de categorías activas
-        archivos_validos = [
-            a for a in self.archivos_escaneados 
-            if a.categoria_sugerida != "No organizar" and a.estado != EstadoArchivo.IGNORADO
-        ]
+        if self._escaneo_en_curso():
+            # Los totales parciales los pinta _drenar_escaneo
+            return
+        
+        # Agregados sobre las columnas del almacén (sin recorrer objetos)
+        totales = self.archivos_escaneados.totales_por_categoria(solo_validos=True)
+        totales.pop("No organizar", None)
         
-        total_archivos = len(archivos_validos)
-        total_tamaño = sum(a.tamaño for a in archivos_validos)
+        total_archivos = sum(archivos for archivos, _ in totales.values())
+        total_tamaño = sum(tamaño for _, tamaño in totales.values())
         
-        # Contar por categorías activas
+        # Duración prevista con el modelo aprendido de organizaciones anteriores
+        tiempo_estimado = self.organizador.estimar_duracion(self.archivos_escaneados)
+        self._mostrar_resumen(total_archivos, total_tamaño, tiempo_estimado)
+    
+    def _mostrar_resumen(self, total_archivos: int, total_tamaño: int, tiempo_estimado: Optional[float] = None):
+        """Pinta el resumen de la sesión (también durante el escaneo, con totales parciales)"""
         categorias_activas = config.obtener_categorias_activas()
-        archivos_por_categoria = {}
-        for archivo in archivos_validos:
-            cat = archivo.categoria_sugerida
-            if cat in categorias_activas:
-                archivos_por_categoria[cat] = archivos_por_categoria.get(cat, 0) + 1
         
         self.stats_labels['archivos_encontrados'].config(
             text=f"Archivos a organizar: {total_archivos}"
@@ -670,12 +1191,11 @@ class VentanaPrincipal:
         if hasattr(self, 'categorias_activas_label'):
             self.categorias_activas_label.config(text=f"Activas: {categorias_texto}")
         
-        # Calcular tiempo estimado
-        tiempo_estimado = total_archivos * 0.1
-        if tiempo_estimado < 60:
-            tiempo_texto = f"{tiempo_estimado:.1f} segundos"
+        # Sin estimación mientras el escaneo sigue en curso
+        if tiempo_estimado is None:
+            tiempo_texto = "calculando..."
         else:
-            tiempo_texto = f"{tiempo_estimado/60:.1f} minutos"
+            tiempo_texto = FileUtils.formatear_duracion(tiempo_estimado)
         
         self.stats_labels['tiempo_estimado'].config(
             text=f"Tiempo estimado: {tiempo_texto}"
@@ -697,24 +1217,76 @@ class VentanaPrincipal:
             label = ttk.Label(self.root.nametowidget(str(self.root.children['!frame'].children['!labelframe3'])), text=texto)
             label.grid(row=i+8, column=0, sticky=tk.W, pady=1)
     
-    def agregar_log(self, mensaje: str):
-        """Agrega un mensaje al log"""
-        timestamp = time.strftime("%H:%M:%S")
-        linea_log = f"[{timestamp}] {mensaje}\n"
-        
-        def actualizar_log():
-            self.log_text.config(state='normal')
-            self.log_text.insert(tk.END, linea_log)
-            self.log_text.see(tk.END)
-            self.log_text.config(state='disabled')
-        
-        if threading.current_thread() == threading.main_thread():
-            actualizar_log()
-        else:
-            self.root.after(0, actualizar_log)
+    @staticmethod
+    def _nivel_mensaje(mensaje: str) -> str:
+        """Nivel de un mensaje del log de actividad según cómo empieza"""
+        if mensaje.startswith(("ERROR", "❌")):
+            return 'ERROR'
+        if mensaje.startswith(("⚠", "ADVERTENCIA")):
+            return 'WARNING'
+        if mensaje.startswith("✅"):
+            return 'SUCCESS'
+        return 'INFO'
+    
+    def agregar_log(self, mensaje: str, nivel: Optional[str] = None):
+        """Agrega un mensaje al log (se puede llamar desde cualquier hilo)
+        
+        Solo encola la línea; volcar_log() la pinta junto con las demás
+        en el siguiente ciclo de refresco.
+        """
+        nivel = nivel or self._nivel_mensaje(mensaje)
+        self._log_pendiente.append((nivel, f"[{time.strftime('%H:%M:%S')}] {mensaje}\n"))
+    
+    def _lineas_visibles(self, lineas) -> list:
+        """Argumentos para Text.insert (texto, tag, texto, tag...) de las líneas que pasan el filtro"""
+        minimo = logger.NIVELES[self.FILTROS_LOG[self.filtro_log_var.get()]]
+        argumentos = []
+        for nivel, linea in lineas:
+            if logger.NIVELES[nivel] >= minimo:
+                argumentos.extend((linea, nivel))
+        return argumentos
+    
+    @trazador.medir('volcar_log')
+    def volcar_log(self):
+        """Pinta de una vez las líneas llegadas desde el último ciclo (a INTERVALO_REFRESCO_MS)"""
+        nuevas = []
+        while self._log_pendiente:
+            nuevas.append(self._log_pendiente.popleft())
+        
+        if nuevas:
+            self.lineas_log.extend(nuevas)
+            argumentos = self._lineas_visibles(nuevas[-self.LINEAS_LOG:])
+            if argumentos:
+                al_final = self.log_text.yview()[1] >= 1.0
+                self.log_text.config(state='normal')
+                self.log_text.insert(tk.END, *argumentos)
+                
+                # El widget nunca guarda más líneas que el búfer
+                sobrantes = int(self.log_text.index('end-1c').split('.')[0]) - 1 - self.LINEAS_LOG
+                if sobrantes > 0:
+                    self.log_text.delete('1.0', f'{sobrantes + 1}.0')
+                self.log_text.config(state='disabled')
+                
+                # Solo seguir el final si el usuario no se ha desplazado hacia arriba
+                if al_final:
+                    self.log_text.see(tk.END)
+        
+        self.root.after(self.INTERVALO_REFRESCO_MS, self.volcar_log)
+    
+    def aplicar_filtro_log(self):
+        """Vuelve a pintar el log desde el búfer con el nivel elegido"""
+        argumentos = self._lineas_visibles(self.lineas_log)
+        self.log_text.config(state='normal')
+        self.log_text.delete('1.0', tk.END)
+        if argumentos:
+            self.log_text.insert(tk.END, *argumentos)
+        self.log_text.config(state='disabled')
+        self.log_text.see(tk.END)
     
     def mostrar_resultado_organizacion(self, resultado: dict, tiempo_transcurrido: float):
         """Muestra el resultado de la organización"""
+        # Descartar el progreso pendiente para que no tape el mensaje final
+        self._version_progreso = self.organizador.progreso.leer()[0]
         self.progress_var.set(0)
         self.status_label.config(text="Organización completada")
         
@@ -757,9 +1329,31 @@ class VentanaPrincipal:
         VentanaEstadisticas(self.root)
     
     def mostrar_dialogo_archivo_desconocido(self, archivo: ArchivoInfo) -> Optional[Tuple[str, bool]]:
-        """Muestra diálogo para archivos desconocidos"""
-        dialogo = DialogoArchivoDesconocido(self.root, archivo)
-        return dialogo.resultado
+        """Muestra diálogo para archivos desconocidos (se puede llamar desde cualquier hilo)
+        
+        Solo llega aquí lo que no se resolvió antes de organizar, como los
+        archivos que organiza el monitoreo automático.
+        """
+        if threading.current_thread() is threading.main_thread():
+            return DialogoArchivoDesconocido(self.root, archivo).resultado
+        
+        # Desde un hilo de trabajo: abrir el diálogo en el hilo de Tk y esperar la respuesta
+        respuesta = {}
+        listo = threading.Event()
+        
+        def mostrar():
+            try:
+                respuesta['resultado'] = DialogoArchivoDesconocido(self.root, archivo).resultado
+            finally:
+                listo.set()
+        
+        self.root.after(0, mostrar)
+        # Sin esperar para siempre: si se cancela o se cierra la ventana
+        # (el diálogo quizá ni llegue a abrirse) el archivo se omite
+        while not listo.wait(0.2):
+            if self.organizador.detener_procesamiento or self.cerrando:
+                return None
+        return respuesta.get('resultado')
     
     def ejecutar(self):
         """Ejecuta la aplicación"""
@@ -783,6 +1377,11 @@ class VentanaPrincipal:
                 return
             self.organizador.detener()
         
+        # Persistir las estadísticas acumuladas en memoria
+        stats.cerrar()
+        self.vigilante.detener()
+        
+        self.cerrando = True
         self.root.destroy()
 
 # ========================================
@@ -904,11 +1503,29 @@ El Organizador de Descargas puede:
         self.ventana.destroy()
 
 class VentanaVistaPrevia:
-    """Ventana que muestra vista previa de la organización"""
+    """Ventana que muestra vista previa de la organización
+    
+    Los nodos de categoría se crean al abrir; los archivos de cada uno se
+    insertan al expandirlo, de PAGINA en PAGINA, así que planes enormes se
+    abren al instante y se pueden recorrer enteros.
+    """
+    
+    PAGINA = 500
+    TAMAÑO_GRANDE = 100 * 1024 * 1024
+    FILTROS = ["Todos", "Con conflicto de nombre", "Mayores de 100 MB"]
     
     def __init__(self, parent, plan: dict, archivos: List[ArchivoInfo]):
         self.plan = plan
         self.archivos = archivos
+        self.almacen = archivos.almacen if isinstance(archivos, (AlmacenArchivos, SeleccionArchivos)) else AlmacenArchivos(archivos)
+        
+        # Índices que se preparan una vez para filtrar el plan completo
+        self.buscador = BuscadorNombres(self.almacen)
+        self._conflictos = set(plan['archivos_con_conflictos'].indices)
+        self._filtrados: Dict[Tuple[str, str], Sequence[int]] = {}
+        self._nodos: Dict[str, list] = {}  # nodo -> [título, índices, cargados]
+        self._mas: Dict[str, str] = {}  # elemento "mostrar más" -> nodo
+        self._filtro_pendiente = None
         
         self.ventana = tk.Toplevel(parent)
         self.ventana.title("Vista Previa de Organización")
@@ -933,7 +1550,7 @@ class VentanaVistaPrevia:
 💾 Tamaño total: {self.plan['resumen']['tamaño_legible']}
 📂 Categorías involucradas: {self.plan['resumen']['categorias_involucradas']}
 ⚠️ Conflictos de nombres: {self.plan['resumen']['conflictos_nombres']}
-❓ Archivos desconocidos: {self.plan['resumen']['archivos_desconocidos']}
+❓ Archivos desconocidos: {self.plan['resumen']['archivos_desconocidos']} ({self.plan['resumen']['extensiones_desconocidas']} extensiones)
 🔒 Archivos en uso: {self.plan['resumen']['archivos_en_uso']}
 
 🎯 Tipo de organización: {tipo_organizacion}"""
@@ -944,6 +1561,25 @@ class VentanaVistaPrevia:
         lista_frame = ttk.LabelFrame(main_frame, text="Vista Previa Detallada - Destinos Exactos", padding="10")
         lista_frame.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 10))
         
+        # Búsqueda y filtro sobre el plan completo
+        filtro_frame = ttk.Frame(lista_frame)
+        filtro_frame.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 5))
+        
+        ttk.Label(filtro_frame, text="Buscar:").grid(row=0, column=0, padx=(0, 5))
+        self.buscar_var = tk.StringVar()
+        self.buscar_var.trace_add('write', lambda *_: self._programar_filtro())
+        ttk.Entry(filtro_frame, textvariable=self.buscar_var, width=30).grid(row=0, column=1, padx=(0, 15))
+        
+        ttk.Label(filtro_frame, text="Mostrar:").grid(row=0, column=2, padx=(0, 5))
+        self.filtro_var = tk.StringVar(value=self.FILTROS[0])
+        filtro_combo = ttk.Combobox(filtro_frame, textvariable=self.filtro_var, values=self.FILTROS,
+                                    state="readonly", width=24)
+        filtro_combo.grid(row=0, column=3, padx=(0, 15))
+        filtro_combo.bind('<<ComboboxSelected>>', lambda e: self.poblar_tree_preview())
+        
+        self.resultado_filtro_label = ttk.Label(filtro_frame, text="")
+        self.resultado_filtro_label.grid(row=0, column=4, sticky=tk.W)
+        
         # Treeview para vista previa con columna de destino completo
         columns = ('Archivo', 'Tamaño', 'Destino_Completo')
         self.tree_preview = ttk.Treeview(lista_frame, columns=columns, show='tree headings', height=15)
@@ -964,9 +1600,14 @@ class VentanaVistaPrevia:
         scrollbar_h = ttk.Scrollbar(lista_frame, orient=tk.HORIZONTAL, command=self.tree_preview.xview)
         self.tree_preview.configure(yscrollcommand=scrollbar_v.set, xscrollcommand=scrollbar_h.set)
         
-        self.tree_preview.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        scrollbar_v.grid(row=0, column=1, sticky=(tk.N, tk.S))
-        scrollbar_h.grid(row=1, column=0, sticky=(tk.W, tk.E))
+        self.tree_preview.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        scrollbar_v.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        scrollbar_h.grid(row=2, column=0, sticky=(tk.W, tk.E))
+        
+        self.tree_preview.tag_configure('conflicto', foreground='#cc6600')
+        self.tree_preview.tag_configure('mas', foreground='blue')
+        self.tree_preview.bind('<<TreeviewOpen>>', self._al_abrir_nodo)
+        self.tree_preview.bind('<<TreeviewSelect>>', self._al_seleccionar)
         
         # Poblar el treeview
         self.poblar_tree_preview()
@@ -983,7 +1624,7 @@ class VentanaVistaPrevia:
         main_frame.columnconfigure(0, weight=1)
         main_frame.rowconfigure(1, weight=1)
         lista_frame.columnconfigure(0, weight=1)
-        lista_frame.rowconfigure(0, weight=1)
+        lista_frame.rowconfigure(1, weight=1)
     
     def _obtener_tipo_organizacion_texto(self) -> str:
         """Obtiene una descripción del tipo de organización configurado"""
@@ -1001,38 +1642,119 @@ class VentanaVistaPrevia:
         else:
             return "📁 Organización simple (ej: Documentos/)"
     
+    def _grupos_plan(self) -> List[Tuple[str, SeleccionArchivos]]:
+        """Nodos de primer nivel: cada categoría y, aparte, desconocidos y en uso"""
+        grupos = [(f"📁 {categoria}", seleccion) for categoria, seleccion in self.plan['archivos_por_categoria'].items()]
+        if len(self.plan['archivos_desconocidos']):
+            grupos.append(("❓ Desconocidos", self.plan['archivos_desconocidos']))
+        if len(self.plan['archivos_en_uso']):
+            grupos.append(("🔒 En uso", self.plan['archivos_en_uso']))
+        return grupos
+    
+    def _filtrar_grupo(self, titulo: str, seleccion: SeleccionArchivos) -> Sequence[int]:
+        """Índices del grupo que pasan el filtro y la búsqueda actuales"""
+        filtro = self.filtro_var.get()
+        clave = (titulo, filtro)
+        indices = self._filtrados.get(clave)
+        if indices is None:
+            if filtro == "Con conflicto de nombre":
+                indices = [i for i in seleccion.indices if i in self._conflictos]
+            elif filtro == "Mayores de 100 MB":
+                tamaños = self.almacen.tamaños
+                indices = [i for i in seleccion.indices if tamaños[i] >= self.TAMAÑO_GRANDE]
+            else:
+                indices = seleccion.indices
+            self._filtrados[clave] = indices
+        return self.buscador.filtrar(indices, self.buscar_var.get(), clave=clave)
+    
+    def _programar_filtro(self):
+        """Espera a que se deje de escribir antes de volver a filtrar"""
+        if self._filtro_pendiente is not None:
+            self.ventana.after_cancel(self._filtro_pendiente)
+        self._filtro_pendiente = self.ventana.after(150, self.poblar_tree_preview)
+    
     def poblar_tree_preview(self):
-        """Llena el treeview con los datos de vista previa mostrando rutas exactas"""
-        # Agrupar por categoría
-        for categoria, archivos in self.plan['archivos_por_categoria'].items():
-            # Insertar nodo de categoría
-            categoria_node = self.tree_preview.insert('', 'end', text=f"📁 {categoria} ({len(archivos)})")
+        """Inserta un nodo por grupo; los archivos se cargan por páginas al expandirlo"""
+        self._filtro_pendiente = None
+        tree = self.tree_preview
+        abiertos = {self._nodos[nodo][0] for nodo in self._nodos if tree.item(nodo, 'open')}
+        tree.delete(*tree.get_children())
+        self._nodos = {}
+        self._mas = {}
+        
+        mostrados = total = 0
+        for titulo, seleccion in self._grupos_plan():
+            indices = self._filtrar_grupo(titulo, seleccion)
+            mostrados += len(indices)
+            total += len(seleccion)
             
-            # Insertar archivos de la categoría
-            for archivo in archivos[:15]:  # Mostrar hasta 15 para no saturar
-                # Mostrar la ruta destino completa real
-                if archivo.ruta_destino:
-                    ruta_completa = str(archivo.ruta_destino)
-                    # Acortar solo si es muy larga
-                    if len(ruta_completa) > 60:
-                        ruta_mostrar = "..." + ruta_completa[-57:]
-                    else:
-                        ruta_mostrar = ruta_completa
-                else:
-                    ruta_mostrar = "⚠️ No determinado"
-                
-                self.tree_preview.insert(categoria_node, 'end', values=(
-                    archivo.nombre,
-                    FileUtils.formatear_tamaño(archivo.tamaño),
-                    ruta_mostrar
-                ))
+            texto = f"{titulo} ({len(indices)})" if len(indices) == len(seleccion) else f"{titulo} ({len(indices)} de {len(seleccion)})"
+            nodo = tree.insert('', 'end', text=texto)
+            self._nodos[nodo] = [titulo, indices, 0]
+            if len(indices):
+                # Hijo provisional para que el nodo se pueda expandir
+                tree.insert(nodo, 'end', text="Cargando...")
+        
+        if not abiertos and self._nodos:
+            abiertos = {self._nodos[next(iter(self._nodos))][0]}
+        for nodo, (titulo, indices, _) in self._nodos.items():
+            if titulo in abiertos and len(indices):
+                self._cargar_pagina(nodo)
+                tree.item(nodo, open=True)
+        
+        if mostrados == total:
+            self.resultado_filtro_label.config(text="")
+        else:
+            self.resultado_filtro_label.config(text=f"{mostrados} de {total} archivos")
+    
+    def _cargar_pagina(self, nodo: str):
+        """Añade al nodo la siguiente página de archivos"""
+        tree = self.tree_preview
+        titulo, indices, cargados = self._nodos[nodo]
+        if cargados == 0:
+            tree.delete(*tree.get_children(nodo))
+        else:
+            for item, padre in list(self._mas.items()):
+                if padre == nodo:
+                    tree.delete(item)
+                    del self._mas[item]
+        
+        almacen = self.almacen
+        fin = min(cargados + self.PAGINA, len(indices))
+        for i in indices[cargados:fin]:
+            archivo = almacen[i]
+            ruta_destino = archivo.ruta_destino
+            if ruta_destino:
+                ruta_completa = str(ruta_destino)
+                # Acortar solo si es muy larga
+                ruta_mostrar = "..." + ruta_completa[-57:] if len(ruta_completa) > 60 else ruta_completa
+            else:
+                ruta_mostrar = "⚠️ No determinado"
             
-            if len(archivos) > 15:
-                self.tree_preview.insert(categoria_node, 'end', text=f"... y {len(archivos) - 15} archivos más")
-        
-        # Expandir todas las categorías para mejor visualización
-        for item in self.tree_preview.get_children():
-            self.tree_preview.item(item, open=True)
+            tree.insert(nodo, 'end', values=(
+                archivo.nombre,
+                FileUtils.formatear_tamaño(archivo.tamaño),
+                ruta_mostrar
+            ), tags=('conflicto',) if i in self._conflictos else ())
+        
+        self._nodos[nodo][2] = fin
+        restantes = len(indices) - fin
+        if restantes:
+            item = tree.insert(nodo, 'end', text=f"⬇️ Mostrar {min(self.PAGINA, restantes)} más (quedan {restantes})",
+                               tags=('mas',))
+            self._mas[item] = nodo
+    
+    def _al_abrir_nodo(self, event=None):
+        nodo = self.tree_preview.focus()
+        if nodo in self._nodos and self._nodos[nodo][2] == 0 and len(self._nodos[nodo][1]):
+            self._cargar_pagina(nodo)
+    
+    def _al_seleccionar(self, event=None):
+        for item in self.tree_preview.selection():
+            nodo = self._mas.get(item)
+            if nodo is not None:
+                self._cargar_pagina(nodo)
+                break
 
 class DialogoArchivoDesconocido:
     """Diálogo para manejar archivos con extensiones desconocidas"""
@@ -1234,14 +1956,7 @@ class DialogoArchivoDesconocido:
             )
             if nueva_categoria:
                 categoria = nueva_categoria
-                # Crear la nueva categoría en config
-                if categoria not in config.categorias:
-                    config.categorias[categoria] = []
-                    # Crear carpeta destino
-                    carpeta_destino = Path(config.config['carpeta_origen']) / categoria
-                    config.config['carpetas_destino'][categoria] = str(carpeta_destino)
-                    config.guardar_configuracion()
-                    config.guardar_categorias()
+                self.crear_categoria(categoria)
             else:
                 return  # Usuario canceló
         
@@ -1252,6 +1967,210 @@ class DialogoArchivoDesconocido:
         """Omite el archivo"""
         self.resultado = None
         self.ventana.destroy()
+    
+    @staticmethod
+    def crear_categoria(categoria: str):
+        """Crea en la configuración una categoría nueva con su carpeta destino"""
+        if categoria not in config.categorias:
+            config.categorias[categoria] = []
+            # Crear carpeta destino
+            carpeta_destino = Path(config.config['carpeta_origen']) / categoria
+            config.config['carpetas_destino'][categoria] = str(carpeta_destino)
+            config.guardar_configuracion()
+            config.guardar_categorias()
+
+class DialogoResolucionDesconocidos:
+    """Resolución por lotes de las extensiones desconocidas antes de organizar
+    
+    Muestra una fila por extensión, no por archivo. En `resultado` deja
+    {extensión: (categoría, recordar) o None para omitir}, o None si se
+    cancela. Recordar una extensión como regla es una elección por fila y
+    está desactivada por defecto.
+    """
+    
+    OMITIR = "⏭️ Omitir"
+    CREAR_NUEVA = "📁 Crear nueva categoría..."
+    
+    def __init__(self, parent, grupos: Dict[str, SeleccionArchivos]):
+        self.grupos = grupos
+        self.resultado = None
+        
+        categoria_inicial = "Otros" if "Otros" in config.categorias else self.OMITIR
+        self.decisiones: Dict[str, str] = {extension: categoria_inicial for extension in grupos}
+        self.recordar: Dict[str, bool] = {extension: False for extension in grupos}
+        self._extension_item: Dict[str, str] = {}
+        
+        self.ventana = tk.Toplevel(parent)
+        self.ventana.title("Extensiones Desconocidas")
+        self.ventana.geometry("650x500")
+        self.ventana.minsize(550, 400)
+        self.ventana.grab_set()
+        
+        self.crear_widgets()
+        
+        # Centrar en pantalla
+        self.ventana.update_idletasks()
+        x = (self.ventana.winfo_screenwidth() // 2) - (self.ventana.winfo_width() // 2)
+        y = (self.ventana.winfo_screenheight() // 2) - (self.ventana.winfo_height() // 2)
+        self.ventana.geometry(f"+{x}+{y}")
+        
+        # Esperar resultado
+        self.ventana.wait_window()
+    
+    def crear_widgets(self):
+        """Crea los widgets del diálogo"""
+        self.ventana.columnconfigure(0, weight=1)
+        self.ventana.rowconfigure(0, weight=1)
+        
+        main_frame = ttk.Frame(self.ventana, padding="20")
+        main_frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        main_frame.columnconfigure(0, weight=1)
+        main_frame.rowconfigure(2, weight=1)
+        
+        # === TÍTULO ===
+        ttk.Label(main_frame, text="🤔 Extensiones Desconocidas", style='Title.TLabel').grid(row=0, column=0, pady=(0, 10))
+        
+        total_archivos = sum(len(grupo) for grupo in self.grupos.values())
+        ttk.Label(
+            main_frame,
+            text=f"{total_archivos} archivos con {len(self.grupos)} extensiones desconocidas.\n"
+                 "Elige una categoría para cada extensión antes de organizar.",
+            justify=tk.CENTER
+        ).grid(row=1, column=0, pady=(0, 15))
+        
+        # === LISTA DE EXTENSIONES ===
+        lista_frame = ttk.Frame(main_frame)
+        lista_frame.grid(row=2, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        lista_frame.columnconfigure(0, weight=1)
+        lista_frame.rowconfigure(0, weight=1)
+        
+        columnas = ('Extensión', 'Archivos', 'Tamaño', 'Ejemplo', 'Destino', 'Recordar')
+        self.tree = ttk.Treeview(lista_frame, columns=columnas, show='headings', height=10)
+        for columna, ancho in zip(columnas, (80, 70, 80, 180, 120, 70)):
+            self.tree.heading(columna, text=columna)
+            self.tree.column(columna, width=ancho)
+        
+        scrollbar = ttk.Scrollbar(lista_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        
+        for extension, grupo in self.grupos.items():
+            _, tamaño = grupo.totales_por('extension').get(extension, (0, 0))
+            item = self.tree.insert('', 'end', values=(
+                extension or "(sin extensión)",
+                len(grupo),
+                FileUtils.formatear_tamaño(tamaño),
+                grupo[0].nombre,
+                self.decisiones[extension],
+                self._texto_recordar(extension)
+            ))
+            self._extension_item[extension] = item
+        self.tree.bind('<Double-1>', self._alternar_recordar)
+        
+        # === ASIGNAR CATEGORÍA A LA SELECCIÓN ===
+        asignar_frame = ttk.Frame(main_frame)
+        asignar_frame.grid(row=3, column=0, sticky=tk.W, pady=(10, 0))
+        
+        ttk.Label(asignar_frame, text="Mover seleccionadas a:").grid(row=0, column=0, padx=(0, 5))
+        self.categoria_var = tk.StringVar(value="Otros" if "Otros" in config.categorias else self.OMITIR)
+        self.categoria_combo = ttk.Combobox(
+            asignar_frame,
+            textvariable=self.categoria_var,
+            values=self._opciones_categoria(),
+            state='readonly',
+            width=22
+        )
+        self.categoria_combo.grid(row=0, column=1, padx=(0, 5))
+        
+        self.recordar_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            asignar_frame,
+            text="Recordar como regla",
+            variable=self.recordar_var
+        ).grid(row=0, column=2, padx=(0, 5))
+        ttk.Button(asignar_frame, text="Asignar", command=self.asignar).grid(row=0, column=3)
+        
+        opciones_frame = ttk.Frame(main_frame)
+        opciones_frame.grid(row=4, column=0, sticky=tk.W, pady=(10, 0))
+        ttk.Label(
+            opciones_frame,
+            text="💡 Doble clic en una fila para cambiar si se recuerda",
+            foreground='gray'
+        ).pack(anchor='w')
+        
+        # Omitir todos los desconocidos, ahora y en adelante
+        self.omitir_todos_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            opciones_frame,
+            text="⏭️ Omitir TODOS los archivos desconocidos (cualquier extensión)",
+            variable=self.omitir_todos_var
+        ).pack(anchor='w', pady=(5, 0))
+        
+        # === BOTONES ===
+        botones_frame = ttk.Frame(main_frame)
+        botones_frame.grid(row=5, column=0, pady=(15, 0))
+        ttk.Button(botones_frame, text="❌ Cancelar", command=self.cancelar, width=15).pack(side=tk.LEFT, padx=(0, 20))
+        btn_aceptar = ttk.Button(botones_frame, text="✅ Organizar", command=self.aceptar, width=15)
+        btn_aceptar.pack(side=tk.LEFT)
+        
+        self.ventana.bind('<Escape>', lambda e: self.cancelar())
+        btn_aceptar.focus_set()
+    
+    def _opciones_categoria(self) -> List[str]:
+        return list(config.categorias.keys()) + [self.OMITIR, self.CREAR_NUEVA]
+    
+    def _texto_recordar(self, extension: str) -> str:
+        return "Sí" if self.recordar[extension] else "No"
+    
+    def asignar(self):
+        """Asigna la categoría elegida (y si se recuerda) a las extensiones seleccionadas"""
+        seleccionados = set(self.tree.selection())
+        if not seleccionados:
+            return
+        
+        categoria = self.categoria_var.get()
+        if categoria == self.CREAR_NUEVA:
+            categoria = simpledialog.askstring("Nueva Categoría", "Nombre de la nueva categoría:", parent=self.ventana)
+            if not categoria:
+                return  # Usuario canceló
+            DialogoArchivoDesconocido.crear_categoria(categoria)
+            self.categoria_combo.configure(values=self._opciones_categoria())
+            self.categoria_var.set(categoria)
+        
+        recordar = self.recordar_var.get() and categoria != self.OMITIR
+        for extension, item in self._extension_item.items():
+            if item in seleccionados:
+                self.decisiones[extension] = categoria
+                self.recordar[extension] = recordar
+                self.tree.set(item, 'Destino', categoria)
+                self.tree.set(item, 'Recordar', self._texto_recordar(extension))
+    
+    def _alternar_recordar(self, event):
+        """Doble clic: cambia si se recuerda la extensión de esa fila"""
+        item = self.tree.identify_row(event.y)
+        for extension, item_extension in self._extension_item.items():
+            if item_extension == item and self.decisiones[extension] != self.OMITIR:
+                self.recordar[extension] = not self.recordar[extension]
+                self.tree.set(item, 'Recordar', self._texto_recordar(extension))
+    
+    def aceptar(self):
+        if self.omitir_todos_var.get():
+            # Igual que en el diálogo por archivo: ignorar los desconocidos en adelante
+            config.actualizar_configuracion({'accion_desconocidos': 'ignorar'})
+            self.resultado = {extension: None for extension in self.decisiones}
+            self.ventana.destroy()
+            return
+        
+        self.resultado = {
+            extension: None if categoria == self.OMITIR else (categoria, self.recordar[extension])
+            for extension, categoria in self.decisiones.items()
+        }
+        self.ventana.destroy()
+    
+    def cancelar(self):
+        self.resultado = None
+        self.ventana.destroy()
 
 class VentanaConfiguracion:
     """Ventana de configuración avanzada"""
@@ -1582,9 +2501,59 @@ class VentanaConfiguracion:
 Archivos organizados: {resumen_stats['total_archivos']}
 Tamaño procesado: {resumen_stats['total_tamaño']}
 Extensiones aprendidas: {len(config.reglas_personalizadas)}
+Reglas aprendidas por contenido: {len(config.obtener_reglas_aprendidas())}
 Carpeta de configuración: {config.config_dir}"""
         
         ttk.Label(frame, text=info_texto, justify=tk.LEFT).grid(row=5, column=0, sticky=tk.W, pady=5)
+        
+        # Reglas aprendidas por detección de contenido
+        ttk.Label(frame, text="Reglas aprendidas:", font=('Arial', 10, 'bold')).grid(row=6, column=0, sticky=tk.W, pady=(15, 5))
+        
+        aprendidas_frame = ttk.Frame(frame)
+        aprendidas_frame.grid(row=7, column=0, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 5))
+        
+        self.tree_aprendidas = ttk.Treeview(aprendidas_frame, columns=('Extensión', 'Categoría'), show='headings', height=5)
+        self.tree_aprendidas.heading('Extensión', text='Extensión')
+        self.tree_aprendidas.heading('Categoría', text='Categoría')
+        self.tree_aprendidas.column('Extensión', width=100)
+        self.tree_aprendidas.column('Categoría', width=150)
+        self.tree_aprendidas.pack(side='left', fill='both', expand=True)
+        
+        scrollbar_aprendidas = ttk.Scrollbar(aprendidas_frame, orient=tk.VERTICAL, command=self.tree_aprendidas.yview)
+        scrollbar_aprendidas.pack(side='right', fill='y')
+        self.tree_aprendidas.configure(yscrollcommand=scrollbar_aprendidas.set)
+        
+        ttk.Button(frame, text="Revocar regla seleccionada", command=self.revocar_regla_aprendida).grid(row=8, column=0, sticky=tk.W, pady=2)
+        
+        self.poblar_tree_aprendidas()
+        frame.columnconfigure(0, weight=1)
+    
+    def poblar_tree_aprendidas(self):
+        """Llena el treeview con las reglas aprendidas"""
+        for item in self.tree_aprendidas.get_children():
+            self.tree_aprendidas.delete(item)
+        
+        for extension, categoria in sorted(config.obtener_reglas_aprendidas().items()):
+            self.tree_aprendidas.insert('', 'end', iid=extension, values=(extension, categoria))
+    
+    def revocar_regla_aprendida(self):
+        """Revoca la regla aprendida seleccionada"""
+        seleccion = self.tree_aprendidas.selection()
+        if not seleccion:
+            messagebox.showwarning("Advertencia", "Selecciona una regla aprendida primero")
+            return
+        
+        extension = seleccion[0]
+        categoria = config.obtener_reglas_aprendidas().get(extension, '')
+        respuesta = messagebox.askyesno(
+            "Confirmar",
+            f"¿Revocar la regla aprendida {extension} → {categoria}?\n\n"
+            "La extensión no se volverá a aprender automáticamente."
+        )
+        if respuesta:
+            config.revocar_regla_aprendida(extension)
+            logger.info(f"Regla aprendida revocada: {extension}")
+            self.poblar_tree_aprendidas()
     
     def poblar_tree_categorias(self):
         """Llena el treeview con las categorías actuales"""
@@ -1687,8 +2656,7 @@ Carpeta de configuración: {config.config_dir}"""
             "¿Estás seguro de que quieres limpiar todas las estadísticas?"
         )
         if respuesta:
-            stats.stats = stats.cargar_estadisticas()  # Resetear a valores por defecto
-            stats.guardar_estadisticas()
+            stats.reiniciar()
             messagebox.showinfo("Completado", "Estadísticas limpiadas")
     
     def exportar_configuracion(self):
@@ -1820,7 +2788,7 @@ class VentanaEstadisticas:
     def __init__(self, parent):
         self.ventana = tk.Toplevel(parent)
         self.ventana.title("Estadísticas Detalladas")
-        self.ventana.geometry("500x400")
+        self.ventana.geometry("500x600")
         self.ventana.grab_set()
         
         self.crear_widgets()
@@ -1866,18 +2834,41 @@ Primera organización: {resumen['primera_vez'] or 'Nunca'}
                 ttk.Label(cat_frame, text=f"📁 {categoria}: {cantidad} archivos").pack(anchor='w')
         
         # Extensiones desconocidas
-        if stats.stats['extensiones_desconocidas']:
+        extensiones_frecuentes = stats.extensiones_frecuentes(5)
+        if extensiones_frecuentes:
             ext_frame = ttk.LabelFrame(main_frame, text="Extensiones Más Frecuentes", padding="10")
             ext_frame.pack(fill='x', pady=(0, 10))
             
-            extensiones_ordenadas = sorted(
-                stats.stats['extensiones_desconocidas'].items(),
-                key=lambda x: x[1],
-                reverse=True
-            )[:5]
+            for extension, cantidad, error in extensiones_frecuentes:
+                # Con error > 0 la cuenta es aproximada: entre cantidad - error y cantidad
+                texto = f"📄 {extension}: {cantidad} veces" if not error else f"📄 {extension}: ~{cantidad} veces"
+                ttk.Label(ext_frame, text=texto).pack(anchor='w')
+        
+        # Historial de los últimos 30 días
+        try:
+            totales = historial.totales_periodo(30)
+            tendencia = historial.tendencia_rendimiento(30)
+        except Exception as e:
+            logger.warning(f"No se pudo leer el historial: {e}")
+            totales = None
+        
+        if totales and totales['sesiones']:
+            hist_frame = ttk.LabelFrame(main_frame, text="Últimos 30 Días", padding="10")
+            hist_frame.pack(fill='x', pady=(0, 10))
+            
+            rendimiento = (totales['bytes'] / totales['duracion']) if totales['duracion'] else 0
+            hist_texto = f"""Sesiones: {totales['sesiones']}   Archivos: {totales['archivos']}   Errores: {totales['errores']}
+Tamaño organizado: {FileUtils.formatear_tamaño(totales['bytes'])}
+Rendimiento medio: {FileUtils.formatear_tamaño(int(rendimiento))}/s"""
+            ttk.Label(hist_frame, text=hist_texto, justify=tk.LEFT).pack(anchor='w')
             
-            for extension, cantidad in extensiones_ordenadas:
-                ttk.Label(ext_frame, text=f"📄 {extension}: {cantidad} veces").pack(anchor='w')
+            # Tendencia: últimos días con actividad
+            for dia in tendencia[-5:]:
+                ttk.Label(
+                    hist_frame,
+                    text=f"📈 {dia['dia']}: {FileUtils.formatear_tamaño(int(dia['bytes_por_segundo']))}/s, "
+                         f"{dia['archivos_por_segundo']:.1f} archivos/s"
+                ).pack(anchor='w')
         
         # Botón cerrar
         ttk.Button(main_frame, text="Cerrar", command=self.ventana.destroy).pack(pady=(20, 0))
\ No newline at end of file
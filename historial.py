@@ -0,0 +1,284 @@
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config import config
+
+class HistorialEstadisticas:
+    """Historial de organizaciones en SQLite con agregados por sesión, día y mes
+    
+    Cada sesión se guarda con su detalle por categoría y extensión, y al
+    mismo tiempo se acumula en los agregados diarios. La retención borra
+    las sesiones antiguas (los agregados diarios se conservan) y reduce los
+    días muy antiguos a agregados mensuales. Todas las consultas van por
+    claves primarias o índices, así que años de historial se leen al instante.
+    """
+    
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS sesiones (
+            id INTEGER PRIMARY KEY,
+            inicio REAL NOT NULL,
+            dia TEXT NOT NULL,
+            duracion REAL NOT NULL,
+            archivos INTEGER NOT NULL,
+            bytes INTEGER NOT NULL,
+            errores INTEGER NOT NULL,
+            omitidos INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_sesiones_inicio ON sesiones(inicio);
+        
+        CREATE TABLE IF NOT EXISTS sesiones_detalle (
+            sesion_id INTEGER NOT NULL,
+            tipo TEXT NOT NULL,
+            clave TEXT NOT NULL,
+            archivos INTEGER NOT NULL,
+            bytes INTEGER NOT NULL,
+            PRIMARY KEY (sesion_id, tipo, clave)
+        ) WITHOUT ROWID;
+        
+        CREATE TABLE IF NOT EXISTS diario (
+            dia TEXT PRIMARY KEY,
+            sesiones INTEGER NOT NULL,
+            archivos INTEGER NOT NULL,
+            bytes INTEGER NOT NULL,
+            duracion REAL NOT NULL,
+            errores INTEGER NOT NULL
+        ) WITHOUT ROWID;
+        
+        CREATE TABLE IF NOT EXISTS diario_detalle (
+            dia TEXT NOT NULL,
+            tipo TEXT NOT NULL,
+            clave TEXT NOT NULL,
+            archivos INTEGER NOT NULL,
+            bytes INTEGER NOT NULL,
+            PRIMARY KEY (tipo, dia, clave)
+        ) WITHOUT ROWID;
+        
+        CREATE TABLE IF NOT EXISTS mensual (
+            mes TEXT PRIMARY KEY,
+            sesiones INTEGER NOT NULL,
+            archivos INTEGER NOT NULL,
+            bytes INTEGER NOT NULL,
+            duracion REAL NOT NULL,
+            errores INTEGER NOT NULL
+        ) WITHOUT ROWID;
+        
+        CREATE TABLE IF NOT EXISTS mensual_detalle (
+            mes TEXT NOT NULL,
+            tipo TEXT NOT NULL,
+            clave TEXT NOT NULL,
+            archivos INTEGER NOT NULL,
+            bytes INTEGER NOT NULL,
+            PRIMARY KEY (tipo, mes, clave)
+        ) WITHOUT ROWID;
+    """
+    
+    # ON CONFLICT ... DO UPDATE llegó en SQLite 3.24; en versiones anteriores
+    # se crea la fila a cero si no existe y se suma con un UPDATE aparte
+    UPSERT = sqlite3.sqlite_version_info >= (3, 24, 0)
+    
+    def __init__(self, archivo_db: Optional[Path] = None):
+        if archivo_db is None:
+            archivo_db = config.config_dir / "historial.sqlite3"
+        
+        self.archivo_db = archivo_db
+        self._lock = threading.Lock()
+        self._conexion: Optional[sqlite3.Connection] = None
+        self._ultima_retencion: Optional[date] = None
+    
+    @property
+    def conexion(self) -> sqlite3.Connection:
+        """Abre la base de datos la primera vez que se necesita"""
+        if self._conexion is None:
+            self.archivo_db.parent.mkdir(parents=True, exist_ok=True)
+            conexion = sqlite3.connect(str(self.archivo_db), check_same_thread=False)
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("PRAGMA synchronous=NORMAL")
+            conexion.executescript(self.ESQUEMA)
+            self._conexion = conexion
+        return self._conexion
+    
+    def _acumular(self, conexion: sqlite3.Connection, tabla: str, claves: Tuple[str, ...],
+                  valores: Tuple[str, ...], filas: List[tuple]):
+        """Suma `valores` a las filas de `tabla` con esas claves, creándolas si no existen
+        
+        Cada fila trae primero las claves y después los valores, en el orden dado.
+        """
+        columnas = ', '.join(claves + valores)
+        if self.UPSERT:
+            marcas = ', '.join('?' * len(claves + valores))
+            sumas = ', '.join(f"{valor} = {valor} + excluded.{valor}" for valor in valores)
+            conexion.executemany(
+                f"INSERT INTO {tabla} ({columnas}) VALUES ({marcas}) "
+                f"ON CONFLICT({', '.join(claves)}) DO UPDATE SET {sumas}",
+                filas
+            )
+            return
+        
+        marcas = ', '.join(['?'] * len(claves) + ['0'] * len(valores))
+        conexion.executemany(f"INSERT OR IGNORE INTO {tabla} ({columnas}) VALUES ({marcas})",
+                             [fila[:len(claves)] for fila in filas])
+        sumas = ', '.join(f"{valor} = {valor} + ?" for valor in valores)
+        condicion = ' AND '.join(f"{clave} = ?" for clave in claves)
+        conexion.executemany(f"UPDATE {tabla} SET {sumas} WHERE {condicion}",
+                             [tuple(fila[len(claves):]) + tuple(fila[:len(claves)]) for fila in filas])
+    
+    def registrar_sesion(self, inicio: float, duracion: float, archivos: int, bytes_movidos: int,
+                         errores: int = 0, omitidos: int = 0,
+                         por_categoria: Optional[Dict[str, Tuple[int, int]]] = None,
+                         por_extension: Optional[Dict[str, Tuple[int, int]]] = None) -> int:
+        """Guarda una sesión y la acumula en los agregados diarios"""
+        dia = datetime.fromtimestamp(inicio).date().isoformat()
+        detalle = [('categoria', clave, n, b) for clave, (n, b) in (por_categoria or {}).items()]
+        detalle += [('extension', clave, n, b) for clave, (n, b) in (por_extension or {}).items()]
+        
+        with self._lock, self.conexion as conexion:
+            cursor = conexion.execute(
+                "INSERT INTO sesiones (inicio, dia, duracion, archivos, bytes, errores, omitidos) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (inicio, dia, duracion, archivos, bytes_movidos, errores, omitidos)
+            )
+            sesion_id = cursor.lastrowid
+            
+            conexion.executemany(
+                "INSERT INTO sesiones_detalle (sesion_id, tipo, clave, archivos, bytes) VALUES (?, ?, ?, ?, ?)",
+                [(sesion_id, tipo, clave, n, b) for tipo, clave, n, b in detalle]
+            )
+            self._acumular(conexion, 'diario', ('dia',),
+                           ('sesiones', 'archivos', 'bytes', 'duracion', 'errores'),
+                           [(dia, 1, archivos, bytes_movidos, duracion, errores)])
+            self._acumular(conexion, 'diario_detalle', ('tipo', 'dia', 'clave'), ('archivos', 'bytes'),
+                           [(tipo, dia, clave, n, b) for tipo, clave, n, b in detalle])
+        
+        # La retención se aplica como mucho una vez al día
+        if self._ultima_retencion != date.today():
+            self.aplicar_retencion()
+        
+        return sesion_id
+    
+    def aplicar_retencion(self):
+        """Borra sesiones antiguas y reduce los días antiguos a meses"""
+        hoy = date.today()
+        dias_sesiones = config.config.get("retencion_sesiones_dias", 90)
+        dias_diario = config.config.get("retencion_diaria_dias", 730)
+        limite_sesiones = time.mktime((hoy - timedelta(days=dias_sesiones)).timetuple())
+        limite_diario = (hoy - timedelta(days=dias_diario)).isoformat()
+        
+        with self._lock, self.conexion as conexion:
+            conexion.execute(
+                "DELETE FROM sesiones_detalle WHERE sesion_id IN (SELECT id FROM sesiones WHERE inicio < ?)",
+                (limite_sesiones,)
+            )
+            conexion.execute("DELETE FROM sesiones WHERE inicio < ?", (limite_sesiones,))
+            
+            # Como mucho una fila por mes y tipo/clave: se agrega aquí y se acumula
+            meses = conexion.execute(
+                "SELECT substr(dia, 1, 7), SUM(sesiones), SUM(archivos), SUM(bytes), SUM(duracion), SUM(errores) "
+                "FROM diario WHERE dia < ? GROUP BY substr(dia, 1, 7)",
+                (limite_diario,)
+            ).fetchall()
+            self._acumular(conexion, 'mensual', ('mes',),
+                           ('sesiones', 'archivos', 'bytes', 'duracion', 'errores'), meses)
+            meses_detalle = conexion.execute(
+                "SELECT tipo, substr(dia, 1, 7), clave, SUM(archivos), SUM(bytes) "
+                "FROM diario_detalle WHERE dia < ? GROUP BY tipo, substr(dia, 1, 7), clave",
+                (limite_diario,)
+            ).fetchall()
+            self._acumular(conexion, 'mensual_detalle', ('tipo', 'mes', 'clave'), ('archivos', 'bytes'),
+                           meses_detalle)
+            conexion.execute("DELETE FROM diario WHERE dia < ?", (limite_diario,))
+            conexion.execute("DELETE FROM diario_detalle WHERE dia < ?", (limite_diario,))
+        
+        self._ultima_retencion = hoy
+    
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+    
+    def _consultar(self, sql: str, parametros: tuple = ()) -> List[Dict]:
+        with self._lock:
+            cursor = self.conexion.execute(sql, parametros)
+            columnas = [d[0] for d in cursor.description]
+            return [dict(zip(columnas, fila)) for fila in cursor.fetchall()]
+    
+    @staticmethod
+    def _rango(dias: int, hasta: Optional[date] = None) -> Tuple[str, str]:
+        hasta = hasta or date.today()
+        return (hasta - timedelta(days=dias - 1)).isoformat(), hasta.isoformat()
+    
+    def resumen_por_dia(self, dias: int = 30, hasta: Optional[date] = None) -> List[Dict]:
+        """Archivos, bytes, duración y errores de cada día del periodo (días sin actividad incluidos)"""
+        desde, hasta_txt = self._rango(dias, hasta)
+        filas = {fila['dia']: fila for fila in self._consultar(
+            "SELECT dia, sesiones, archivos, bytes, duracion, errores FROM diario "
+            "WHERE dia BETWEEN ? AND ? ORDER BY dia", (desde, hasta_txt)
+        )}
+        
+        inicio = date.fromisoformat(desde)
+        resultado = []
+        for i in range(dias):
+            dia = (inicio + timedelta(days=i)).isoformat()
+            resultado.append(filas.get(dia) or
+                             {'dia': dia, 'sesiones': 0, 'archivos': 0, 'bytes': 0, 'duracion': 0.0, 'errores': 0})
+        return resultado
+    
+    def tendencia_rendimiento(self, dias: int = 30, hasta: Optional[date] = None) -> List[Dict]:
+        """Rendimiento diario (bytes/s y archivos/s) de los días con actividad"""
+        desde, hasta_txt = self._rango(dias, hasta)
+        return self._consultar(
+            "SELECT dia, bytes * 1.0 / duracion AS bytes_por_segundo, "
+            "archivos * 1.0 / duracion AS archivos_por_segundo FROM diario "
+            "WHERE dia BETWEEN ? AND ? AND duracion > 0 ORDER BY dia", (desde, hasta_txt)
+        )
+    
+    def totales_periodo(self, dias: int = 30, hasta: Optional[date] = None) -> Dict:
+        """Totales agregados del periodo"""
+        desde, hasta_txt = self._rango(dias, hasta)
+        fila = self._consultar(
+            "SELECT COALESCE(SUM(sesiones), 0) AS sesiones, COALESCE(SUM(archivos), 0) AS archivos, "
+            "COALESCE(SUM(bytes), 0) AS bytes, COALESCE(SUM(duracion), 0) AS duracion, "
+            "COALESCE(SUM(errores), 0) AS errores FROM diario WHERE dia BETWEEN ? AND ?",
+            (desde, hasta_txt)
+        )[0]
+        return fila
+    
+    def top_por_tipo(self, tipo: str = 'categoria', dias: int = 30, limite: int = 5,
+                     hasta: Optional[date] = None) -> List[Dict]:
+        """Categorías o extensiones con más bytes organizados en el periodo"""
+        desde, hasta_txt = self._rango(dias, hasta)
+        return self._consultar(
+            "SELECT clave, SUM(archivos) AS archivos, SUM(bytes) AS bytes FROM diario_detalle "
+            "WHERE tipo = ? AND dia BETWEEN ? AND ? GROUP BY clave ORDER BY bytes DESC LIMIT ?",
+            (tipo, desde, hasta_txt, limite)
+        )
+    
+    def resumen_mensual(self, meses: int = 24) -> List[Dict]:
+        """Agregados por mes: meses ya reducidos más los días aún en la tabla diaria"""
+        return self._consultar(
+            "SELECT mes, SUM(sesiones) AS sesiones, SUM(archivos) AS archivos, SUM(bytes) AS bytes, "
+            "SUM(duracion) AS duracion, SUM(errores) AS errores FROM ("
+            "  SELECT mes, sesiones, archivos, bytes, duracion, errores FROM mensual"
+            "  UNION ALL"
+            "  SELECT substr(dia, 1, 7), sesiones, archivos, bytes, duracion, errores FROM diario"
+            ") GROUP BY mes ORDER BY mes DESC LIMIT ?", (meses,)
+        )
+    
+    def sesiones_recientes(self, limite: int = 20) -> List[Dict]:
+        """Últimas sesiones registradas"""
+        return self._consultar(
+            "SELECT id, inicio, duracion, archivos, bytes, errores, omitidos FROM sesiones "
+            "ORDER BY inicio DESC LIMIT ?", (limite,)
+        )
+    
+    def cerrar(self):
+        """Cierra la conexión con la base de datos"""
+        with self._lock:
+            if self._conexion is not None:
+                self._conexion.close()
+                self._conexion = None
+
+# Instancia global
+historial = HistorialEstadisticas()
\ No newline at end of file
@@ -0,0 +1,139 @@
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from typing import List, Optional, Tuple
+
+from config import config
+from utils import eventos, logger
+
+# Una muestra: (callback de Tk en curso, pila resumida del hilo principal)
+Muestra = Tuple[Optional[str], Tuple[str, ...]]
+
+class VigilanteBucle:
+    """Vigila la latencia del bucle de eventos de Tk
+    
+    Un latido con after() cada INTERVALO_MS anota cuándo se ejecutó; lo que
+    llega tarde respecto a lo programado es el tiempo que el bucle estuvo
+    sin atender eventos. Un hilo aparte mira el último latido y, si el bucle
+    lleva más de `umbral_ms` sin latir, toma muestras de la pila del hilo
+    principal con sys._current_frames(). Cuando el bucle se recupera, el
+    latido escribe un evento 'bloqueo_gui' en el registro estructurado con
+    la duración, el callback de Tk que estaba en curso y la pila más
+    repetida. Se activa con ORGANIZADOR_LATENCIA=1 o con la opción
+    "vigilar_latencia".
+    """
+    
+    INTERVALO_MS = 50
+    PERIODO_MUESTREO_S = 0.05
+    MUESTRAS_MAXIMAS = 100
+    PROFUNDIDAD_PILA = 12
+    
+    def __init__(self, root, umbral_ms: Optional[float] = None):
+        self.root = root
+        self.activo = (os.environ.get("ORGANIZADOR_LATENCIA", "").lower() in ("1", "true", "si", "sí") or
+                       bool(config.config.get("vigilar_latencia", False)))
+        self.umbral_s = (umbral_ms or config.config.get("umbral_bloqueo_ms", 250)) / 1000
+        
+        self.latidos = 0
+        self.bloqueos = 0
+        self.retraso_maximo = 0.0
+        
+        self._hilo_tk = threading.get_ident()  # Se crea desde el hilo de Tk
+        self._ultimo_latido = time.perf_counter()
+        self._muestras: List[Muestra] = []
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+    
+    def iniciar(self):
+        """Empieza a latir y a muestrear (no hace nada si está desactivado)"""
+        if not self.activo:
+            return
+        self._ultimo_latido = time.perf_counter()
+        self.root.after(self.INTERVALO_MS, self._latido)
+        threading.Thread(target=self._muestrear, name="vigilante-latencia", daemon=True).start()
+    
+    def detener(self):
+        """Para el vigilante y deja en el log el resumen de la sesión"""
+        if not self.activo or self._parar.is_set():
+            return
+        self._parar.set()
+        logger.info(f"Latencia de la interfaz: {self.bloqueos} bloqueos de más de {self.umbral_s * 1000:.0f} ms "
+                    f"en {self.latidos} latidos, máximo {self.retraso_maximo * 1000:.0f} ms")
+    
+    def _latido(self):
+        ahora = time.perf_counter()
+        retraso = ahora - self._ultimo_latido - self.INTERVALO_MS / 1000
+        self._ultimo_latido = ahora
+        self.latidos += 1
+        if retraso > self.retraso_maximo:
+            self.retraso_maximo = retraso
+        
+        with self._lock:
+            muestras, self._muestras = self._muestras, []
+        if retraso >= self.umbral_s:
+            self._informar(retraso, muestras)
+        
+        if not self._parar.is_set():
+            self.root.after(self.INTERVALO_MS, self._latido)
+    
+    def _muestrear(self):
+        """Hilo de muestreo: solo mira la pila mientras el bucle está bloqueado"""
+        while not self._parar.wait(self.PERIODO_MUESTREO_S):
+            bloqueado = time.perf_counter() - self._ultimo_latido - self.INTERVALO_MS / 1000
+            if bloqueado < self.umbral_s:
+                continue
+            
+            marco = sys._current_frames().get(self._hilo_tk)
+            if marco is None:
+                continue
+            muestra = self._resumir_pila(marco)
+            del marco
+            with self._lock:
+                if len(self._muestras) < self.MUESTRAS_MAXIMAS:
+                    self._muestras.append(muestra)
+    
+    def _resumir_pila(self, marco) -> Muestra:
+        """Callback de Tk en curso y últimas llamadas de la pila, sin leer el código fuente"""
+        pila = traceback.StackSummary.extract(traceback.walk_stack(marco), lookup_lines=False)
+        pila.reverse()  # De la más externa a la más interna
+        
+        # El callback es la primera llamada tras el CallWrapper.__call__ más
+        # externo de tkinter, saltando los marcos de tkinter (callit de
+        # after()) y los decoradores de medida de perfil.py. Si el bloqueo
+        # ocurre dentro de una llamada a Tk, esos marcos quedan más adentro.
+        callback = None
+        for posicion, llamada in enumerate(pila):
+            if self._es_tkinter(llamada) and llamada.name == '__call__':
+                for interna in pila[posicion + 1:]:
+                    if not self._es_tkinter(interna) and os.path.basename(interna.filename) != 'perfil.py':
+                        callback = self._formatear(interna)
+                        break
+                break
+        
+        return callback, tuple(self._formatear(llamada) for llamada in pila[-self.PROFUNDIDAD_PILA:])
+    
+    @staticmethod
+    def _es_tkinter(llamada: traceback.FrameSummary) -> bool:
+        return os.path.basename(os.path.dirname(llamada.filename)) == 'tkinter'
+    
+    @staticmethod
+    def _formatear(llamada: traceback.FrameSummary) -> str:
+        return f"{os.path.basename(llamada.filename)}:{llamada.lineno} {llamada.name}"
+    
+    def _informar(self, retraso: float, muestras: List[Muestra]):
+        """Registra un bloqueo en el registro estructurado y en el log"""
+        self.bloqueos += 1
+        callbacks = Counter(callback for callback, _ in muestras if callback)
+        pilas = Counter(pila for _, pila in muestras)
+        callback = callbacks.most_common(1)[0][0] if callbacks else None
+        pila = list(pilas.most_common(1)[0][0]) if pilas else []
+        
+        eventos.registrar('bloqueo_gui', None, int(retraso * 1_000_000),
+                          callback=callback, muestras=len(muestras), pila=pila)
+        # A disco enseguida: si el usuario mata la ventana colgada no debe perderse
+        eventos.volcar()
+        logger.warning(f"La interfaz estuvo bloqueada {retraso * 1000:.0f} ms"
+                       + (f" en {callback}" if callback else ""))
\ No newline at end of file
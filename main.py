@@ -199,6 +199,7 @@ USO:
     python main.py --help       # Muestra esta ayuda
     python main.py --version    # Muestra la versión
     python main.py --check      # Verifica el sistema sin abrir GUI
+    python main.py --stats [N]  # Historial de los últimos N días (30 por defecto)
 
 CARACTERÍSTICAS:
 ✅ Organización automática por tipo de archivo
@@ -227,8 +228,12 @@ ARCHIVOS DE CONFIGURACIÓN:
 - config.json: Configuración general
 - categorias.json: Categorías personalizadas
 - reglas_personalizadas.json: Reglas aprendidas
+- reglas_aprendidas.json: Reglas aprendidas por detección de contenido
 - estadisticas.json: Datos de uso
-- logs/: Archivos de registro
+- estadisticas.log: Eventos de uso pendientes de compactar
+- historial.sqlite3: Historial de sesiones y agregados diarios/mensuales
+- rendimiento.json: Velocidades medidas por disco para el tiempo estimado
+- logs/: Archivos de registro (organizador.log y copias rotadas .gz)
 
 SOLUCIÓN DE PROBLEMAS:
 1. Si no aparece la ventana, verifica que tengas tkinter instalado
@@ -278,6 +283,7 @@ def verificar_sistema():
         print(f"  📁 Carpeta origen: {config.config['carpeta_origen']}")
         print(f"  📊 Categorías definidas: {len(config.categorias)}")
         print(f"  🎯 Reglas personalizadas: {len(config.reglas_personalizadas)}")
+        print(f"  🧠 Reglas aprendidas: {len(config.obtener_reglas_aprendidas())}")
     except Exception as e:
         print(f"  ❌ Error cargando configuración: {e}")
         return False
@@ -317,6 +323,37 @@ def verificar_sistema():
     print("  El sistema está listo para ejecutar el Organizador de Descargas")
     return True
 
+def mostrar_historial(dias: int = 30):
+    """Muestra el historial de organización de los últimos días sin abrir GUI"""
+    from historial import historial
+    from utils import FileUtils
+    
+    print(f"📈 Historial de los últimos {dias} días")
+    print("=" * 60)
+    
+    filas = [fila for fila in historial.resumen_por_dia(dias) if fila['sesiones']]
+    if not filas:
+        print("  Sin actividad registrada en el periodo")
+        return
+    
+    print(f"{'Día':<12}{'Sesiones':>9}{'Archivos':>10}{'Tamaño':>12}{'Velocidad':>14}{'Errores':>9}")
+    for fila in filas:
+        velocidad = fila['bytes'] / fila['duracion'] if fila['duracion'] else 0
+        print(f"{fila['dia']:<12}{fila['sesiones']:>9}{fila['archivos']:>10}"
+              f"{FileUtils.formatear_tamaño(fila['bytes']):>12}"
+              f"{FileUtils.formatear_tamaño(int(velocidad)) + '/s':>14}{fila['errores']:>9}")
+    
+    totales = historial.totales_periodo(dias)
+    print("-" * 60)
+    print(f"{'Total':<12}{totales['sesiones']:>9}{totales['archivos']:>10}"
+          f"{FileUtils.formatear_tamaño(totales['bytes']):>12}")
+    
+    categorias = historial.top_por_tipo('categoria', dias)
+    if categorias:
+        print("\n📁 Categorías con más volumen:")
+        for fila in categorias:
+            print(f"  {fila['clave']}: {fila['archivos']} archivos, {FileUtils.formatear_tamaño(fila['bytes'])}")
+
 if __name__ == "__main__":
     # Manejar argumentos de línea de comandos
     if len(sys.argv) > 1:
@@ -340,6 +377,15 @@ if __name__ == "__main__":
             else:
                 sys.exit(1)
                 
+        elif arg in ['--stats', '-s', 'stats']:
+            try:
+                dias = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+            except ValueError:
+                print(f"❌ Número de días no válido: {sys.argv[2]}")
+                sys.exit(1)
+            mostrar_historial(max(1, dias))
+            sys.exit(0)
+                
         else:
             print(f"❌ Argumento desconocido: {arg}")
             print("Usa --help para ver las opciones disponibles")
@@ -0,0 +1,254 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from config import config
+
+_SIN_MEDICION = nullcontext()
+
+class _Medicion:
+    """Temporizador de una etapa para usar con `with`"""
+    
+    __slots__ = ('_perfil', '_etapa', '_inicio')
+    
+    def __init__(self, perfil: 'PerfilEtapas', etapa: str):
+        self._perfil = perfil
+        self._etapa = etapa
+    
+    def __enter__(self):
+        self._inicio = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, *excepcion):
+        self._perfil.terminar(self._etapa, self._inicio, time.perf_counter_ns())
+        return False
+
+class _Tramo:
+    """Tramo de traza con nombre libre (por ejemplo, un archivo)"""
+    
+    __slots__ = ('_trazador', '_nombre', '_categoria', '_args', '_inicio')
+    
+    def __init__(self, trazador: 'Trazador', nombre: str, categoria: str, args: Optional[Dict]):
+        self._trazador = trazador
+        self._nombre = nombre
+        self._categoria = categoria
+        self._args = args
+    
+    def __enter__(self):
+        self._inicio = time.perf_counter_ns()
+        return self
+    
+    def __exit__(self, *excepcion):
+        self._trazador.registrar(self._nombre, self._categoria, self._inicio,
+                                 time.perf_counter_ns(), self._args)
+        return False
+
+class Trazador:
+    """Traza temporal de una ejecución exportable al formato Chrome Trace Event
+    
+    Todos los hilos comparten un único búfer circular (un deque con tamaño
+    máximo, cuyo append es atómico), así que registrar no necesita locks:
+    solo dos lecturas del reloj y un append, y la memoria no crece aunque
+    se creen y terminen hilos. Cada tramo lleva el hilo que lo registró,
+    que se calcula una vez por hilo. Al exportar se escriben como eventos
+    completos ("ph": "X") más el nombre de cada hilo, listos para abrir en
+    Perfetto o chrome://tracing. Se activa
+    con ORGANIZADOR_TRAZA=<archivo.json> o con la opción "traza_archivo", y
+    la traza se exporta al salir.
+    """
+    
+    TRAMOS_MAXIMOS = 1_000_000
+    
+    def __init__(self):
+        self.archivo = os.environ.get("ORGANIZADOR_TRAZA") or config.config.get("traza_archivo") or None
+        self.activo = bool(self.archivo)
+        self._origen_ns = time.perf_counter_ns()
+        self._local = threading.local()
+        # (hilo, nombre, categoría, inicio_ns, fin_ns, args); hilo es (tid, nombre del hilo)
+        self._tramos: Deque[Tuple] = deque(maxlen=self.TRAMOS_MAXIMOS)
+        
+        if self.activo:
+            atexit.register(self.exportar)
+    
+    def _hilo(self) -> Tuple[int, str]:
+        hilo = getattr(self._local, 'hilo', None)
+        if hilo is None:
+            hilo = self._local.hilo = (threading.get_ident(), threading.current_thread().name)
+        return hilo
+    
+    def registrar(self, nombre: str, categoria: str, inicio_ns: int, fin_ns: int, args: Optional[Dict] = None):
+        self._tramos.append((self._hilo(), nombre, categoria, inicio_ns, fin_ns, args))
+    
+    def tramo(self, nombre: str, categoria: str = "archivo", **args):
+        """Context manager que traza un tramo (no hace nada si está desactivado)"""
+        return _Tramo(self, nombre, categoria, args or None) if self.activo else _SIN_MEDICION
+    
+    def medir(self, nombre: str, categoria: str = "gui") -> Callable:
+        """Decorador que traza cada llamada a una función"""
+        def decorador(funcion: Callable) -> Callable:
+            @wraps(funcion)
+            def envoltura(*args, **kwargs):
+                if not self.activo:
+                    return funcion(*args, **kwargs)
+                inicio = time.perf_counter_ns()
+                try:
+                    return funcion(*args, **kwargs)
+                finally:
+                    self.registrar(nombre, categoria, inicio, time.perf_counter_ns())
+            return envoltura
+        return decorador
+    
+    def eventos(self) -> List[Dict]:
+        """Eventos en formato Chrome Trace Event (marcas en microsegundos)"""
+        pid = os.getpid()
+        origen = self._origen_ns
+        tramos = list(self._tramos)  # Copia atómica con el GIL aunque otros hilos registren
+        
+        eventos = []
+        hilos: Dict[int, str] = {}
+        for (tid, nombre_hilo), nombre, categoria, inicio, fin, args in tramos:
+            hilos[tid] = nombre_hilo
+            evento = {'name': nombre, 'cat': categoria, 'ph': 'X', 'pid': pid, 'tid': tid,
+                      'ts': (inicio - origen) / 1000, 'dur': (fin - inicio) / 1000}
+            if args:
+                evento['args'] = args
+            eventos.append(evento)
+        
+        eventos[:0] = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': nombre}}
+                       for tid, nombre in hilos.items()]
+        return eventos
+    
+    def exportar(self, archivo: Optional[str] = None) -> Optional[Path]:
+        """Escribe la traza en JSON y devuelve la ruta (None si no hay nada que exportar)"""
+        archivo = archivo or self.archivo
+        if not archivo:
+            return None
+        
+        ruta = Path(archivo).expanduser()
+        try:
+            ruta.parent.mkdir(parents=True, exist_ok=True)
+            with open(ruta, 'w', encoding='utf-8') as f:
+                json.dump({'traceEvents': self.eventos(), 'displayTimeUnit': 'ms'},
+                          f, ensure_ascii=False, separators=(',', ':'), default=str)
+        except OSError:
+            return None
+        return ruta
+    
+    def reiniciar(self):
+        self._tramos.clear()
+
+class PerfilEtapas:
+    """Tiempos por etapa del escaneo y la organización
+    
+    Cada etapa acumula llamadas, tiempo total y máximo, y un histograma con
+    cubetas de potencias de dos en nanosegundos, de donde salen percentiles
+    aproximados. Se activa con la variable de entorno ORGANIZADOR_PERFIL=1 o
+    con la opción "perfilado" de la configuración; desactivado, cada punto
+    de medida solo cuesta comprobar un atributo. Con el trazador activo,
+    cada etapa medida se registra además como tramo de la traza.
+    """
+    
+    def __init__(self, trazador: Optional[Trazador] = None):
+        self.activo = (os.environ.get("ORGANIZADOR_PERFIL", "").lower() in ("1", "true", "si", "sí") or
+                       bool(config.config.get("perfilado", False)))
+        self.trazador = trazador
+        self._lock = threading.Lock()
+        self._etapas: Dict[str, List] = {}  # etapa -> [llamadas, total_ns, max_ns, cubetas]
+    
+    @property
+    def midiendo(self) -> bool:
+        return self.activo or (self.trazador is not None and self.trazador.activo)
+    
+    def etapa(self, nombre: str):
+        """Context manager que mide una etapa (no hace nada si está desactivado)"""
+        return _Medicion(self, nombre) if self.midiendo else _SIN_MEDICION
+    
+    def medir(self, nombre: str) -> Callable:
+        """Decorador que mide cada llamada a una función como una etapa"""
+        def decorador(funcion: Callable) -> Callable:
+            @wraps(funcion)
+            def envoltura(*args, **kwargs):
+                if not self.midiendo:
+                    return funcion(*args, **kwargs)
+                inicio = time.perf_counter_ns()
+                try:
+                    return funcion(*args, **kwargs)
+                finally:
+                    self.terminar(nombre, inicio, time.perf_counter_ns())
+            return envoltura
+        return decorador
+    
+    def terminar(self, etapa: str, inicio_ns: int, fin_ns: int):
+        """Registra una etapa medida en el perfil y, si procede, en la traza"""
+        if self.activo:
+            self.registrar(etapa, fin_ns - inicio_ns)
+        if self.trazador is not None and self.trazador.activo:
+            self.trazador.registrar(etapa, "etapa", inicio_ns, fin_ns)
+    
+    def registrar(self, etapa: str, duracion_ns: int):
+        with self._lock:
+            datos = self._etapas.get(etapa)
+            if datos is None:
+                datos = self._etapas[etapa] = [0, 0, 0, [0] * 64]
+            datos[0] += 1
+            datos[1] += duracion_ns
+            if duracion_ns > datos[2]:
+                datos[2] = duracion_ns
+            datos[3][min(duracion_ns.bit_length(), 63)] += 1
+    
+    def reiniciar(self):
+        with self._lock:
+            self._etapas = {}
+    
+    @staticmethod
+    def _percentil(cubetas: List[int], llamadas: int, fraccion: float) -> int:
+        """Límite superior (ns) de la cubeta que contiene el percentil"""
+        objetivo = fraccion * llamadas
+        acumulado = 0
+        for bits, cantidad in enumerate(cubetas):
+            acumulado += cantidad
+            if acumulado >= objetivo:
+                return 1 << bits
+        return 1 << 63
+    
+    def resumen(self) -> Dict[str, Dict]:
+        """Devuelve {etapa: métricas}, de más a menos tiempo total"""
+        with self._lock:
+            etapas = {etapa: (n, total, maximo, list(cubetas))
+                      for etapa, (n, total, maximo, cubetas) in self._etapas.items()}
+        
+        resultado = {}
+        for etapa, (n, total, maximo, cubetas) in sorted(etapas.items(), key=lambda x: x[1][1], reverse=True):
+            resultado[etapa] = {
+                'llamadas': n,
+                'total_ms': total / 1e6,
+                'media_us': total / n / 1e3,
+                'p50_us': min(self._percentil(cubetas, n, 0.50), maximo) / 1e3,
+                'p99_us': min(self._percentil(cubetas, n, 0.99), maximo) / 1e3,
+                'max_us': maximo / 1e3
+            }
+        return resultado
+    
+    def formatear_resumen(self, resumen: Optional[Dict[str, Dict]] = None) -> str:
+        """Tabla de texto con el desglose por etapa"""
+        resumen = self.resumen() if resumen is None else resumen
+        if not resumen:
+            return "Perfil: sin mediciones"
+        
+        lineas = [f"{'Etapa':<22}{'Llamadas':>10}{'Total ms':>11}{'Media µs':>11}"
+                  f"{'p50 µs':>10}{'p99 µs':>10}{'Máx µs':>11}"]
+        for etapa, m in resumen.items():
+            lineas.append(f"{etapa:<22}{m['llamadas']:>10}{m['total_ms']:>11.1f}{m['media_us']:>11.1f}"
+                          f"{m['p50_us']:>10.1f}{m['p99_us']:>10.1f}{m['max_us']:>11.1f}")
+        return "Perfil por etapa (las etapas anidadas también cuentan en su etapa padre):\n" + "\n".join(lineas)
+
+# Instancias globales
+trazador = Trazador()
+perfil = PerfilEtapas(trazador)
\ No newline at end of file
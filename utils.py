@@ -1,11 +1,17 @@
 import os
+import sys
+import time
 import hashlib
+import heapq
 import shutil
 import platform
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from stat import S_ISREG
+from typing import List, Dict, Tuple, Optional, Set
 from datetime import datetime
 
+from perfil import perfil
+
 class FileUtils:
     """Utilidades para manejo de archivos"""
     
@@ -19,6 +25,7 @@ class FileUtils:
             return b''
     
     @staticmethod
+    @perfil.medir('magic')
     def detectar_tipo_por_contenido(archivo_path: Path) -> Optional[str]:
         """Detecta el tipo de archivo analizando su contenido"""
         from config import config
@@ -64,10 +71,23 @@ class FileUtils:
         return f"{tamaño_bytes:.1f} PB"
     
     @staticmethod
-    def obtener_info_archivo(archivo_path: Path) -> Dict:
+    def formatear_duracion(segundos: float) -> str:
+        """Convierte segundos a formato legible (segundos, minutos, horas)"""
+        if segundos < 60:
+            return f"{segundos:.1f} segundos"
+        if segundos < 3600:
+            return f"{segundos / 60:.1f} minutos"
+        return f"{segundos / 3600:.1f} horas"
+    
+    @staticmethod
+    def obtener_info_archivo(archivo_path: Path, detector_uso: Optional['DetectorArchivosEnUso'] = None) -> Dict:
         """Obtiene información completa de un archivo"""
         try:
             stat = archivo_path.stat()
+            if detector_uso is not None:
+                en_uso = detector_uso.esta_en_uso(archivo_path, stat)
+            else:
+                en_uso = FileUtils.es_archivo_en_uso(archivo_path)
             return {
                 'nombre': archivo_path.name,
                 'extension': archivo_path.suffix.lower(),
@@ -78,7 +98,7 @@ class FileUtils:
                 'es_archivo': archivo_path.is_file(),
                 'es_directorio': archivo_path.is_dir(),
                 'ruta_completa': str(archivo_path),
-                'en_uso': FileUtils.es_archivo_en_uso(archivo_path)
+                'en_uso': en_uso
             }
         except Exception as e:
             return {
@@ -138,7 +158,8 @@ class FileUtils:
             destino = destino.parent / nombre_sanitizado
             
             # Crear directorio destino si no existe
-            destino.parent.mkdir(parents=True, exist_ok=True)
+            with perfil.etapa('mkdir'):
+                destino.parent.mkdir(parents=True, exist_ok=True)
             
             # Verificar longitud de ruta (límite Windows: 260 caracteres)
             if len(str(destino)) > 250:  # Dejar margen de seguridad
@@ -161,36 +182,38 @@ class FileUtils:
                     destino = destino.parent / (nombre_corto + extension)
             
             # Si el archivo destino ya existe, generar nuevo nombre
-            if destino.exists():
-                contador = 1
-                nombre_base = destino.stem
-                extension = destino.suffix
-                
-                while destino.exists():
-                    nuevo_nombre = f"{nombre_base} ({contador}){extension}"
-                    destino_temporal = destino.parent / nuevo_nombre
+            with perfil.etapa('conflictos'):
+                if destino.exists():
+                    contador = 1
+                    nombre_base = destino.stem
+                    extension = destino.suffix
                     
-                    # Verificar que el nuevo nombre no sea muy largo
-                    if len(str(destino_temporal)) > 250:
-                        # Si es muy largo, usar nombre más corto
-                        nombre_base_corto = nombre_base[:50] if len(nombre_base) > 50 else nombre_base
-                        nuevo_nombre = f"{nombre_base_corto}_({contador}){extension}"
-                        destino = destino.parent / nuevo_nombre
-                    else:
-                        destino = destino_temporal
-                    
-                    contador += 1
-                    
-                    # Evitar bucle infinito
-                    if contador > 999:
-                        import time
-                        timestamp = str(int(time.time()))
-                        nuevo_nombre = f"archivo_{timestamp}{extension}"
-                        destino = destino.parent / nuevo_nombre
-                        break
+                    while destino.exists():
+                        nuevo_nombre = f"{nombre_base} ({contador}){extension}"
+                        destino_temporal = destino.parent / nuevo_nombre
+                        
+                        # Verificar que el nuevo nombre no sea muy largo
+                        if len(str(destino_temporal)) > 250:
+                            # Si es muy largo, usar nombre más corto
+                            nombre_base_corto = nombre_base[:50] if len(nombre_base) > 50 else nombre_base
+                            nuevo_nombre = f"{nombre_base_corto}_({contador}){extension}"
+                            destino = destino.parent / nuevo_nombre
+                        else:
+                            destino = destino_temporal
+                        
+                        contador += 1
+                        
+                        # Evitar bucle infinito
+                        if contador > 999:
+                            import time
+                            timestamp = str(int(time.time()))
+                            nuevo_nombre = f"archivo_{timestamp}{extension}"
+                            destino = destino.parent / nuevo_nombre
+                            break
             
             # Mover el archivo
-            shutil.move(str(origen), str(destino))
+            with perfil.etapa('mover'):
+                shutil.move(str(origen), str(destino))
             return True, str(destino)
             
         except Exception as e:
@@ -206,8 +229,8 @@ class FileUtils:
             return False, error_msg
     
     @staticmethod
-    def es_archivo_temporal(archivo_path: Path) -> bool:
-        """Detecta si un archivo es temporal y debería ser ignorado"""
+    def es_nombre_temporal(archivo_path: Path) -> bool:
+        """Detecta por el nombre si un archivo es temporal (sin acceder al disco)"""
         nombre = archivo_path.name.lower()
         extension = archivo_path.suffix.lower()
         
@@ -217,16 +240,84 @@ class FileUtils:
         # Patrones de nombres temporales
         patrones_temporales = ['~', '.ds_store', 'thumbs.db', 'desktop.ini']
         
+        return (extension in extensiones_temporales or 
+                any(patron in nombre for patron in patrones_temporales) or
+                nombre.startswith('~'))
+    
+    @staticmethod
+    def es_archivo_temporal(archivo_path: Path) -> bool:
+        """Detecta si un archivo es temporal y debería ser ignorado"""
+        if FileUtils.es_nombre_temporal(archivo_path):
+            return True
+        
         # Verificar tamaño cero (archivos vacíos)
         try:
-            es_vacio = archivo_path.stat().st_size == 0
+            return archivo_path.stat().st_size == 0
         except:
-            es_vacio = False
+            return False
+
+class DetectorArchivosEnUso:
+    """Detecta archivos abiertos por otros procesos
+    
+    En Linux abrir un archivo no es exclusivo, así que abrirlo no dice nada.
+    En su lugar se recorre /proc/*/fd una vez por escaneo y se guardan los
+    pares (dispositivo, inodo) abiertos por cualquier proceso legible; la
+    consulta por archivo es entonces una búsqueda en un conjunto. En otras
+    plataformas se usa FileUtils.es_archivo_en_uso.
+    """
+    
+    def __init__(self):
+        self.usa_proc = sys.platform.startswith('linux') and os.path.isdir('/proc/self/fd')
+        self.inodos_abiertos: Optional[Set[Tuple[int, int]]] = None
+    
+    @perfil.medir('en_uso_barrido')
+    def barrer(self):
+        """Recorre /proc/*/fd y actualiza el conjunto de archivos abiertos"""
+        if not self.usa_proc:
+            return
         
-        return (extension in extensiones_temporales or 
-                any(patron in nombre for patron in patrones_temporales) or
-                nombre.startswith('~') or
-                es_vacio)
+        pid_propio = str(os.getpid())
+        abiertos = set()
+        
+        try:
+            pids = os.listdir('/proc')
+        except OSError:
+            self.inodos_abiertos = None
+            return
+        
+        for pid in pids:
+            if not pid.isdigit() or pid == pid_propio:
+                continue
+            
+            dir_fd = f'/proc/{pid}/fd'
+            try:
+                descriptores = os.listdir(dir_fd)
+            except OSError:
+                continue  # Proceso terminado o sin permisos de lectura
+            
+            for fd in descriptores:
+                try:
+                    stat_fd = os.stat(f'{dir_fd}/{fd}')
+                except OSError:
+                    continue
+                if S_ISREG(stat_fd.st_mode):
+                    abiertos.add((stat_fd.st_dev, stat_fd.st_ino))
+        
+        self.inodos_abiertos = abiertos
+    
+    @perfil.medir('en_uso')
+    def esta_en_uso(self, archivo_path: Path, stat_archivo: Optional[os.stat_result] = None) -> bool:
+        """Verifica si un archivo está abierto por otro proceso"""
+        if self.inodos_abiertos is None:
+            return FileUtils.es_archivo_en_uso(archivo_path)
+        
+        if stat_archivo is None:
+            try:
+                stat_archivo = archivo_path.stat()
+            except OSError:
+                return False
+        
+        return (stat_archivo.st_dev, stat_archivo.st_ino) in self.inodos_abiertos
 
 class SystemUtils:
     """Utilidades del sistema"""
@@ -286,39 +377,74 @@ class SystemUtils:
             return 0
 
 class LogUtils:
-    """Utilidades para logging y seguimiento"""
+    """Utilidades para logging y seguimiento
+    
+    Los mensajes se encolan y un hilo en segundo plano los escribe por
+    lotes: el archivo queda abierto y la consola recibe una sola escritura
+    por lote. Los mensajes por debajo del nivel mínimo se descartan antes de
+    formatearlos. El archivo rota por tamaño o al cambiar de día y las
+    copias antiguas se comprimen con gzip. Si la cola se llena, los mensajes
+    nuevos se descartan y se cuentan en lugar de bloquear al llamador.
+    """
+    
+    NIVELES = {"DEBUG": 10, "INFO": 20, "SUCCESS": 25, "WARNING": 30, "ERROR": 40}
+    TAMAÑO_COLA = 50000
+    MENSAJES_POR_LOTE = 500
     
     def __init__(self, archivo_log: Optional[Path] = None):
+        import atexit
+        import queue
+        import threading
         from config import config
         
         if archivo_log is None:
             try:
                 log_dir = config.config_dir / "logs"
                 log_dir.mkdir(parents=True, exist_ok=True)
-                archivo_log = log_dir / f"organizador_{datetime.now().strftime('%Y%m%d')}.log"
+                archivo_log = log_dir / "organizador.log"
             except Exception as e:
                 # Fallback: usar directorio temporal si no se puede crear en home
                 import tempfile
                 temp_dir = Path(tempfile.gettempdir()) / "organizador_descargas" / "logs"
                 temp_dir.mkdir(parents=True, exist_ok=True)
-                archivo_log = temp_dir / f"organizador_{datetime.now().strftime('%Y%m%d')}.log"
+                archivo_log = temp_dir / "organizador.log"
                 print(f"⚠️  Usando directorio temporal para logs: {temp_dir}")
         
         self.archivo_log = archivo_log
+        self.nivel_archivo = self.NIVELES.get(config.config.get("nivel_log_archivo", "INFO"), 20)
+        self.nivel_consola = self.NIVELES.get(config.config.get("nivel_log_consola", "INFO"), 20)
+        self.tamaño_maximo = int(config.config.get("log_tamaño_maximo_mb", 5) * 1024 * 1024)
+        self.archivos_conservados = config.config.get("log_archivos_conservados", 5)
+        
+        self.descartados = 0
+        self._descartados_reportados = 0
+        self._lock_descartes = threading.Lock()
+        self._cola = queue.Queue(maxsize=self.TAMAÑO_COLA)
+        self._archivo = None
+        self._dia_archivo = None
+        
+        self._hilo = threading.Thread(target=self._escribir_en_segundo_plano, name="LogUtils", daemon=True)
+        self._hilo.start()
+        atexit.register(self.cerrar)
+    
+    @property
+    def nivel_minimo(self) -> int:
+        return min(self.nivel_archivo, self.nivel_consola)
     
     def log(self, mensaje: str, nivel: str = "INFO"):
-        """Registra un mensaje en el log"""
-        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        linea_log = f"[{timestamp}] {nivel}: {mensaje}\n"
+        """Encola un mensaje para el log (no bloquea)"""
+        valor_nivel = self.NIVELES.get(nivel, 20)
+        if valor_nivel < self.nivel_minimo:
+            return
         
         try:
-            with open(self.archivo_log, 'a', encoding='utf-8') as f:
-                f.write(linea_log)
+            self._cola.put_nowait((time.time(), nivel, valor_nivel, mensaje))
         except Exception:
-            pass  # Fallar silenciosamente si no se puede escribir el log
-        
-        # También imprimir en consola para desarrollo
-        print(f"{nivel}: {mensaje}")
+            with self._lock_descartes:
+                self.descartados += 1
+    
+    def debug(self, mensaje: str):
+        self.log(mensaje, "DEBUG")
     
     def info(self, mensaje: str):
         self.log(mensaje, "INFO")
@@ -331,75 +457,536 @@ class LogUtils:
     
     def success(self, mensaje: str):
         self.log(mensaje, "SUCCESS")
+    
+    def vaciar(self, timeout: float = 5.0):
+        """Espera a que se escriban los mensajes encolados"""
+        limite = time.monotonic() + timeout
+        while self._cola.unfinished_tasks and time.monotonic() < limite and self._hilo.is_alive():
+            time.sleep(0.01)
+    
+    def cerrar(self):
+        """Escribe lo pendiente y detiene el hilo de escritura"""
+        if self._hilo.is_alive():
+            try:
+                self._cola.put(None, timeout=1)
+            except Exception:
+                pass
+            self._hilo.join(timeout=5)
+    
+    # ------------------------------------------------------------------
+    # Hilo de escritura
+    # ------------------------------------------------------------------
+    
+    def _escribir_en_segundo_plano(self):
+        import queue
+        
+        terminar = False
+        while not terminar:
+            try:
+                lote = [self._cola.get(timeout=1)]
+            except queue.Empty:
+                lote = []
+            
+            while len(lote) < self.MENSAJES_POR_LOTE:
+                try:
+                    lote.append(self._cola.get_nowait())
+                except queue.Empty:
+                    break
+            
+            recibidos = len(lote)
+            if None in lote:
+                terminar = True
+                lote = [m for m in lote if m is not None]
+            
+            try:
+                self._escribir_lote(lote)
+            except Exception:
+                pass  # Fallar silenciosamente si no se puede escribir el log
+            finally:
+                for _ in range(recibidos):
+                    self._cola.task_done()
+        
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+    
+    def _escribir_lote(self, lote: List[Tuple]):
+        # Aviso de mensajes descartados desde el último lote
+        descartados = self.descartados - self._descartados_reportados
+        if descartados:
+            self._descartados_reportados += descartados
+            lote.append((time.time(), "WARNING", 30,
+                         f"Se descartaron {descartados} mensajes de log (cola llena)"))
+        
+        if not lote:
+            return
+        
+        lineas_archivo = []
+        lineas_consola = []
+        segundo_anterior = None
+        for marca, nivel, valor_nivel, mensaje in lote:
+            if valor_nivel >= self.nivel_archivo:
+                # La marca de tiempo se formatea una vez por segundo, no por mensaje
+                segundo = int(marca)
+                if segundo != segundo_anterior:
+                    segundo_anterior = segundo
+                    timestamp = datetime.fromtimestamp(segundo).strftime("%Y-%m-%d %H:%M:%S")
+                lineas_archivo.append(f"[{timestamp}] {nivel}: {mensaje}\n")
+            if valor_nivel >= self.nivel_consola:
+                lineas_consola.append(f"{nivel}: {mensaje}\n")
+        
+        if lineas_archivo:
+            self._rotar_si_hace_falta()
+            self._archivo.write(''.join(lineas_archivo))
+            self._archivo.flush()
+        
+        # También imprimir en consola para desarrollo
+        if lineas_consola and sys.stdout is not None:
+            try:
+                sys.stdout.write(''.join(lineas_consola))
+                sys.stdout.flush()
+            except Exception:
+                pass
+    
+    def _rotar_si_hace_falta(self):
+        hoy = datetime.now().date()
+        if self._archivo is None:
+            self.archivo_log.parent.mkdir(parents=True, exist_ok=True)
+            if self.archivo_log.exists():
+                self._dia_archivo = datetime.fromtimestamp(self.archivo_log.stat().st_mtime).date()
+            else:
+                self._dia_archivo = hoy
+            self._archivo = open(self.archivo_log, 'a', encoding='utf-8')
+        
+        if self._dia_archivo == hoy and self._archivo.tell() < self.tamaño_maximo:
+            return
+        
+        # Rotar: renombrar el archivo actual, comprimirlo y abrir uno nuevo
+        self._archivo.close()
+        self._archivo = None
+        marca = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        rotado = self.archivo_log.with_name(f"{self.archivo_log.stem}_{marca}{self.archivo_log.suffix}")
+        try:
+            os.replace(self.archivo_log, rotado)
+            self._comprimir(rotado)
+        except OSError:
+            pass
+        self._limpiar_rotados()
+        
+        self._dia_archivo = hoy
+        self._archivo = open(self.archivo_log, 'a', encoding='utf-8')
+    
+    @staticmethod
+    def _comprimir(ruta: Path):
+        import gzip
+        
+        with open(ruta, 'rb') as origen, gzip.open(f"{ruta}.gz", 'wb') as destino:
+            shutil.copyfileobj(origen, destino)
+        ruta.unlink()
+    
+    def _limpiar_rotados(self):
+        """Conserva solo las copias rotadas más recientes"""
+        patron = f"{self.archivo_log.stem}_*"
+        try:
+            rotados = sorted(self.archivo_log.parent.glob(patron), key=lambda r: r.stat().st_mtime, reverse=True)
+        except OSError:
+            return
+        for ruta in rotados[self.archivos_conservados:]:
+            try:
+                ruta.unlink()
+            except OSError:
+                pass
+
+class RegistroEventos:
+    """Registro estructurado de eventos por archivo en formato JSON Lines
+    
+    Pensado para analizar ejecuciones grandes a posteriori: cada evento
+    (escaneo, clasificación, movimiento, error) se guarda con una marca de
+    tiempo monotónica en microsegundos, la etapa, un hash corto de la ruta y
+    la duración. Cada tipo de evento tiene su tasa de muestreo, y el hot
+    path solo decide si muestrear y añade una tupla al búfer; el hash y el
+    JSON se calculan al volcar, en bloque. El archivo se rota a una copia
+    .1 al superar el tamaño máximo.
+    """
+    
+    EVENTOS_POR_VOLCADO = 2000
+    SEGUNDOS_ENTRE_VOLCADOS = 5
+    TAMAÑO_MAXIMO = 20 * 1024 * 1024
+    MUESTREO_POR_DEFECTO = {"escaneo": 0.01, "clasificacion": 0.01, "movimiento": 1.0, "error": 1.0}
+    
+    def __init__(self, archivo_eventos: Optional[Path] = None):
+        import atexit
+        import random
+        import threading
+        from config import config
+        
+        if archivo_eventos is None:
+            archivo_eventos = Path(logger.archivo_log).parent / "eventos.jsonl"
+        
+        self.archivo_eventos = archivo_eventos
+        self.activo = config.config.get("eventos_estructurados", True)
+        self.muestreo = dict(self.MUESTREO_POR_DEFECTO)
+        self.muestreo.update(config.config.get("muestreo_eventos", {}))
+        
+        self._aleatorio = random.random
+        self._lock = threading.Lock()
+        self._pendientes: List[Tuple] = []
+        self._ultimo_volcado = time.monotonic()
+        self._cabecera_escrita = False
+        atexit.register(self.volcar)
+    
+    def registrar(self, tipo: str, ruta, duracion_us: int = 0, **datos):
+        """Registra un evento si le toca según la tasa de muestreo de su tipo"""
+        if not self.activo:
+            return
+        tasa = self.muestreo.get(tipo, 1.0)
+        if tasa < 1.0 and (tasa <= 0.0 or self._aleatorio() >= tasa):
+            return
+        
+        self._pendientes.append((time.monotonic_ns() // 1000, tipo, ruta, duracion_us, tasa, datos))
+        if (len(self._pendientes) >= self.EVENTOS_POR_VOLCADO or
+                time.monotonic() - self._ultimo_volcado >= self.SEGUNDOS_ENTRE_VOLCADOS):
+            self.volcar()
+    
+    @staticmethod
+    def hash_ruta(ruta) -> str:
+        """Hash corto y estable de una ruta (no se guardan rutas en claro)"""
+        return hashlib.blake2b(str(ruta).encode('utf-8', 'surrogatepass'), digest_size=8).hexdigest()
+    
+    def volcar(self):
+        """Escribe los eventos pendientes en una sola escritura"""
+        import json
+        
+        with self._lock:
+            self._ultimo_volcado = time.monotonic()
+            pendientes, self._pendientes = self._pendientes, []
+            if not pendientes:
+                return
+            
+            lineas = []
+            if not self._cabecera_escrita:
+                # Ancla para convertir las marcas monotónicas en hora real
+                lineas.append(json.dumps({
+                    'ev': 'sesion', 't': time.monotonic_ns() // 1000,
+                    'epoch': time.time(), 'pid': os.getpid()
+                }, separators=(',', ':')) + '\n')
+                self._cabecera_escrita = True
+            
+            for marca, tipo, ruta, duracion_us, tasa, datos in pendientes:
+                evento = {'t': marca, 'ev': tipo}
+                if ruta is not None:  # Los eventos que no son de un archivo no llevan ruta
+                    evento['ruta'] = self.hash_ruta(ruta)
+                evento['us'] = duracion_us
+                if tasa < 1.0:
+                    evento['m'] = tasa
+                if datos:
+                    evento.update(datos)
+                lineas.append(json.dumps(evento, ensure_ascii=False, separators=(',', ':'), default=str) + '\n')
+            
+            try:
+                self.archivo_eventos.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.archivo_eventos, 'a', encoding='utf-8') as f:
+                    f.write(''.join(lineas))
+                    tamaño = f.tell()
+                if tamaño > self.TAMAÑO_MAXIMO:
+                    os.replace(self.archivo_eventos, self.archivo_eventos.with_suffix('.1.jsonl'))
+                    self._cabecera_escrita = False
+            except Exception:
+                pass  # Fallar silenciosamente, igual que el log
+
+class ContadorTopK:
+    """Extensiones más frecuentes con memoria fija (algoritmo Space-Saving)
+    
+    Guarda como mucho `capacidad` contadores. Cuando llega una clave nueva
+    con la tabla llena, sustituye a la de menor cuenta y hereda esa cuenta
+    como error. Cada cuenta sobrestima la real en como mucho su error, y
+    cualquier clave que no esté en la tabla aparece menos veces que el
+    contador mínimo (nunca más de total / capacidad).
+    """
+    
+    __slots__ = ('capacidad', 'total', '_contadores')
+    
+    def __init__(self, capacidad: int = 100):
+        self.capacidad = capacidad
+        self.total = 0
+        self._contadores: Dict[str, List[int]] = {}  # clave -> [cuenta, error]
+    
+    def incrementar(self, clave: str, cantidad: int = 1):
+        self.total += cantidad
+        contador = self._contadores.get(clave)
+        if contador is not None:
+            contador[0] += cantidad
+        elif len(self._contadores) < self.capacidad:
+            self._contadores[clave] = [cantidad, 0]
+        else:
+            minima = min(self._contadores, key=lambda c: self._contadores[c][0])
+            cuenta_minima = self._contadores.pop(minima)[0]
+            self._contadores[clave] = [cuenta_minima + cantidad, cuenta_minima]
+    
+    def top(self, k: int = 10) -> List[Tuple[str, int, int]]:
+        """Devuelve [(clave, cuenta, error)] de mayor a menor cuenta"""
+        return [
+            (clave, cuenta, error)
+            for clave, (cuenta, error) in heapq.nlargest(k, self._contadores.items(), key=lambda x: x[1][0])
+        ]
+    
+    def __len__(self) -> int:
+        return len(self._contadores)
+    
+    def __bool__(self) -> bool:
+        return bool(self._contadores)
+    
+    def a_dict(self) -> Dict:
+        return {
+            'capacidad': self.capacidad,
+            'total': self.total,
+            'contadores': [[clave, cuenta, error] for clave, (cuenta, error) in self._contadores.items()]
+        }
+    
+    @classmethod
+    def desde_dict(cls, datos: Dict, capacidad: int = 100) -> 'ContadorTopK':
+        """Carga el formato compacto o migra el antiguo {extensión: cuenta}"""
+        if 'contadores' in datos:
+            contador = cls(datos.get('capacidad', capacidad))
+            contador.total = datos.get('total', 0)
+            for clave, cuenta, error in datos['contadores']:
+                contador._contadores[clave] = [cuenta, error]
+            return contador
+        
+        # Formato antiguo con cuentas exactas: se conservan las más altas sin
+        # error y las descartadas quedan por debajo del mínimo, como en Space-Saving
+        contador = cls(capacidad)
+        contador.total = sum(datos.values())
+        for clave, cuenta in heapq.nlargest(capacidad, datos.items(), key=lambda x: x[1]):
+            contador._contadores[clave] = [cuenta, 0]
+        return contador
 
 class EstadisticasUtils:
-    """Utilidades para manejo de estadísticas"""
+    """Utilidades para manejo de estadísticas
+    
+    Los totales se mantienen en memoria. Cada registro se convierte en un
+    evento compacto que se acumula en un búfer y se añade a
+    estadisticas.log en bloque (cada cierto número de eventos o de
+    segundos, y al cerrar). La compactación vuelca los totales a
+    estadisticas.json con reemplazo atómico y vacía el log, de modo que el
+    log nunca crece sin límite y una sesión hace O(1) escrituras en disco.
+    """
+    
+    EVENTOS_POR_VOLCADO = 1000
+    SEGUNDOS_ENTRE_VOLCADOS = 30
+    TAMAÑO_MAXIMO_LOG = 256 * 1024
+    CAPACIDAD_EXTENSIONES = 100
     
     def __init__(self):
+        import atexit
+        import threading
         from config import config
+        
         self.stats_file = config.config_dir / "estadisticas.json"
+        self.log_file = config.config_dir / "estadisticas.log"
+        self._lock = threading.RLock()
+        self._generacion = 0
+        self._eventos_pendientes: List[Dict] = []
+        self._extensiones_pendientes: Dict[str, int] = {}
+        self._ultimo_volcado = time.monotonic()
+        self._cambios_sin_compactar = False
+        
         self.stats = self.cargar_estadisticas()
+        atexit.register(self.cerrar)
     
-    def cargar_estadisticas(self) -> Dict:
-        """Carga las estadísticas desde archivo"""
-        try:
-            if self.stats_file.exists():
-                import json
-                with open(self.stats_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-        except Exception:
-            pass
-        
+    @classmethod
+    def _estadisticas_vacias(cls) -> Dict:
         return {
             'archivos_organizados_total': 0,
             'bytes_organizados_total': 0,
             'sesiones_organizacion': 0,
             'categorias_mas_usadas': {},
-            'extensiones_desconocidas': {},
+            'extensiones_desconocidas': ContadorTopK(cls.CAPACIDAD_EXTENSIONES),
             'fecha_primera_organizacion': None,
             'fecha_ultima_organizacion': None
         }
     
-    def guardar_estadisticas(self):
-        """Guarda las estadísticas actuales"""
+    def cargar_estadisticas(self) -> Dict:
+        """Carga las estadísticas desde archivo y reaplica los eventos del log"""
+        import json
+        
+        estadisticas = self._estadisticas_vacias()
         try:
-            import json
-            from config import config
-            config.config_dir.mkdir(exist_ok=True)
-            with open(self.stats_file, 'w', encoding='utf-8') as f:
-                json.dump(self.stats, f, indent=2, ensure_ascii=False, default=str)
+            if self.stats_file.exists():
+                with open(self.stats_file, 'r', encoding='utf-8') as f:
+                    datos = json.load(f)
+                extensiones = datos.pop('extensiones_desconocidas', None)
+                estadisticas.update(datos)
+                if extensiones:
+                    estadisticas['extensiones_desconocidas'] = ContadorTopK.desde_dict(
+                        extensiones, self.CAPACIDAD_EXTENSIONES
+                    )
         except Exception:
             pass
+        
+        self._generacion = estadisticas.pop('generacion', 0)
+        
+        # Los eventos de generaciones anteriores ya están en la instantánea
+        try:
+            if self.log_file.exists():
+                with open(self.log_file, 'r', encoding='utf-8') as f:
+                    for linea in f:
+                        try:
+                            evento = json.loads(linea)
+                        except ValueError:
+                            continue  # Línea truncada por un cierre inesperado
+                        if evento.get('g') == self._generacion:
+                            self._aplicar_evento(estadisticas, evento)
+                            self._cambios_sin_compactar = True
+        except Exception:
+            pass
+        
+        return estadisticas
     
-    def registrar_organizacion(self, archivos_movidos: List[Dict]):
-        """Registra una sesión de organización"""
-        now = datetime.now().isoformat()
+    @staticmethod
+    def _aplicar_evento(estadisticas: Dict, evento: Dict):
+        """Aplica un evento a los totales en memoria"""
+        if evento['e'] == 'org':
+            if estadisticas['fecha_primera_organizacion'] is None:
+                estadisticas['fecha_primera_organizacion'] = evento['f']
+            estadisticas['fecha_ultima_organizacion'] = evento['f']
+            estadisticas['sesiones_organizacion'] += 1
+            estadisticas['archivos_organizados_total'] += evento['n']
+            estadisticas['bytes_organizados_total'] += evento['b']
+            categorias = estadisticas['categorias_mas_usadas']
+            for categoria, cantidad in evento['c'].items():
+                categorias[categoria] = categorias.get(categoria, 0) + cantidad
+        elif evento['e'] == 'ext':
+            extensiones = estadisticas['extensiones_desconocidas']
+            for extension, cantidad in evento['x'].items():
+                extensiones.incrementar(extension, cantidad)
+    
+    def _registrar_evento(self, evento: Dict):
+        with self._lock:
+            self._eventos_pendientes.append(evento)
+            self._quizas_volcar()
+    
+    def _quizas_volcar(self):
+        pendientes = len(self._eventos_pendientes) + len(self._extensiones_pendientes)
+        if (pendientes >= self.EVENTOS_POR_VOLCADO or
+                time.monotonic() - self._ultimo_volcado >= self.SEGUNDOS_ENTRE_VOLCADOS):
+            self.volcar()
+    
+    @perfil.medir('estadisticas')
+    def volcar(self):
+        """Añade los eventos pendientes al log en una sola escritura"""
+        import json
         
-        if self.stats['fecha_primera_organizacion'] is None:
-            self.stats['fecha_primera_organizacion'] = now
+        with self._lock:
+            if self._extensiones_pendientes:
+                self._eventos_pendientes.append({'e': 'ext', 'x': self._extensiones_pendientes})
+                self._extensiones_pendientes = {}
+            
+            self._ultimo_volcado = time.monotonic()
+            if not self._eventos_pendientes:
+                return
+            
+            lineas = ''.join(
+                json.dumps({**evento, 'g': self._generacion}, ensure_ascii=False, separators=(',', ':')) + '\n'
+                for evento in self._eventos_pendientes
+            )
+            try:
+                self.log_file.parent.mkdir(exist_ok=True)
+                with open(self.log_file, 'a', encoding='utf-8') as f:
+                    f.write(lineas)
+                self._eventos_pendientes = []
+                self._cambios_sin_compactar = True
+            except Exception:
+                return
+            
+            try:
+                if self.log_file.stat().st_size > self.TAMAÑO_MAXIMO_LOG:
+                    self.compactar()
+            except OSError:
+                pass
+    
+    @perfil.medir('estadisticas')
+    def compactar(self):
+        """Vuelca los totales a estadisticas.json (reemplazo atómico) y vacía el log"""
+        import json
         
-        self.stats['fecha_ultima_organizacion'] = now
-        self.stats['sesiones_organizacion'] += 1
-        self.stats['archivos_organizados_total'] += len(archivos_movidos)
+        with self._lock:
+            instantanea = dict(self.stats)
+            instantanea['extensiones_desconocidas'] = self.stats['extensiones_desconocidas'].a_dict()
+            instantanea['generacion'] = self._generacion + 1
+            archivo_temporal = self.stats_file.with_suffix('.json.tmp')
+            try:
+                self.stats_file.parent.mkdir(exist_ok=True)
+                with open(archivo_temporal, 'w', encoding='utf-8') as f:
+                    json.dump(instantanea, f, ensure_ascii=False, separators=(',', ':'), default=str)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(archivo_temporal, self.stats_file)
+            except Exception:
+                return
+            
+            # A partir de aquí los eventos viejos del log quedan obsoletos
+            self._generacion += 1
+            self._eventos_pendientes = []
+            self._extensiones_pendientes = {}
+            self._cambios_sin_compactar = False
+            try:
+                open(self.log_file, 'w').close()
+            except Exception:
+                pass
+    
+    def guardar_estadisticas(self):
+        """Guarda las estadísticas actuales"""
+        self.compactar()
+    
+    def cerrar(self):
+        """Persiste todo lo pendiente (se llama también al salir)"""
+        with self._lock:
+            if self._eventos_pendientes or self._extensiones_pendientes or self._cambios_sin_compactar:
+                self.compactar()
+    
+    def reiniciar(self):
+        """Borra todas las estadísticas"""
+        with self._lock:
+            self.stats = self._estadisticas_vacias()
+            self.compactar()
+    
+    def registrar_organizacion(self, archivos_movidos: List[Dict]):
+        """Registra una sesión de organización"""
+        categorias: Dict[str, int] = {}
+        total_bytes = 0
         
         for archivo_info in archivos_movidos:
             # Contar bytes
-            self.stats['bytes_organizados_total'] += archivo_info.get('tamaño', 0)
+            total_bytes += archivo_info.get('tamaño', 0)
             
             # Contar categorías
             categoria = archivo_info.get('categoria', 'Otros')
-            if categoria not in self.stats['categorias_mas_usadas']:
-                self.stats['categorias_mas_usadas'][categoria] = 0
-            self.stats['categorias_mas_usadas'][categoria] += 1
+            categorias[categoria] = categorias.get(categoria, 0) + 1
         
-        self.guardar_estadisticas()
+        evento = {
+            'e': 'org',
+            'f': datetime.now().isoformat(),
+            'n': len(archivos_movidos),
+            'b': total_bytes,
+            'c': categorias
+        }
+        
+        with self._lock:
+            self._aplicar_evento(self.stats, evento)
+            self._registrar_evento(evento)
     
     def registrar_extension_desconocida(self, extension: str):
         """Registra una extensión desconocida"""
-        if extension not in self.stats['extensiones_desconocidas']:
-            self.stats['extensiones_desconocidas'][extension] = 0
-        self.stats['extensiones_desconocidas'][extension] += 1
-        self.guardar_estadisticas()
+        with self._lock:
+            self.stats['extensiones_desconocidas'].incrementar(extension)
+            self._extensiones_pendientes[extension] = self._extensiones_pendientes.get(extension, 0) + 1
+            self._quizas_volcar()
+    
+    def extensiones_frecuentes(self, k: int = 5) -> List[Tuple[str, int, int]]:
+        """Devuelve las k extensiones desconocidas más vistas como (extensión, cuenta, error)"""
+        with self._lock:
+            return self.stats['extensiones_desconocidas'].top(k)
     
     def obtener_resumen(self) -> Dict:
         """Obtiene un resumen de las estadísticas"""
@@ -416,4 +1003,5 @@ class EstadisticasUtils:
 
 # Instancias globales
 logger = LogUtils()
+eventos = RegistroEventos()
 stats = EstadisticasUtils()
\ No newline at end of file